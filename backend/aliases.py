@@ -0,0 +1,120 @@
+"""
+Versioned skill alias dictionary ({canonical: [aliases]}) stored in the
+database.
+
+skill_alias_versions keeps every published dictionary; the highest
+version is the one in use. Version 1 is seeded from fallbacks.FaLLBACKS
+by a migration.
+
+Each process compiles one version into skill_matcher.matcher. The crud
+entry points that normalize or infer skills call refresh(), which
+checks for a newer version at most every ALIAS_CHECK_SECONDS (one
+primary-key lookup), so every worker picks up a change within that
+time. publish() stores a new version, installs it in the publishing
+process right away, and existing profiles are brought in line by a
+re-tag job (retag.py).
+"""
+
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import cache
+import skill_matcher
+from fallbacks import FaLLBACKS
+from models import SkillAliasVersion
+
+ALIAS_CHECK_SECONDS = float(os.getenv("ALIAS_CHECK_SECONDS", "5"))
+
+_lock = threading.Lock()
+_checked_at = float("-inf")
+
+
+def latest_version(db: Session) -> int:
+    return db.query(func.max(SkillAliasVersion.version)).scalar() or 0
+
+
+def current(db: Session) -> SkillAliasVersion | None:
+    return db.query(SkillAliasVersion).order_by(SkillAliasVersion.version.desc()).first()
+
+
+def describe(row: SkillAliasVersion) -> dict:
+    return {"version": row.version, "aliases": row.aliases, "created_at": row.created_at}
+
+
+def current_dictionary(db: Session) -> dict | None:
+    row = current(db)
+    return describe(row) if row is not None else None
+
+
+def install(row: SkillAliasVersion):
+    """
+    Makes this process normalize and infer skills with `row`.
+    """
+    with _lock:
+        if skill_matcher.version != row.version:
+            skill_matcher.install(row.aliases, row.version)
+
+
+def refresh(db: Session):
+    """
+    Installs the newest dictionary if this process is behind.
+    """
+    global _checked_at
+    now = time.monotonic()
+    if now - _checked_at < ALIAS_CHECK_SECONDS:
+        return
+    _checked_at = now
+
+    if latest_version(db) != skill_matcher.version:
+        row = current(db)
+        if row is not None:
+            install(row)
+
+
+def reset():
+    """
+    Back to the built-in dictionary; the next refresh() reads the database.
+    """
+    global _checked_at
+    with _lock:
+        skill_matcher.install(FaLLBACKS, 0)
+        _checked_at = float("-inf")
+
+
+def normalize_dictionary(aliases: dict[str, list[str]]) -> dict[str, list[str]]:
+    """
+    Lower-cases and trims names, drops empty ones and repeats. Order is
+    kept: when two canonical skills share an alias, the first one wins.
+    """
+    cleaned = {}
+    for canonical, words in aliases.items():
+        canonical = canonical.strip().lower()
+        if canonical:
+            words = [w.strip().lower() for w in words if w.strip()]
+            cleaned[canonical] = list(dict.fromkeys(cleaned.get(canonical, []) + words))
+    return cleaned
+
+
+def publish(db: Session, aliases: dict[str, list[str]]) -> SkillAliasVersion:
+    """
+    Stores `aliases` as the next version and switches this process to it.
+    """
+    row = SkillAliasVersion(version=latest_version(db) + 1, aliases=normalize_dictionary(aliases))
+    db.add(row)
+    # Alias-aware search results change with the dictionary
+    cache.mark_changed(db)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="The alias dictionary was changed concurrently; retry"
+        )
+    install(row)
+    return row
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the TrackA-Me backend.
+
+Run from the backend/ directory, e.g.:
+    python -m benchmarks.bench_skill_matcher
+"""
@@ -0,0 +1,108 @@
+"""
+Load test: sync (threadpool + Session) vs async (AsyncSession) routes.
+
+    python -m benchmarks.bench_async_load [--profiles N] [--requests N] [--concurrency N]
+
+Each mode runs in its own process (DB_ASYNC is read at import time)
+against a fresh SQLite file seeded with the same profiles. Requests are
+driven in-process through httpx's ASGI transport with a fixed number of
+concurrent clients, alternating /profiles pages and /profiles/search.
+Prints requests/second and p50/p99 latency per mode.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.harness import percentile
+
+
+def seed(count: int):
+    import migrations
+    from benchmarks.datagen import seed_database
+    from database import SessionLocal, engine
+
+    migrations.migrate(engine)
+
+    db = SessionLocal()
+    try:
+        seed_database(db, count)
+    finally:
+        db.close()
+
+
+async def drive(app, total: int, concurrency: int) -> dict:
+    import httpx
+
+    urls = ["/profiles?page=3&size=20", "/profiles/search?skill=rust"]
+    latencies = []
+    queue = iter(range(total))
+
+    async def client_loop(client):
+        for i in queue:
+            start = time.perf_counter()
+            res = await client.get(urls[i % len(urls)])
+            latencies.append(time.perf_counter() - start)
+            assert res.status_code == 200
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[client_loop(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "rps": total / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def worker(args):
+    from main import app
+
+    seed(args.profiles)
+
+    result = asyncio.run(drive(app, args.requests, args.concurrency))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+
+    print(f"{args.profiles} profiles, {args.requests} requests, "
+          f"{args.concurrency} concurrent clients")
+    for mode, flag in (("sync", "0"), ("async", "1")):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ, DB_ASYNC=flag,
+                DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+            )
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_async_load", "--worker",
+                 *sys.argv[1:]],
+                env=env, capture_output=True, text=True,
+            )
+        if out.returncode:
+            sys.exit(out.stderr)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:<6} {r['rps']:>9.1f} req/s   p50 {r['p50_ms']:>8.2f} ms"
+              f"   p99 {r['p99_ms']:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
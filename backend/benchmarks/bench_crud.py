@@ -0,0 +1,111 @@
+"""
+Micro-benchmarks for the crud functions on a seeded database.
+
+    python -m benchmarks.bench_crud [--profiles N] [--repeat N] [--db PATH] [--out FILE]
+
+Each crud call is timed directly on a Session (no HTTP, no read cache).
+Without --db a temporary SQLite file is seeded with --profiles generated
+profiles; an existing --db file that already holds profiles is reused
+as is, which saves re-seeding large datasets between runs.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+from benchmarks.harness import format_row, save_results, time_calls
+
+
+def benchmarks(db, profile_count: int, seed: int):
+    """
+    name -> zero-argument callable. Arguments are drawn from a seeded
+    RNG per call so consecutive calls hit different rows.
+    """
+    import crud
+    import etags
+    import similar
+    from benchmarks.datagen import CANONICAL, generate_profiles
+    from schemas import ProfileUpdate
+
+    rng = random.Random(seed)
+    new_profiles = generate_profiles(10**9, seed + 1, start=profile_count)
+    text_queries = ["computer vision", "intern", "backend", "raspbery", "dashbo", "pipeline"]
+    text = "Built a YOLO and OpenCV pipeline on a Raspberry Pi, served with FastAPI in Docker"
+
+    def update():
+        crud.update_profile(
+            db, rng.randint(1, profile_count),
+            ProfileUpdate(skills=rng.sample(CANONICAL, 3))
+        )
+
+    return {
+        "list_profiles first page": lambda: crud.list_profiles(db, 0, 20),
+        "list_profiles deep offset": lambda: crud.list_profiles(
+            db, rng.randint(0, max(0, profile_count - 20)), 20),
+        "list_profiles_after": lambda: crud.list_profiles_after(
+            db, rng.randint(0, profile_count), 20),
+        "search one skill": lambda: crud.search_profiles_by_skills(
+            db, [rng.choice(CANONICAL)]),
+        "search all of two": lambda: crud.search_profiles_by_skills(
+            db, rng.sample(CANONICAL, 2), match="all"),
+        "search any of three": lambda: crud.search_profiles_by_skills(
+            db, rng.sample(CANONICAL, 3), match="any"),
+        "search text": lambda: crud.search_profiles_by_text(
+            db, " ".join(rng.sample(text_queries, 2))),
+        "get_profile_for_update": lambda: crud.get_profile_for_update(
+            db, rng.randint(1, profile_count)),
+        "similar_profiles": lambda: similar.similar_profiles(
+            db, rng.randint(1, profile_count), version=etags.current_version(db)),
+        "create_profile": lambda: crud.create_profile(db, next(new_profiles)),
+        "update_profile": update,
+        "extract_skills_from_text": lambda: crud.extract_skills_from_text(text),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="SQLite file to seed or reuse")
+    parser.add_argument("--only", help="run benchmarks whose name contains this")
+    parser.add_argument("--out", help="result file (default benchmarks/results/)")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    path = args.db or os.path.join(tmp.name, "bench.db")
+    # database.py reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    import migrations
+    import models
+    from benchmarks.datagen import seed_database
+    from database import SessionLocal, engine
+
+    migrations.migrate(engine)
+
+    db = SessionLocal()
+    try:
+        profile_count = db.query(models.Profile).count()
+        if not profile_count:
+            print(f"seeding {args.profiles} profiles ...")
+            profile_count = seed_database(db, args.profiles, args.seed)
+        print(f"{profile_count} profiles, {args.repeat} calls each")
+
+        results = {}
+        for name, fn in benchmarks(db, profile_count, args.seed).items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = time_calls(fn, args.repeat)
+            print(format_row(name, results[name]))
+    finally:
+        db.close()
+        tmp.cleanup()
+
+    params = {"profiles": profile_count, "repeat": args.repeat, "seed": args.seed}
+    print("saved", save_results("crud", params, results, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+In-process HTTP load driver for the profile API.
+
+    python -m benchmarks.bench_http [--profiles N] [--requests N] [--concurrency N]
+                                    [--db PATH] [--no-cache] [--out FILE]
+
+Requests go through the full ASGI app (middleware, auth, validation,
+serialization) via httpx's ASGI transport, with --concurrency clients
+sharing a queue of --requests requests per endpoint. Throughput and
+p50/p95/p99 latency are reported per endpoint and saved as JSON.
+
+Rate limits are raised out of the way for the run; --no-cache disables
+the read cache so list and search numbers reflect the database.
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.harness import format_row, save_results, summarize
+
+AUTH = {"Authorization": "Basic " + base64.b64encode(b"Predusk:tracka").decode()}
+
+
+def scenarios(profile_count: int, seed: int):
+    """
+    name -> function(rng) returning (method, url, json body or None).
+    """
+    from benchmarks.datagen import CANONICAL, generate_profiles
+    from pagination import encode_cursor
+
+    new_profiles = generate_profiles(10**9, seed + 1, start=profile_count)
+    pages = max(1, profile_count // 20)
+
+    def create(rng):
+        return "POST", "/profile", next(new_profiles).model_dump()
+
+    return {
+        "GET /profiles": lambda rng: (
+            "GET", f"/profiles?page={rng.randint(1, min(pages, 50))}&size=20", None),
+        "GET /profiles?cursor": lambda rng: (
+            "GET", f"/profiles?size=20&cursor={encode_cursor(rng.randint(1, profile_count))}", None),
+        "GET /profiles/search": lambda rng: (
+            "GET", f"/profiles/search?skill={rng.choice(CANONICAL)}", None),
+        "GET /profiles/search all": lambda rng: (
+            "GET", "/profiles/search?match=all&"
+            + "&".join(f"skill={s}" for s in rng.sample(CANONICAL, 2)), None),
+        "GET /profiles/search/text": lambda rng: (
+            "GET", "/profiles/search/text?q="
+            + rng.choice(["computer+vision+intern", "backend+engineer", "raspbery+pi", "dashbo"]), None),
+        "GET /profile/{id}/edit": lambda rng: (
+            "GET", f"/profile/{rng.randint(1, profile_count)}/edit", None),
+        "GET /profiles/batch": lambda rng: (
+            "GET", "/profiles/batch?ids="
+            + ",".join(str(rng.randint(1, profile_count)) for _ in range(20)), None),
+        "POST /profile": create,
+    }
+
+
+async def drive(app, make_request, total: int, concurrency: int, seed: int = 0) -> dict:
+    """
+    Sends `total` requests built by make_request(rng) from `concurrency`
+    concurrent clients and summarizes their latencies.
+    """
+    import httpx
+
+    # httpx logs every request at INFO through the app's root handler
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rng = random.Random(seed)
+    requests = [make_request(rng) for _ in range(total)]
+    queue = iter(requests)
+    latencies = []
+
+    async def client_loop(client):
+        for method, url, body in queue:
+            start = time.perf_counter()
+            res = await client.request(method, url, json=body, headers=AUTH)
+            latencies.append(time.perf_counter() - start)
+            if res.status_code >= 400:
+                raise RuntimeError(f"{method} {url} -> {res.status_code}: {res.text[:200]}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[client_loop(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="SQLite file to seed or reuse")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--only", help="run endpoints whose name contains this")
+    parser.add_argument("--out", help="result file (default benchmarks/results/)")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    path = args.db or os.path.join(tmp.name, "bench.db")
+    # All of these are read at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["RATE_LIMIT_DB"] = os.path.join(tmp.name, "ratelimit.db")
+    os.environ["RATE_LIMITS"] = "create_profile=1000000000/second"
+    if args.no_cache:
+        os.environ["READ_CACHE_SIZE"] = "0"
+
+    import migrations
+    import models
+    from benchmarks.datagen import seed_database
+    from database import SessionLocal, engine
+    from main import app
+
+    migrations.migrate(engine)
+
+    db = SessionLocal()
+    try:
+        profile_count = db.query(models.Profile).count()
+        if not profile_count:
+            print(f"seeding {args.profiles} profiles ...")
+            profile_count = seed_database(db, args.profiles, args.seed)
+    finally:
+        db.close()
+    print(f"{profile_count} profiles, {args.requests} requests per endpoint, "
+          f"{args.concurrency} concurrent clients")
+
+    results = {}
+    try:
+        for name, make_request in scenarios(profile_count, args.seed).items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = asyncio.run(
+                drive(app, make_request, args.requests, args.concurrency, args.seed)
+            )
+            print(format_row(name, results[name]))
+    finally:
+        tmp.cleanup()
+
+    params = {
+        "profiles": profile_count, "requests": args.requests,
+        "concurrency": args.concurrency, "seed": args.seed,
+        "read_cache": not args.no_cache,
+    }
+    print("saved", save_results("http", params, results, args.out))
+
+
+if __name__ == "__main__":
+    main()
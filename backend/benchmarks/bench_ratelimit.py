@@ -0,0 +1,40 @@
+"""
+Per-request overhead of the shared SQLite token-bucket limiter.
+
+    python -m benchmarks.bench_ratelimit [--calls N]
+
+Measures one check-and-consume (a BEGIN IMMEDIATE transaction on the
+bucket file) for a single hot key and for many distinct clients.
+"""
+
+import argparse
+import tempfile
+import time
+
+from ratelimit import SQLiteBucketStore
+
+
+def run(store, keys, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        store.consume(keys[i % len(keys)], 1_000_000, 60)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteBucketStore(f"{tmp}/bench.db")
+        for label, keys in (
+            ("single client", ["create_profile:1.2.3.4"]),
+            ("10k clients", [f"create_profile:10.0.{i // 256}.{i % 256}" for i in range(10_000)]),
+        ):
+            per_call = run(store, keys, args.calls)
+            print(f"{label:<14} {per_call * 1e6:8.1f} us per check")
+
+
+if __name__ == "__main__":
+    main()
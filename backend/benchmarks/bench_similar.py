@@ -0,0 +1,102 @@
+"""
+Micro-benchmark: top-k similar profiles on the in-memory skill matrix
+(similar.SkillMatrix) against a Python loop over every profile's skill
+set.
+
+    python -m benchmarks.bench_similar [--profiles N] [--repeat N] [--k N] [--out FILE]
+
+Skill sets come from the seeded profile generator, so popular skills
+are on most profiles and a query touches a large share of them. Also
+timed: building the matrix from (profile_id, skill_id) pairs, as a
+reload does, and applying one profile update.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.harness import format_row, save_results, summarize, time_calls
+
+
+def skill_sets(count: int, seed: int) -> dict[int, set[int]]:
+    """
+    profile_id -> set of skill ids for `count` generated profiles.
+    """
+    import crud
+    from benchmarks.datagen import generate_profiles
+
+    ids = {}
+    sets = {}
+    for profile_id, profile in enumerate(generate_profiles(count, seed), start=1):
+        names = {crud.normalize_skill_name(name) for name in profile.skills}
+        sets[profile_id] = {ids.setdefault(name, len(ids) + 1) for name in names}
+    return sets
+
+
+def loop_top_k(sets: dict[int, set[int]], profile_id: int, k: int) -> list[tuple[int, float]]:
+    """
+    The straightforward version: score every other profile in Python.
+    """
+    mine = sets[profile_id]
+    scores = [
+        (len(mine & theirs) / (len(mine) * len(theirs)) ** 0.5, other)
+        for other, theirs in sets.items()
+        if other != profile_id and not mine.isdisjoint(theirs)
+    ]
+    scores.sort(key=lambda hit: (-hit[0], hit[1]))
+    return [(other, score) for score, other in scores[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="result file (default benchmarks/results/)")
+    args = parser.parse_args()
+
+    from similar import SkillMatrix
+
+    print(f"generating {args.profiles} skill sets ...")
+    sets = skill_sets(args.profiles, args.seed)
+    pairs = np.array([(p, s) for p, skills in sets.items() for s in skills], dtype=np.int64)
+    print(f"{args.profiles} profiles, {len(pairs)} profile-skill pairs, {len(set(pairs[:, 1].tolist()))} skills")
+
+    matrix = SkillMatrix()
+    results = {}
+
+    started = time.perf_counter()
+    matrix.load(pairs, version=1)
+    results["load matrix"] = summarize([time.perf_counter() - started], time.perf_counter() - started)
+    print(format_row("load matrix", results["load matrix"]))
+
+    rng = random.Random(args.seed)
+    profile_ids = list(sets)
+    skill_ids = sorted(set(pairs[:, 1].tolist()))
+    version = iter(range(2, 10**9))
+
+    def update():
+        profile_id = rng.choice(profile_ids)
+        matrix.apply({profile_id: rng.sample(skill_ids, 3)}, next(version))
+
+    benchmarks = {
+        "top_k cosine": lambda: matrix.top_k(rng.choice(profile_ids), args.k, "cosine"),
+        "top_k jaccard": lambda: matrix.top_k(rng.choice(profile_ids), args.k, "jaccard"),
+        "apply one update": update,
+        # Much slower; fewer calls keep the run short
+        "python loop cosine": lambda: loop_top_k(sets, rng.choice(profile_ids), args.k),
+    }
+    for name, fn in benchmarks.items():
+        repeat = args.repeat if "loop" not in name else max(5, args.repeat // 50)
+        results[name] = time_calls(fn, repeat)
+        print(format_row(name, results[name]))
+
+    params = {"profiles": args.profiles, "repeat": args.repeat, "k": args.k, "seed": args.seed}
+    print("saved", save_results("similar", params, results, args.out))
+
+
+if __name__ == "__main__":
+    main()
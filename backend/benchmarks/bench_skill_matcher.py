@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: compiled SkillMatcher vs the original linear scans
+over FaLLBACKS in normalize_skill_name / extract_skills_from_text.
+
+    python -m benchmarks.bench_skill_matcher [--repeat N]
+
+Text benchmarks use descriptions where ~5% of words are skill aliases,
+and are repeated with synthetic alias tables of growing size to show
+how each approach scales with the dictionary.
+"""
+
+import argparse
+import random
+import timeit
+
+from fallbacks import FaLLBACKS
+from skill_matcher import SkillMatcher
+
+
+# ---------------- ORIGINAL IMPLEMENTATIONS ----------------
+def legacy_normalize(skill: str, aliases=FaLLBACKS) -> str:
+    skill_clean = skill.strip().lower()
+    for canonical, words in aliases.items():
+        if skill_clean == canonical:
+            return canonical
+        if skill_clean in words:
+            return canonical
+    return skill_clean
+
+
+def legacy_extract(text: str, aliases=FaLLBACKS) -> set[str]:
+    if not text:
+        return set()
+    text = text.lower()
+    detected = set()
+    for canonical, keywords in aliases.items():
+        for keyword in keywords:
+            if keyword in text:
+                detected.add(canonical)
+    return detected
+
+
+# ---------------- INPUTS ----------------
+FILLER = (
+    "built a happy path email service with a responsive dashboard "
+    "and a pipeline that handles retries, caching and monitoring for "
+    "thousands of daily users across several regions"
+).split()
+
+
+def make_aliases(extra: int) -> dict[str, list[str]]:
+    aliases = dict(FaLLBACKS)
+    for i in range(extra):
+        aliases[f"skill {i}"] = [f"tool{i}", f"framework{i} kit"]
+    return aliases
+
+
+def make_description(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    vocab = [a for aliases in FaLLBACKS.values() for a in aliases]
+    return " ".join(
+        rng.choice(vocab) if rng.random() < 0.05 else rng.choice(FILLER)
+        for _ in range(words)
+    )
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    seconds = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+    print(f"{label:<48} {seconds * 1e6:>12.2f} us/call")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in (0, 500, 2000):
+        aliases = make_aliases(size)
+        matcher = SkillMatcher(aliases)
+        print(f"\n--- alias table: {len(aliases)} skills ---")
+
+        for skill in ("K8s", "unknown-skill"):
+            bench(f"legacy  normalize({skill!r})",
+                  lambda: legacy_normalize(skill, aliases), args.repeat * 10)
+            bench(f"matcher normalize({skill!r})",
+                  lambda: matcher.normalize(skill), args.repeat * 10)
+
+        for words in (30, 500, 20_000):
+            text = make_description(words)
+            repeat = max(3, args.repeat * 30 // words)
+            old = bench(f"legacy  extract({words} words)",
+                        lambda: legacy_extract(text, aliases), repeat)
+            new = bench(f"matcher extract({words} words)",
+                        lambda: matcher.extract(text), repeat)
+            print(f"{'':<48} {old / new:>11.1f}x")
+
+    sample = "Happy email pipeline with a simple dashboard"
+    print("\nfalse positives on", repr(sample))
+    print("  legacy :", sorted(legacy_extract(sample)))
+    print("  matcher:", sorted(SkillMatcher(FaLLBACKS).extract(sample)))
+
+
+if __name__ == "__main__":
+    main()
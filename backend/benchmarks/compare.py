@@ -0,0 +1,62 @@
+"""
+Compares two benchmark result files, e.g. from two commits.
+
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+
+Prints the relative change in throughput and p95/p99 latency for every
+benchmark present in both files, and exits with status 1 when any of
+them regressed by more than `threshold` percent.
+"""
+
+import argparse
+import sys
+
+from benchmarks.harness import load_results
+
+# metric -> True when higher is better
+METRICS = {"rps": True, "p95_ms": False, "p99_ms": False}
+
+
+def regressions(base: dict, head: dict, threshold: float) -> list[tuple[str, str, float]]:
+    """
+    Returns (benchmark, metric, percent change) for every metric that
+    got worse by more than `threshold` percent.
+    """
+    worse = []
+    for name in sorted(base["results"].keys() & head["results"].keys()):
+        old, new = base["results"][name], head["results"][name]
+        for metric, higher_is_better in METRICS.items():
+            if not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100
+            if (-change if higher_is_better else change) > threshold:
+                worse.append((name, metric, change))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent change that counts as a regression")
+    args = parser.parse_args()
+
+    base, head = load_results(args.base), load_results(args.head)
+    print(f"{base['suite']}: {base['commit']} -> {head['commit']}")
+    for name in sorted(base["results"].keys() & head["results"].keys()):
+        old, new = base["results"][name], head["results"][name]
+        cells = []
+        for metric in METRICS:
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            cells.append(f"{metric} {new[metric]:>9.2f} ({change:+6.1f}%)")
+        print(f"{name:<28} " + "   ".join(cells))
+
+    worse = regressions(base, head, args.threshold)
+    for name, metric, change in worse:
+        print(f"REGRESSION {name} {metric} {change:+.1f}%")
+    sys.exit(1 if worse else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Seeded synthetic profile generator.
+
+    python -m benchmarks.datagen --profiles 100000 [--seed N]
+
+Profiles draw their skills from the FaLLBACKS vocabulary (canonical
+names and the aliases users actually type, in mixed case) with a
+long-tailed popularity, and projects mention aliases in their
+descriptions and tech stacks so skill extraction has real work to do.
+The same seed always produces the same profiles.
+"""
+
+import argparse
+import random
+import time
+
+from fallbacks import FaLLBACKS
+from schemas import ProfileCreate
+
+FIRST_NAMES = [
+    "Aarav", "Ananya", "Ben", "Chen", "Diya", "Elena", "Farah", "Gabriel",
+    "Hana", "Ivan", "Jia", "Kabir", "Lena", "Mateo", "Meera", "Noah",
+    "Olu", "Priya", "Rohan", "Sara", "Tomas", "Uma", "Vikram", "Yuki",
+]
+LAST_NAMES = [
+    "Sharma", "Smith", "Wang", "Garcia", "Khan", "Novak", "Okafor", "Patel",
+    "Rossi", "Silva", "Tanaka", "Ivanova", "Mehta", "Nguyen", "Kim", "Singh",
+]
+EDUCATION = [
+    "BTech CSE", "BSc Computer Science", "MSc Data Science", "BE IT",
+    "MTech AI", "BCA", None,
+]
+WORK = [
+    "ML Intern at FUDR", "Backend Engineer", "Data Analyst", "SDE-1",
+    "Freelancer", "Research Assistant", None,
+]
+PROJECT_TOPICS = [
+    "Forest Fire Detection", "Retail Shelf Monitor", "Resume Parser",
+    "Chat Assistant", "Traffic Counter", "Crop Disease Classifier",
+    "Expense Tracker", "Smart Home Hub", "Log Analyzer", "Quiz Platform",
+]
+FILLER = [
+    "built", "a", "service", "that", "handles", "user", "requests", "with",
+    "low", "latency", "and", "a", "simple", "dashboard", "for", "monitoring",
+]
+
+CANONICAL = list(FaLLBACKS)
+ALIASES = [alias for aliases in FaLLBACKS.values() for alias in aliases]
+# Skills outside the dictionary, as users add them
+EXTRA_SKILLS = ["Git", "Linux", "React", "Rust", "Go", "Java", "Pandas", "Figma"]
+
+
+def _styled(rng: random.Random, skill: str) -> str:
+    """
+    Writes a skill the way users do: lower, Title or UPPER case.
+    """
+    return rng.choice((skill, skill.title(), skill.upper()))
+
+
+def _pick_skills(rng: random.Random, weights: list[float]) -> list[str]:
+    count = rng.randint(1, 6)
+    picked = {s for s in rng.choices(CANONICAL + EXTRA_SKILLS, weights, k=count)}
+    # Some skills are entered by alias rather than canonical name
+    if rng.random() < 0.3:
+        picked.add(rng.choice(ALIASES))
+    return [_styled(rng, s) for s in sorted(picked)]
+
+
+def _project(rng: random.Random) -> dict:
+    words = rng.sample(FILLER, 8) + rng.sample(ALIASES, rng.randint(1, 3))
+    rng.shuffle(words)
+    return {
+        "title": f"{rng.choice(PROJECT_TOPICS)} {rng.randint(1, 99)}",
+        "description": " ".join(words),
+        "tech_stack": ", ".join(_styled(rng, a) for a in rng.sample(ALIASES, rng.randint(1, 4))),
+    }
+
+
+def generate_profiles(count: int, seed: int = 0, start: int = 0):
+    """
+    Yields `count` ProfileCreate objects with unique emails. Profile i
+    gets the email user{start + i}@example.com, so several calls with
+    different `start` values never collide.
+    """
+    rng = random.Random(seed)
+    # Zipf-like popularity: a few skills appear on most profiles
+    vocab = CANONICAL + EXTRA_SKILLS
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    rng.shuffle(weights)
+
+    for i in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield ProfileCreate(
+            name=f"{first} {last}",
+            email=f"user{i}@example.com",
+            education=rng.choice(EDUCATION),
+            work=rng.choice(WORK),
+            links=f"GitHub: https://github.com/{first.lower()}{i}",
+            skills=_pick_skills(rng, weights),
+            projects=[_project(rng) for _ in range(rng.randint(0, 3))],
+        )
+
+
+def seed_database(db, count: int, seed: int = 0, chunk_size: int = 1000) -> int:
+    """
+    Inserts `count` generated profiles through crud.create_profiles_bulk,
+    committing every `chunk_size`. Returns the number of profiles created.
+    """
+    import crud
+
+    created = 0
+    chunk = []
+    for i, profile in enumerate(generate_profiles(count, seed)):
+        chunk.append((i, profile))
+        if len(chunk) == chunk_size:
+            created += sum(r["status"] == "created" for r in crud.create_profiles_bulk(db, chunk))
+            chunk = []
+    if chunk:
+        created += sum(r["status"] == "created" for r in crud.create_profiles_bulk(db, chunk))
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from main import app  # noqa: F401  creates the schema
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        created = seed_database(db, args.profiles, args.seed)
+        print(f"created {created} profiles in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
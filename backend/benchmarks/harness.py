@@ -0,0 +1,94 @@
+"""
+Shared timing, reporting and result-file helpers for the benchmarks.
+
+Result files are JSON:
+    {"suite": ..., "commit": ..., "created": ..., "params": {...},
+     "results": {name: {"count", "rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}}}
+and can be compared between commits with `python -m benchmarks.compare`.
+"""
+
+import json
+import os
+import subprocess
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """
+    Throughput and latency percentiles (in ms) for one benchmark.
+    """
+    return {
+        "count": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def time_calls(fn, repeat: int, warmup: int = 3) -> dict:
+    """
+    Calls fn() `repeat` times back to back and summarizes the latencies.
+    """
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<28} {result['rps']:>10.1f}/s   p50 {result['p50_ms']:>8.2f} ms"
+        f"   p95 {result['p95_ms']:>8.2f} ms   p99 {result['p99_ms']:>8.2f} ms"
+    )
+
+
+def current_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=os.path.dirname(__file__),
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def save_results(suite: str, params: dict, results: dict, path: str | None = None) -> str:
+    """
+    Writes a result file and returns its path. By default it goes to
+    benchmarks/results/<suite>-<commit>.json.
+    """
+    commit = current_commit()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{suite}-{commit or 'nocommit'}.json")
+
+    with open(path, "w") as f:
+        json.dump({
+            "suite": suite,
+            "commit": commit,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "params": params,
+            "results": results,
+        }, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,117 @@
+"""
+Streaming NDJSON bulk import.
+
+The request body is read incrementally, one line per ProfileCreate.
+Lines are validated as they arrive and written in chunks, each chunk
+in its own transaction (see crud.create_profiles_bulk). The per-line
+report is written to a spooled temporary file (spills to disk past
+REPORT_SPOOL_BYTES) and streamed back once the body is consumed, so
+memory stays bounded by the chunk size, not the upload size.
+
+The body is read in the handler, not inside the StreamingResponse:
+Starlette's disconnect listener reads from the same receive channel
+while a response streams, and would swallow the body messages.
+"""
+
+import json
+from typing import AsyncIterator, BinaryIO
+
+from pydantic import ValidationError
+
+import crud_async
+from schemas import ProfileCreate
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+
+# A single line larger than this is rejected without being buffered
+MAX_LINE_BYTES = 1024 * 1024
+
+# Report size kept in memory before spilling to a temp file
+REPORT_SPOOL_BYTES = 1024 * 1024
+
+
+async def ndjson_lines(stream: AsyncIterator[bytes]):
+    """
+    Yields (line number, raw line) for every non-blank line of the body.
+    Oversized lines are yielded as None.
+    """
+    buffer = b""
+    line_no = 0
+    oversized = False
+
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+
+        for line in lines:
+            line_no += 1
+            if oversized:
+                oversized = False
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line
+
+        if len(buffer) > MAX_LINE_BYTES:
+            oversized = True
+            buffer = b""
+
+    if oversized:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, buffer
+
+
+def _error(line_no: int, errors: list) -> dict:
+    return {"line": line_no, "status": "error", "errors": errors}
+
+
+async def import_profiles(
+    stream: AsyncIterator[bytes], db, chunk_size: int, report: BinaryIO
+) -> dict:
+    """
+    Consumes the NDJSON body, writing the NDJSON report to `report`:
+    one entry per line, then a final summary line. Returns the summary.
+    """
+    summary = {"created": 0, "duplicate": 0, "error": 0}
+    chunk, pending = [], []
+
+    async def flush():
+        entries = pending + await crud_async.create_profiles_bulk(db, chunk)
+        chunk.clear()
+        pending.clear()
+        for entry in sorted(entries, key=lambda e: e["line"]):
+            summary[entry["status"]] += 1
+            report.write((json.dumps(entry) + "\n").encode())
+
+    async for line_no, line in ndjson_lines(stream):
+        if line is None:
+            pending.append(_error(line_no, [{"msg": "Line too long"}]))
+        else:
+            try:
+                chunk.append((line_no, ProfileCreate.model_validate_json(line)))
+            except ValidationError as exc:
+                pending.append(_error(line_no, [
+                    {"loc": list(e["loc"]), "msg": e["msg"]}
+                    for e in exc.errors()
+                ]))
+
+        if len(chunk) + len(pending) >= chunk_size:
+            await flush()
+
+    if chunk or pending:
+        await flush()
+
+    report.write((json.dumps({"summary": summary}) + "\n").encode())
+    return summary
+
+
+def iter_report(report: BinaryIO):
+    """
+    Streams a finished report back line by line, then closes it.
+    """
+    try:
+        report.seek(0)
+        yield from report
+    finally:
+        report.close()
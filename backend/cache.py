@@ -0,0 +1,151 @@
+"""
+In-process read cache for list and search results.
+
+Most traffic is the same few searches and the first /profiles pages,
+while data only changes when a profile is written. Results are kept in
+a size-bounded LRU with a TTL and keyed on the normalized request plus
+a data generation counter.
+
+crud marks a session when it writes profiles (mark_changed); when that
+session commits, the generation is bumped, so every cached entry is
+invalidated at once without scanning the cache. Entries stored under an
+old generation simply age out of the LRU.
+
+Concurrent misses for the same key are coalesced (singleflight.py):
+one request runs the query and the others await its result.
+
+The cache is per process. Routes put the database data version (see
+etags.py) into their keys, so writes made by another worker are picked
+up on the next request rather than when the TTL expires.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from singleflight import Group
+
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "1024"))
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "30"))
+
+_CHANGED = "profiles_changed"
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.flights = Group()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns (hit, value) for a key under the current generation.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get((self.generation, key))
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end((self.generation, key))
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, generation: int):
+        """
+        Stores a value computed while `generation` was current. If a
+        write committed in the meantime the entry is never served.
+        """
+        with self._lock:
+            self._data[(generation, key)] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end((generation, key))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def get_or_load(self, key, loader):
+        """
+        Returns the cached value, or awaits loader() and caches its
+        result. Concurrent misses for `key` share one loader() call.
+        """
+        generation = self.generation
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        async def load():
+            value = await loader()
+            self.set(key, value, generation)
+            return value
+
+        return await self.flights.do((generation, key), load)
+
+    async def coalesce(self, key, loader):
+        """
+        Shares one loader() call between concurrent requests for `key`
+        without caching the result, for reads that must be fresh.
+        """
+        return await self.flights.do((self.generation, key), loader)
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+            self.hits = self.misses = 0
+        self.flights.reset()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "generation": self.generation,
+                "loads": self.flights.loads,
+                "coalesced": self.flights.coalesced,
+            }
+
+
+read_cache = TTLCache(READ_CACHE_SIZE, READ_CACHE_TTL)
+
+
+def mark_changed(db: Session):
+    """
+    Called by crud when a session writes profile data.
+    """
+    db.info[_CHANGED] = True
+
+
+def changed(db: Session) -> bool:
+    return db.info.get(_CHANGED, False)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_CHANGED, False):
+        read_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop(_CHANGED, None)
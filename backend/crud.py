@@ -6,36 +6,110 @@ Separating CRUD logic from API routes:
 - Improves maintainability
 - Follows service-layer architecture
 """
-from fallbacks import FaLLBACKS
-from sqlalchemy import or_
+import skill_matcher
+from sqlalchemy import or_, distinct, func, literal, select, union_all
 
 
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 
-from sqlalchemy.orm import Session
-from models import Profile, Skill, Project
-from schemas import ProfileCreate
+from sqlalchemy.orm import Session, selectinload
+import aliases
+import cache
+import fulltext
+from fieldsets import COLUMN_FIELDS, DEFAULT_FIELDS
+from models import Profile, Skill, Project, profile_skills
+from schemas import ProfileCreate, ProfilePatch, ProfileUpdate
 
-def get_or_create_skill(db: Session, name: str):
+def _insert_ignore(db: Session, model):
+    """
+    INSERT ... ON CONFLICT DO NOTHING for the current dialect.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model).on_conflict_do_nothing()
+
+
+def get_or_create_skills(db: Session, names) -> list[Skill]:
     """
     Normalizes skill names before storing to avoid duplicates
-    like 'AI', 'ai', 'Artificial Intelligence'.
+    like 'AI', 'ai', 'Artificial Intelligence', and resolves them
+    to Skill rows in bulk.
+
+    One SELECT ... IN finds existing skills and one multi-row
+    INSERT ... ON CONFLICT DO NOTHING adds the missing ones, all inside
+    the caller's transaction (nothing is committed here). A concurrent
+    writer adding the same new skill just makes our insert a no-op.
     """
-    canonical_name = normalize_skill_name(name)
+    canonical_names = {normalize_skill_name(name) for name in names} - {""}
+    if not canonical_names:
+        return []
+
+    skills = db.query(Skill).filter(Skill.name.in_(canonical_names)).all()
+    missing = canonical_names - {s.name for s in skills}
+
+    if missing:
+        db.execute(
+            _insert_ignore(db, Skill),
+            [{"name": name} for name in sorted(missing)]
+        )
+        skills += db.query(Skill).filter(Skill.name.in_(missing)).all()
+
+    return skills
 
-    skill = db.query(Skill).filter(Skill.name == canonical_name).first()
 
-    if not skill:
-        skill = Skill(name=canonical_name)
-        db.add(skill)
+def _commit_new_profile(db: Session, profile: Profile):
+    """
+    Commits a new profile together with its skills, or rolls everything
+    back (no orphan skills) when the email is already taken.
+    """
+    try:
         db.commit()
-        db.refresh(skill)
+    except IntegrityError as exc:
+        db.rollback()
+        if "profiles.email" in str(exc.orig):
+            raise HTTPException(status_code=400, detail="Email already exists")
+        raise
+    db.refresh(profile)
 
-    return skill
 
+def explicit_skill_names(skills) -> set[str]:
+    """
+    Canonical names of skills listed by the user.
+    """
+    return {normalize_skill_name(skill) for skill in skills} - {""}
 
-def create_profile(db: Session, data: ProfileCreate):
+
+def project_skill_names(project) -> set[str]:
+    """
+    Canonical skills inferred from one project's tech stack and description.
+    """
+    return (
+        extract_skills_from_text(project.tech_stack)
+        | extract_skills_from_text(project.description)
+    )
+
+
+def skill_sources(data: ProfileCreate) -> tuple[set[str], list[set[str]]]:
+    """
+    Skills of a new profile by source: explicit ones, and those
+    inferred from each of its projects (in order).
+    """
+    return (
+        explicit_skill_names(data.skills),
+        [project_skill_names(proj) for proj in data.projects]
+    )
+
+
+def all_skill_names(sources) -> set[str]:
+    explicit, per_project = sources
+    return explicit.union(*per_project)
+
+
+def _new_profile(data: ProfileCreate, sources, skills: dict[str, Skill]) -> Profile:
+    explicit, per_project = sources
     profile = Profile(
         name=data.name,
         email=data.email,
@@ -43,171 +117,681 @@ def create_profile(db: Session, data: ProfileCreate):
         work=data.work,
         links=data.links
     )
+    profile.explicit_skills.extend(
+        skills[name] for name in sorted(explicit.difference(*per_project))
+    )
+    profile.skills.extend(skills[name] for name in sorted(all_skill_names(sources)))
 
-    # 1 Skills explicitly provided by user
-    explicit_skills = set()
-    for skill_name in data.skills:
-        canonical = normalize_skill_name(skill_name)
-        explicit_skills.add(canonical)
-
-    # 2 Skills inferred from projects
-    inferred_skills = set()
-
-    for proj in data.projects:
-        inferred_skills |= extract_skills_from_text(proj.tech_stack)
-        inferred_skills |= extract_skills_from_text(proj.description)
-
-    # 3 Combine both
-    all_skills = explicit_skills | inferred_skills
-
-    # 4 Attach skills to profile
-    for skill_name in all_skills:
-        skill = get_or_create_skill(db, skill_name)
-        profile.skills.append(skill)
-
-    # 5 Attach projects
-    for proj in data.projects:
+    for proj, names in zip(data.projects, per_project):
         project = Project(
             title=proj.title,
             description=proj.description,
             tech_stack=proj.tech_stack
         )
+        project.skills.extend(skills[name] for name in sorted(names))
         profile.projects.append(project)
 
+    return profile
+
+
+def create_profile(db: Session, data: ProfileCreate):
+    aliases.refresh(db)
+    # Skills are resolved in bulk before the profile joins the session
+    sources = skill_sources(data)
+    skills = {
+        skill.name: skill
+        for skill in get_or_create_skills(db, all_skill_names(sources))
+    }
+
+    profile = _new_profile(data, sources, skills)
     db.add(profile)
-    db.commit()
-    db.refresh(profile)
+    cache.mark_changed(db)
+
+    _commit_new_profile(db, profile)
 
     return profile
 
 
+def create_profiles_bulk(db: Session, items: list[tuple[int, ProfileCreate]]) -> list[dict]:
+    """
+    Creates a chunk of (line number, profile) items in one transaction.
+
+    Skills for the whole chunk are resolved with a single bulk upsert.
+    Emails that already exist (or repeat within the chunk) are reported
+    as duplicates instead of failing the chunk. Returns one report entry
+    per item, in input order.
+    """
+    aliases.refresh(db)
+    emails = {data.email for _, data in items}
+    taken = {
+        email for (email,) in
+        db.query(Profile.email).filter(Profile.email.in_(emails))
+    }
+
+    report, accepted = [], []
+    for line, data in items:
+        if data.email in taken:
+            report.append({"line": line, "status": "duplicate", "email": data.email})
+        else:
+            taken.add(data.email)
+            accepted.append((line, data))
+
+    sources = {line: skill_sources(data) for line, data in accepted}
+    skills = {
+        skill.name: skill
+        for skill in get_or_create_skills(
+            db, set().union(*map(all_skill_names, sources.values()))
+        )
+    }
+
+    created = []
+    for line, data in accepted:
+        profile = _new_profile(data, sources[line], skills)
+        db.add(profile)
+        created.append((line, profile))
+    cache.mark_changed(db)
+
+    try:
+        db.flush()
+        report += [
+            {"line": line, "status": "created", "id": profile.id}
+            for line, profile in created
+        ]
+        db.commit()
+    except IntegrityError:
+        # Lost a race on an email; redo this chunk one profile at a time
+        db.rollback()
+        report = [entry for entry in report if entry["status"] == "duplicate"]
+        for line, data in accepted:
+            try:
+                profile = create_profile(db, data)
+                report.append({"line": line, "status": "created", "id": profile.id})
+            except HTTPException:
+                report.append({"line": line, "status": "duplicate", "email": data.email})
+
+    return sorted(report, key=lambda entry: entry["line"])
+
+
 def get_all_profiles(db: Session):
     """
     Returns all profiles stored in the system.
     """
     return db.query(Profile).all()
 
-def search_profiles_by_skill(db: Session, skill: str):
+
+# ---------------- READ MODEL ----------------
+# Read endpoints never touch lazy relationships. Each page is resolved
+# with a fixed number of queries (profile columns + one batched skill
+# lookup) and handed back as plain dicts, so page size does not
+# multiply DB round-trips.
+
+def get_skills_for_profiles(db: Session, profile_ids) -> dict[int, list[str]]:
     """
-    Searches profiles using skill aliases and canonical names.
+    Returns {profile_id: [skill names]} for all given profiles
+    using a single query over the association table.
+    """
+    skills = {pid: [] for pid in profile_ids}
+    if not skills:
+        return skills
+
+    rows = (
+        db.query(profile_skills.c.profile_id, Skill.name)
+        .join(Skill, Skill.id == profile_skills.c.skill_id)
+        .filter(profile_skills.c.profile_id.in_(list(skills)))
+        .order_by(Skill.name)
+        .all()
+    )
+    for profile_id, name in rows:
+        skills[profile_id].append(name)
+
+    return skills
+
+
+def _profile_columns(fields):
+    return [getattr(Profile, f) for f in COLUMN_FIELDS if f in fields]
+
+
+def _summary_rows(db: Session, profiles, fields=DEFAULT_FIELDS) -> list[dict]:
+    """
+    Turns profile rows into the public summary shape with only the
+    requested fields; skills and projects cost one batched query each,
+    and only when requested.
+    """
+    columns = [f for f in COLUMN_FIELDS if f in fields]
+    rows = [{f: getattr(p, f) for f in columns} for p in profiles]
+
+    ids = [p.id for p in profiles]
+    if "skills" in fields:
+        skills = get_skills_for_profiles(db, ids)
+        for row in rows:
+            row["skills"] = skills[row["id"]]
+    if "projects" in fields:
+        projects = get_projects_for_profiles(db, ids)
+        for row in rows:
+            row["projects"] = projects[row["id"]]
+
+    return rows
+
+
+def list_profiles(db: Session, offset: int = 0, limit: int = 10, fields=DEFAULT_FIELDS) -> list[dict]:
+    """
+    Returns one page of profile summaries in two queries.
+    """
+    profiles = (
+        db.query(*_profile_columns(fields))
+        .order_by(Profile.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return _summary_rows(db, profiles, fields)
+
+
+def list_profiles_after(db: Session, after_id: int = 0, limit: int = 10, fields=DEFAULT_FIELDS):
+    """
+    Keyset variant of list_profiles: returns the page of profiles with
+    id > after_id, plus the id to continue after (None on the last page).
+    Cost is an index seek regardless of how deep the page is.
+    """
+    profiles = (
+        db.query(*_profile_columns(fields))
+        .filter(Profile.id > after_id)
+        .order_by(Profile.id)
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_after = None
+    if len(profiles) > limit:
+        profiles = profiles[:limit]
+        next_after = profiles[-1].id
+
+    return _summary_rows(db, profiles, fields), next_after
+
+
+def get_profiles_by_ids(db: Session, profile_ids, fields=DEFAULT_FIELDS) -> dict:
+    """
+    Multi-get: the summaries of `profile_ids` in the order given, in one
+    query plus one per requested relation. Ids with no profile are
+    listed under "missing".
+    """
+    profile_ids = list(dict.fromkeys(profile_ids))
+    profiles = (
+        db.query(*_profile_columns(fields))
+        .filter(Profile.id.in_(profile_ids))
+        .all()
+    )
+    rows = {row["id"]: row for row in _summary_rows(db, profiles, fields)}
+    return {
+        "items": [rows[pid] for pid in profile_ids if pid in rows],
+        "missing": [pid for pid in profile_ids if pid not in rows],
+    }
+
+
+def get_projects_for_profiles(db: Session, profile_ids) -> dict[int, list[dict]]:
+    """
+    Returns {profile_id: [project dicts]} using a single query.
     """
-    normalized = normalize_skill_name(skill)
+    projects = {pid: [] for pid in profile_ids}
+    if not projects:
+        return projects
+
+    rows = (
+        db.query(Project.profile_id, Project.title, Project.description, Project.tech_stack)
+        .filter(Project.profile_id.in_(list(projects)))
+        .order_by(Project.id)
+        .all()
+    )
+    for row in rows:
+        projects[row.profile_id].append({
+            "title": row.title,
+            "description": row.description,
+            "tech_stack": row.tech_stack
+        })
 
-    possible_terms = {normalized}
+    return projects
 
-    # Add aliases if present
-    for canonical, aliases in FaLLBACKS.items():
-        if canonical == normalized:
-            possible_terms.update(aliases)
 
-    query = db.query(Profile).join(Profile.skills)
+def get_export_batch(db: Session, after_id: int, batch_size: int, skill_ids=None) -> list[dict]:
+    """
+    Returns up to batch_size full profiles (with skills and projects)
+    with id > after_id, in id order: a keyset seek on Profile.id plus
+    one skill and one project query.
+    """
+    query = db.query(
+        Profile.id, Profile.name, Profile.email,
+        Profile.education, Profile.work, Profile.links
+    )
+    if skill_ids is not None:
+        query = query.filter(Profile.id.in_(
+            select(profile_skills.c.profile_id)
+            .where(profile_skills.c.skill_id.in_(skill_ids))
+        ))
+
+    profiles = (
+        query.filter(Profile.id > after_id)
+        .order_by(Profile.id)
+        .limit(batch_size)
+        .all()
+    )
 
-    filters = [
-        Skill.name.ilike(f"%{term}%") for term in possible_terms
+    ids = [p.id for p in profiles]
+    skills = get_skills_for_profiles(db, ids)
+    projects = get_projects_for_profiles(db, ids)
+
+    return [
+        {
+            "id": p.id,
+            "name": p.name,
+            "email": p.email,
+            "education": p.education,
+            "work": p.work,
+            "links": p.links,
+            "skills": skills[p.id],
+            "projects": projects[p.id]
+        }
+        for p in profiles
     ]
 
-    return query.filter(or_(*filters)).all()
+
+def export_skill_ids(db: Session, skill: str | None):
+    """
+    Skill ids an export is restricted to, or None for no filter.
+    """
+    if skill is None:
+        return None
+    return set().union(*resolve_skill_ids(db, [skill]).values())
+
+
+def iter_profile_export(db: Session, batch_size: int = 500, skill: str | None = None):
+    """
+    Yields lists of full profiles in id order, batch_size at a time.
+
+    Each batch is a separate keyset query (see get_export_batch), so the
+    table is never loaded at once and no cursor stays open between batches.
+    """
+    skill_ids = export_skill_ids(db, skill)
+
+    after_id = 0
+    while True:
+        batch = get_export_batch(db, after_id, batch_size, skill_ids)
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1]["id"]
+
+
+def resolve_skill_ids(db: Session, skills: list[str]) -> dict[str, set[int]]:
+    """
+    Resolves each requested skill to the ids of matching rows in the
+    skills table, keyed by canonical name.
+
+    Canonical names and aliases are matched exactly in one query
+    (skills.name is unique, so this is an index lookup). Skills with no
+    exact match fall back to substring matching over the skill
+    vocabulary, which is tiny compared to profile_skills.
+    """
+    aliases.refresh(db)
+    terms_by_skill = {}
+    for skill in skills:
+        canonical = normalize_skill_name(skill)
+        if canonical:
+            terms_by_skill[canonical] = {canonical} | set(skill_matcher.matcher.aliases_for(canonical))
+
+    all_terms = set().union(*terms_by_skill.values())
+    ids_by_name = dict(
+        db.query(Skill.name, Skill.id).filter(Skill.name.in_(all_terms)).all()
+    ) if all_terms else {}
+
+    resolved = {}
+    for canonical, terms in terms_by_skill.items():
+        ids = {ids_by_name[t] for t in terms if t in ids_by_name}
+        if not ids:
+            ids = {
+                skill_id for (skill_id,) in db.query(Skill.id).filter(
+                    or_(*[Skill.name.ilike(f"%{term}%") for term in terms])
+                )
+            }
+        resolved[canonical] = ids
+
+    return resolved
+
+
+def search_profiles_by_skills(
+    db: Session, skills: list[str], match: str = "any", fields=DEFAULT_FIELDS
+) -> list[dict]:
+    """
+    Multi-skill search over the profile_skills inverted index.
+
+    match="any" returns profiles having at least one requested skill,
+    match="all" only those having every one. Results are ranked by how
+    many requested skills matched, then by id. Each profile appears once.
+    """
+    groups = list(resolve_skill_ids(db, skills).values())
+
+    if match == "all" and not all(groups):
+        return []
+    groups = [ids for ids in groups if ids]
+    if not groups:
+        return []
+
+    # One (profile_id, requested skill index) row per posting and group.
+    # Groups may share skill ids (substring fallback), so every group
+    # gets its own SELECT and counts independently towards the rank.
+    postings = union_all(*[
+        select(
+            profile_skills.c.profile_id,
+            literal(i).label("requested")
+        ).where(profile_skills.c.skill_id.in_(ids))
+        for i, ids in enumerate(groups)
+    ]).subquery()
+    matched = func.count(distinct(postings.c.requested)).label("matched")
+
+    columns = _profile_columns(fields)
+    query = (
+        db.query(*columns, matched)
+        .join(postings, postings.c.profile_id == Profile.id)
+        .group_by(*columns)
+    )
+    if match == "all":
+        query = query.having(matched == len(groups))
+
+    profiles = query.order_by(matched.desc(), Profile.id).all()
+
+    rows = _summary_rows(db, profiles, fields)
+    for row, p in zip(rows, profiles):
+        row["matched"] = p.matched
+
+    return rows
+
+
+def search_profiles_by_text(
+    db: Session, query: str, match: str = "any", limit: int = 20, fields=DEFAULT_FIELDS
+) -> list[dict]:
+    """
+    BM25-ranked full-text search over names, work, education, projects
+    and skills (see fulltext.py). Rows carry a score and a snippet.
+    """
+    connection = db.connection()
+    if not fulltext.is_enabled(connection):
+        raise HTTPException(status_code=501, detail="Full-text search is not available")
+
+    hits = fulltext.search(connection, query, match=match, limit=limit)
+    if not hits:
+        return []
+
+    found = {
+        p.id: p for p in
+        db.query(*_profile_columns(fields))
+        .filter(Profile.id.in_([hit["id"] for hit in hits]))
+    }
+    profiles = [found[hit["id"]] for hit in hits if hit["id"] in found]
+    rows = _summary_rows(db, profiles, fields)
+    by_id = {hit["id"]: hit for hit in hits}
+    for row in rows:
+        row["score"] = by_id[row["id"]]["score"]
+        row["snippet"] = by_id[row["id"]]["snippet"]
+
+    return rows
+
+
+def search_profiles_by_skill(db: Session, skill: str) -> list[dict]:
+    """
+    Searches profiles using skill aliases and canonical names.
+    """
+    return search_profiles_by_skills(db, [skill])
 
 def normalize_skill_name(skill: str) -> str:
     """
     Converts a skill input into its canonical form
-    using predefined aliases.
+    using predefined aliases (O(1) reverse alias lookup).
     """
-    skill_clean = skill.strip().lower()
+    return skill_matcher.matcher.normalize(skill)
 
-    for canonical, aliases in FaLLBACKS.items():
-        if skill_clean == canonical:
-            return canonical
-        if skill_clean in aliases:
-            return canonical
 
-    # If no alias found, return cleaned version
-    return skill_clean
 def extract_skills_from_text(text: str) -> set[str]:
     """
     Extracts skills from free text like tech stack or description
-    using keyword matching.
+    using word-boundary keyword matching in a single pass.
     """
-    if not text:
-        return set()
+    return skill_matcher.matcher.extract(text)
 
-    text = text.lower()
-    detected_skills = set()
+PROFILE_FIELDS = ("name", "education", "work", "links")
+PROJECT_FIELDS = ("title", "description", "tech_stack")
+PROJECT_TEXT_FIELDS = {"description", "tech_stack"}
 
-    for canonical, keywords in FaLLBACKS.items():
-        for keyword in keywords:
-            if keyword in text:
-                detected_skills.add(canonical)
 
-    return detected_skills
+def _load_for_update(db: Session, profile_id: int):
+    # Everything the diff needs, in one query per collection
+    return (
+        db.query(Profile)
+        .options(
+            selectinload(Profile.skills),
+            selectinload(Profile.explicit_skills),
+            selectinload(Profile.projects).selectinload(Project.skills),
+        )
+        .filter(Profile.id == profile_id)
+        .first()
+    )
+
+
+def _bootstrap_skill_sources(db: Session, profile: Profile):
+    """
+    Profiles created before skill provenance was recorded have skills
+    but no explicit/project rows. Their project skills are inferred once,
+    and whatever the projects don't explain is taken as explicit.
+    """
+    if not profile.skills or profile.explicit_skills or any(p.skills for p in profile.projects):
+        return
+
+    by_name = {skill.name: skill for skill in profile.skills}
+    per_project = [project_skill_names(project) for project in profile.projects]
+    missing = set().union(*per_project) - set(by_name)
+    by_name.update((s.name, s) for s in get_or_create_skills(db, missing))
+
+    for project, names in zip(profile.projects, per_project):
+        project.skills = [by_name[name] for name in sorted(names)]
+    inferred = set().union(*per_project)
+    profile.explicit_skills = [s for s in profile.skills if s.name not in inferred]
+
+
+def _apply_project_changes(profile: Profile, changes: list[dict], replace: bool):
+    """
+    Applies project changes matched by id: {"id", "fields", "delete"}.
+    Only fields whose value differs are written. Returns (changed,
+    projects whose text changed and need their skills re-inferred).
+    With `replace`, projects not mentioned are deleted.
+    """
+    by_id = {project.id: project for project in profile.projects}
+    changed, retag, seen = False, [], set()
 
-def update_profile(db: Session, profile_id: int, data):
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
+    for change in changes:
+        if change["id"] is None:
+            project = Project(**change["fields"])
+            profile.projects.append(project)
+            changed = True
+            retag.append(project)
+            continue
+
+        project = by_id.get(change["id"])
+        if project is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Project {change['id']} not found on this profile"
+            )
+        seen.add(project.id)
+
+        if change["delete"]:
+            # delete-orphan cascade removes the row and its project_skills
+            profile.projects.remove(project)
+            changed = True
+            continue
+
+        text_changed = False
+        for field, value in change["fields"].items():
+            if getattr(project, field) != value:
+                setattr(project, field, value)
+                changed = True
+                text_changed |= field in PROJECT_TEXT_FIELDS
+        if text_changed:
+            retag.append(project)
+
+    if replace:
+        for project in [p for p in profile.projects if p.id is not None and p.id not in seen]:
+            profile.projects.remove(project)
+            changed = True
+
+    return changed, retag
+
+
+def _apply_profile_changes(
+    db: Session, profile_id: int, fields: dict, skills, project_changes, replace_projects: bool
+):
+    """
+    Diff-based update shared by PUT and PATCH. Writes only changed
+    columns and rows: skills are re-inferred only for projects whose
+    text changed, and profile_skills gets the minimal insert/delete set
+    (collections replaced with an equal set emit nothing).
+    """
+    aliases.refresh(db)
+    profile = _load_for_update(db, profile_id)
 
     if not profile:
         return None
 
-    # 1 Update basic fields
-    for field in ["name", "education", "work", "links"]:
-        value = getattr(data, field)
-        if value is not None:
+    _bootstrap_skill_sources(db, profile)
+    changed = False
+
+    # 1 Basic fields
+    for field, value in fields.items():
+        if getattr(profile, field) != value:
             setattr(profile, field, value)
+            changed = True
+
+    # 2 Projects, matched by id
+    retag = []
+    if project_changes is not None:
+        try:
+            projects_changed, retag = _apply_project_changes(
+                profile, project_changes, replace_projects
+            )
+        except HTTPException:
+            db.rollback()
+            raise
+        changed |= projects_changed
+
+    # 3 Skills: explicit list and re-inferred project skills
+    explicit = explicit_skill_names(skills) if skills is not None else None
+    inferred = {id(project): project_skill_names(project) for project in retag}
+
+    known = {s.name: s for s in profile.skills}
+    known.update((s.name, s) for s in profile.explicit_skills)
+    wanted = set(explicit or ()).union(*inferred.values())
+    known.update((s.name, s) for s in get_or_create_skills(db, wanted - set(known)))
+
+    for project in retag:
+        names = inferred[id(project)]
+        if {s.name for s in project.skills} != names:
+            project.skills = [known[name] for name in sorted(names)]
+
+    # Listed skills the projects already imply are not stored as
+    # explicit, so sending back the edit view's full list is a no-op
+    if explicit is not None:
+        explicit -= {s.name for p in profile.projects for s in p.skills}
+        if {s.name for s in profile.explicit_skills} != explicit:
+            profile.explicit_skills = [known[name] for name in sorted(explicit)]
+
+    all_skills = set(profile.explicit_skills).union(*(p.skills for p in profile.projects))
+    if set(profile.skills) != all_skills:
+        profile.skills = sorted(all_skills, key=lambda s: s.name)
+        changed = True
+
+    if changed:
+        cache.mark_changed(db)
+    db.commit()
+    # Columns only: a full refresh would re-run every selectin load above
+    db.refresh(profile, ["id", *PROFILE_FIELDS, "email"])
 
-    # 2 Update projects (replace strategy)
-    if data.projects is not None:
-        profile.projects.clear()
+    return profile
 
-        for proj in data.projects:
-            project = Project(
-                title=proj.title,
-                description=proj.description,
-                tech_stack=proj.tech_stack
-            )
-            profile.projects.append(project)
 
-    # 3 Recompute skills (explicit + inferred)
-    if data.skills is not None or data.projects is not None:
-        profile.skills.clear()
+def update_profile(db: Session, profile_id: int, data: ProfileUpdate):
+    """
+    Full update (PUT): fields left as null keep their value; `projects`
+    replaces the project list, matching existing projects by id.
+    """
+    fields = {f: getattr(data, f) for f in PROFILE_FIELDS if getattr(data, f) is not None}
 
-        explicit_skills = set()
-        if data.skills:
-            for skill in data.skills:
-                explicit_skills.add(normalize_skill_name(skill))
+    project_changes = None
+    if data.projects is not None:
+        project_changes = [
+            {"id": p.id, "fields": p.model_dump(include=set(PROJECT_FIELDS)), "delete": False}
+            for p in data.projects
+        ]
 
-        inferred_skills = set()
-        for proj in profile.projects:
-            inferred_skills |= extract_skills_from_text(proj.tech_stack)
-            inferred_skills |= extract_skills_from_text(proj.description)
+    return _apply_profile_changes(
+        db, profile_id, fields, data.skills, project_changes, replace_projects=True
+    )
 
-        all_skills = explicit_skills | inferred_skills
 
-        for skill_name in all_skills:
-            skill = get_or_create_skill(db, skill_name)
-            profile.skills.append(skill)
+def patch_profile(db: Session, profile_id: int, data: ProfilePatch):
+    """
+    Partial update (PATCH): only fields sent in the request change, and
+    only the projects it mentions are touched.
+    """
+    fields = {f: getattr(data, f) for f in PROFILE_FIELDS if f in data.model_fields_set}
 
-    db.commit()
-    db.refresh(profile)
+    project_changes = None
+    if data.projects is not None:
+        project_changes = [
+            {
+                "id": p.id,
+                "fields": p.model_dump(include=p.model_fields_set & set(PROJECT_FIELDS)),
+                "delete": p.delete
+            }
+            for p in data.projects
+        ]
 
-    return profile
+    return _apply_profile_changes(
+        db, profile_id, fields, data.skills, project_changes, replace_projects=False
+    )
 
 def get_profile_for_update(db: Session, profile_id: int):
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
+    """
+    Returns the editable view of a profile (three queries, no lazy loads).
+    """
+    profile = (
+        db.query(
+            Profile.id, Profile.name, Profile.education,
+            Profile.work, Profile.links
+        )
+        .filter(Profile.id == profile_id)
+        .first()
+    )
 
     if not profile:
         return None
 
+    projects = (
+        db.query(Project.id, Project.title, Project.description, Project.tech_stack)
+        .filter(Project.profile_id == profile_id)
+        .order_by(Project.id)
+        .all()
+    )
+
     return {
         "name": profile.name,
         "education": profile.education,
         "work": profile.work,
         "links": profile.links,
-        "skills": [s.name for s in profile.skills],
+        "skills": get_skills_for_profiles(db, [profile_id])[profile_id],
         "projects": [
             {
+                "id": p.id,
                 "title": p.title,
                 "description": p.description,
                 "tech_stack": p.tech_stack
             }
-            for p in profile.projects
+            for p in projects
         ]
     }
@@ -0,0 +1,145 @@
+"""
+Async versions of the functions in crud.py.
+
+The query logic lives once, in crud.py. Each function here awaits it:
+- on an AsyncSession (DB_ASYNC=1) through AsyncSession.run_sync, which
+  drives the sync code on the event loop and awaits the driver I/O
+  without using a thread
+- on a plain Session (default) in Starlette's threadpool
+
+so async routes can await them in either storage mode.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+import aliases
+import crud
+import etags
+import profiling
+import retag
+import similar
+import skill_counts
+from fieldsets import DEFAULT_FIELDS
+
+
+async def _run(db, fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    profile = profiling.current_profile.get()
+    if profile is not None:
+        # Let the sampler follow the call into the worker thread
+        fn = profile.traced(fn)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def get_or_create_skills(db, names):
+    return await _run(db, crud.get_or_create_skills, names)
+
+
+async def create_profile(db, data):
+    return await _run(db, crud.create_profile, data)
+
+
+async def create_profiles_bulk(db, items):
+    return await _run(db, crud.create_profiles_bulk, items)
+
+
+async def get_all_profiles(db):
+    return await _run(db, crud.get_all_profiles)
+
+
+async def get_skills_for_profiles(db, profile_ids):
+    return await _run(db, crud.get_skills_for_profiles, profile_ids)
+
+
+async def get_projects_for_profiles(db, profile_ids):
+    return await _run(db, crud.get_projects_for_profiles, profile_ids)
+
+
+async def list_profiles(db, offset: int = 0, limit: int = 10, fields=DEFAULT_FIELDS):
+    return await _run(db, crud.list_profiles, offset=offset, limit=limit, fields=fields)
+
+
+async def list_profiles_after(db, after_id: int = 0, limit: int = 10, fields=DEFAULT_FIELDS):
+    return await _run(db, crud.list_profiles_after, after_id=after_id, limit=limit, fields=fields)
+
+
+async def get_profiles_by_ids(db, profile_ids, fields=DEFAULT_FIELDS):
+    return await _run(db, crud.get_profiles_by_ids, profile_ids, fields=fields)
+
+
+async def data_version(db):
+    return await _run(db, etags.current_version)
+
+
+async def similar_profiles(db, profile_id, k=10, metric="cosine", version=0, fields=DEFAULT_FIELDS):
+    return await _run(
+        db, similar.similar_profiles, profile_id, k=k, metric=metric, version=version, fields=fields
+    )
+
+
+async def get_export_batch(db, after_id: int, batch_size: int, skill_ids=None):
+    return await _run(db, crud.get_export_batch, after_id, batch_size, skill_ids)
+
+
+async def iter_profile_export(db, batch_size: int = 500, skill: str | None = None):
+    skill_ids = await _run(db, crud.export_skill_ids, skill)
+
+    after_id = 0
+    while True:
+        batch = await get_export_batch(db, after_id, batch_size, skill_ids)
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1]["id"]
+
+
+async def resolve_skill_ids(db, skills):
+    return await _run(db, crud.resolve_skill_ids, skills)
+
+
+async def search_profiles_by_skills(db, skills, match: str = "any", fields=DEFAULT_FIELDS):
+    return await _run(db, crud.search_profiles_by_skills, skills, match=match, fields=fields)
+
+
+async def top_skills(db, limit: int = 50):
+    return await _run(db, skill_counts.top_skills, limit)
+
+
+async def search_profiles_by_text(db, query: str, match: str = "any", limit: int = 20, fields=DEFAULT_FIELDS):
+    return await _run(
+        db, crud.search_profiles_by_text, query, match=match, limit=limit, fields=fields
+    )
+
+
+async def search_profiles_by_skill(db, skill):
+    return await _run(db, crud.search_profiles_by_skill, skill)
+
+
+async def update_profile(db, profile_id: int, data):
+    return await _run(db, crud.update_profile, profile_id, data)
+
+
+async def patch_profile(db, profile_id: int, data):
+    return await _run(db, crud.patch_profile, profile_id, data)
+
+
+async def get_profile_for_update(db, profile_id: int):
+    return await _run(db, crud.get_profile_for_update, profile_id)
+
+
+async def current_aliases(db):
+    return await _run(db, aliases.current_dictionary)
+
+
+async def publish_aliases(db, dictionary: dict):
+    return await _run(db, retag.publish, dictionary)
+
+
+async def start_retag(db):
+    return await _run(db, retag.start_or_resume)
+
+
+async def retag_status(db):
+    return await _run(db, retag.status)
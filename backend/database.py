@@ -8,26 +8,217 @@ We use SQLite because:
 
 SQLAlchemy is used as the ORM to interact with the database
 using Python objects instead of raw SQL.
+
+Storage is configured for concurrent traffic:
+- WAL journal, so readers keep going while a profile is being written
+- Tuned pragmas (synchronous, busy_timeout, mmap, cache) on every connection
+- Two pools: a single-connection writer pool (SQLite allows one writer
+  at a time, so writers queue in-process instead of on file locks) and
+  a larger read-only pool for list/search traffic
+
+With DB_ASYNC=1 routes use AsyncSession on an async engine instead
+(aiosqlite for SQLite), so waiting on the database does not hold a
+threadpool worker. The sync path stays the default.
+
+Everything can be overridden from the environment:
+    DATABASE_URL, DATABASE_READ_URL, DB_ASYNC,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_WRITE_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE
 """
 
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# SQLite database stored locally as profile.db
-DATABASE_URL = "sqlite:///./profile.db"
+# SQLite database stored locally as profile.db by default
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./profile.db")
+
+# Readers may point at a replica; by default they share the database
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", DATABASE_URL)
+
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_WRITE_POOL_SIZE = int(os.getenv("DB_WRITE_POOL_SIZE", "1"))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def is_sqlite(url) -> bool:
+    return str(url).startswith("sqlite")
+
+
+def is_sqlite_memory(url) -> bool:
+    url = str(url)
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def _set_sqlite_pragmas(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+# Async drivers used when DB_ASYNC=1
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)) \
+        .render_as_string(hide_password=False)
+
+
+def make_engine(
+    url: str, pool_size: int, max_overflow: int,
+    read_only: bool = False, is_async: bool = False
+):
+    """
+    Creates an engine with pool settings, and SQLite pragmas set on connect.
+    """
+    factory = create_async_engine if is_async else create_engine
+    if is_async:
+        url = to_async_url(url)
+
+    if not is_sqlite(url):
+        return factory(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+        )
+
+    kwargs = {}
+    if not is_sqlite_memory(url):
+        kwargs = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+
+    engine = factory(
+        url,
+        connect_args={"check_same_thread": False},  # Required for SQLite with FastAPI
+        **kwargs
+    )
+
+    # Async engines emit connection events on their sync facade
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        _set_sqlite_pragmas(dbapi_connection, read_only)
+
+    return engine
+
+
+def make_engines(url: str, read_url: str, is_async: bool = False):
+    """
+    Returns (write engine, read engine). An in-memory SQLite database
+    cannot be shared between pools, so it gets a single engine.
+    """
+    write_engine = make_engine(url, DB_WRITE_POOL_SIZE, 0, is_async=is_async)
+    if is_sqlite_memory(url) or is_sqlite_memory(read_url):
+        return write_engine, write_engine
+
+    read_engine = make_engine(
+        read_url, DB_POOL_SIZE, DB_MAX_OVERFLOW, read_only=True, is_async=is_async
+    )
+    return write_engine, read_engine
+
 
 # Engine is the core interface to the database
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite with FastAPI
-)
+write_engine, read_engine = make_engines(DATABASE_URL, DATABASE_READ_URL)
+engine = write_engine
 
 # Each request will get its own database session
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=engine
+    bind=write_engine
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
+if DB_ASYNC:
+    async_write_engine, async_read_engine = make_engines(
+        DATABASE_URL, DATABASE_READ_URL, is_async=True
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_write_engine, class_=AsyncSession, autoflush=False
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, class_=AsyncSession, autoflush=False
+    )
+
 # Base class for all ORM models
 Base = declarative_base()
+
+
+# ---------------- DB DEPS ----------------
+def get_db():
+    """
+    Session on the writer pool, for routes that modify data.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db():
+    """
+    Session on the read-only pool, for list/search/export routes.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# Dependencies used by routes, chosen by DB_ASYNC
+write_db = get_async_db if DB_ASYNC else get_db
+read_db = get_async_read_db if DB_ASYNC else get_read_db
+
+
+def pools() -> dict:
+    """
+    Connection pools by name, for the /metrics pool gauges.
+    """
+    engines = {"write": write_engine, "read": read_engine}
+    if DB_ASYNC:
+        engines = {"write": async_write_engine, "read": async_read_engine}
+    if engines["read"] is engines["write"]:
+        del engines["read"]
+    return {name: engine.pool for name, engine in engines.items()}
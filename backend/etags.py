@@ -0,0 +1,98 @@
+"""
+Conditional GET for read endpoints.
+
+Every commit that changes profile data (sessions marked with
+cache.mark_changed) also bumps the single-row data_version table in the
+same transaction. A read route first looks up that version (one
+primary-key read), builds a strong ETag from it and the normalized
+request, and answers If-None-Match with 304 before running its query.
+Nothing is hashed, and the tag is right in every worker because the
+version lives in the database.
+
+Routes also put the version into their read cache keys. An entry cached
+by one worker is then never served, and tagged as current, after
+another worker has written.
+
+Compressed bodies are different representations, so compression.py
+appends the encoding to the tag ("12-ab34cd56-gzip"). Matching ignores
+that suffix.
+"""
+
+import zlib
+
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+import cache
+from models import DataVersion
+
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+_COMMITTING = "committing_data_version"
+
+# Clients revalidate every time; unchanged data costs a 304
+CACHE_CONTROL = "no-cache"
+
+
+def current_version(db: Session) -> int:
+    return db.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar() or 0
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session):
+    session.info.pop(_COMMITTING, None)
+    if cache.changed(session):
+        session.info[_COMMITTING] = session.execute(
+            update(DataVersion)
+            .values(version=DataVersion.version + 1)
+            .returning(DataVersion.version)
+        ).scalar()
+
+
+def committing_version(session) -> int | None:
+    """
+    The data version the session's current commit creates, if it
+    changes profile data. Valid from before_commit to after_commit.
+    """
+    return session.info.get(_COMMITTING)
+
+
+def make(key: tuple) -> str:
+    """
+    Strong ETag for a cache key that ends with the data version.
+    """
+    return f'"{key[-1]}-{zlib.crc32(repr(key).encode()):08x}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(tag) == wanted for tag in if_none_match.split(","))
+
+
+def check(request: Request, response: Response, key: tuple) -> Response | None:
+    """
+    Tags `response` for `key`. Returns a 304 to send instead when the
+    client already has this version.
+    """
+    etag = make(key)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
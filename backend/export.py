@@ -0,0 +1,56 @@
+"""
+Streaming profile export (NDJSON or CSV).
+
+Rows are produced batch by batch from crud_async.iter_profile_export
+and encoded as they go, so time to first byte and memory stay constant
+no matter how many profiles are exported. Batches are awaited, so the
+export works on both sync and async sessions.
+"""
+
+import csv
+import io
+import json
+
+import crud_async
+
+EXPORT_BATCH_SIZE = 500
+
+CSV_COLUMNS = ["id", "name", "email", "education", "work", "links", "skills", "projects"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def ndjson_rows(db, skill: str | None = None):
+    async for batch in crud_async.iter_profile_export(db, EXPORT_BATCH_SIZE, skill):
+        yield "".join(json.dumps(row) + "\n" for row in batch)
+
+
+async def csv_rows(db, skill: str | None = None):
+    """
+    Skills are joined with ";" and projects are embedded as a JSON array.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+
+    async for batch in crud_async.iter_profile_export(db, EXPORT_BATCH_SIZE, skill):
+        for row in batch:
+            writer.writerow({
+                **row,
+                "skills": ";".join(row["skills"]),
+                "projects": json.dumps(row["projects"])
+            })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def export_rows(db, fmt: str, skill: str | None = None):
+    if fmt == "csv":
+        return csv_rows(db, skill)
+    return ndjson_rows(db, skill)
@@ -15,6 +15,6 @@ FaLLBACKS = {
     "docker": ["docker", "container"],
     "kubernetes": ["kubernetes", "k8s"],
     "computer vision": ["opencv", "yolo", "computer vision"],
-    "sql": ["sql", "postgres", "mysql", "sqlite"],
+    "sql": ["sql", "postgres", "postgresql", "mysql", "sqlite"],
     "iot": ["iot", "raspberry pi", "arduino"]
 }
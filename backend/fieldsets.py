@@ -0,0 +1,38 @@
+"""
+Sparse fieldsets for profile list/search responses.
+
+`fields=id,name` (or `fields=name,projects`, ...) selects which keys a
+profile row carries. crud only queries the columns and relationships
+that were asked for, so dropping `skills` skips the skill lookup and
+adding `projects` costs one batched query. `id` is always included.
+"""
+
+from fastapi import HTTPException
+
+# Columns of Profile that can be requested
+COLUMN_FIELDS = ("id", "name", "email", "education", "work", "links")
+# Batch-loaded relationships
+RELATION_FIELDS = ("skills", "projects")
+
+ALL_FIELDS = COLUMN_FIELDS + RELATION_FIELDS
+DEFAULT_FIELDS = ("id", "name", "skills")
+
+
+def parse_fields(value: str | None) -> tuple[str, ...]:
+    """
+    "name,projects" -> ("id", "name", "projects"), in canonical order so
+    equivalent requests share cache entries.
+    """
+    if value is None:
+        return DEFAULT_FIELDS
+
+    requested = {f.strip() for f in value.split(",") if f.strip()}
+    unknown = requested - set(ALL_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                   f"Available: {', '.join(ALL_FIELDS)}"
+        )
+    requested.add("id")
+    return tuple(f for f in ALL_FIELDS if f in requested)
@@ -0,0 +1,243 @@
+"""
+Full-text search over profiles with SQLite FTS5.
+
+profile_fts holds one document per profile (rowid = profile id) with
+separate columns for name, work, education, project text (titles,
+descriptions, tech stacks) and skills, so BM25 can weight them
+differently. A prefix index makes "vis*"-style queries cheap, and the
+profile_fts_vocab table (fts5vocab) lists indexed terms for typo
+correction.
+
+The index follows the ORM: after every flush, profiles whose rows,
+projects or skills changed are re-indexed inside the same transaction
+(so a rollback undoes both). The tables are created and filled by a
+migration (migrations.py); `python manage.py rebuild-search` rebuilds
+the index from scratch.
+
+FTS5 is SQLite-only; on other databases the index is simply absent and
+text search is unavailable.
+"""
+
+import difflib
+import re
+import weakref
+from itertools import chain
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from models import Profile, Project
+
+FTS_TABLE = "profile_fts"
+VOCAB_TABLE = "profile_fts_vocab"
+COLUMNS = ("name", "work", "education", "projects", "skills")
+
+# BM25 weight per column, in COLUMNS order
+WEIGHTS = (1.0, 3.0, 2.0, 2.0, 4.0)
+
+# Typo candidates: similarity cutoff and how many per term
+FUZZY_CUTOFF = 0.75
+FUZZY_MATCHES = 3
+
+REINDEX_BATCH = 500
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# engine -> whether it has the FTS table (checked once per engine)
+_enabled = weakref.WeakKeyDictionary()
+
+_DOCUMENTS = f"""
+SELECT p.id, p.name, coalesce(p.work, ''), coalesce(p.education, ''),
+    coalesce((
+        SELECT group_concat(
+            coalesce(pr.title, '') || ' ' || coalesce(pr.description, '')
+            || ' ' || coalesce(pr.tech_stack, ''), ' | ')
+        FROM projects pr WHERE pr.profile_id = p.id
+    ), ''),
+    coalesce((
+        SELECT group_concat(s.name, ', ')
+        FROM profile_skills ps JOIN skills s ON s.id = ps.skill_id
+        WHERE ps.profile_id = p.id
+    ), '')
+FROM profiles p
+"""
+
+
+def is_enabled(connection) -> bool:
+    engine = connection.engine
+    if engine not in _enabled:
+        _enabled[engine] = engine.dialect.name == "sqlite" and bool(
+            connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)
+            ).first()
+        )
+    return _enabled[engine]
+
+
+def create_index(connection) -> bool:
+    """
+    Creates the FTS and vocabulary tables if missing. Returns True if
+    they were created (existing data then needs a rebuild).
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)
+    ).first()
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{', '.join(COLUMNS)}, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {VOCAB_TABLE} "
+        f"USING fts5vocab({FTS_TABLE}, 'row')"
+    )
+    _enabled.pop(connection.engine, None)
+    return not exists
+
+
+def reindex(connection, profile_ids):
+    """
+    Replaces the documents of the given profiles (deleted profiles are
+    just removed).
+    """
+    ids = sorted(profile_ids)
+    for start in range(0, len(ids), REINDEX_BATCH):
+        batch = ids[start:start + REINDEX_BATCH]
+        marks = ", ".join("?" * len(batch))
+        connection.exec_driver_sql(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({marks})", tuple(batch)
+        )
+        connection.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(COLUMNS)}) "
+            f"{_DOCUMENTS} WHERE p.id IN ({marks})", tuple(batch)
+        )
+
+
+def index_all(connection) -> int:
+    """
+    Replaces the whole index with a fresh document per profile. Returns
+    the number of documents indexed.
+    """
+    connection.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    connection.exec_driver_sql(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(COLUMNS)}) {_DOCUMENTS}"
+    )
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return connection.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+
+
+def rebuild(engine) -> int:
+    """
+    Re-indexes every profile in one transaction. Returns the number of
+    documents indexed.
+    """
+    with engine.begin() as conn:
+        create_index(conn)
+        return index_all(conn)
+
+
+# ---------------- ORM SYNC ----------------
+_PENDING = "fulltext_pending"
+
+
+def _owner_id(project: Project):
+    if project.profile_id is not None:
+        return project.profile_id
+    # Orphaned by removal from Profile.projects: fall back to the old value
+    history = inspect(project).attrs.profile_id.history
+    return next(iter(history.deleted or ()), None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed(session, flush_context):
+    ids = session.info.setdefault(_PENDING, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Profile):
+            ids.add(obj.id)
+        elif isinstance(obj, Project):
+            ids.add(_owner_id(obj))
+    ids.discard(None)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _reindex_changed(session, flush_context):
+    ids = session.info.pop(_PENDING, None)
+    if not ids:
+        return
+    connection = session.connection()
+    if is_enabled(connection):
+        reindex(connection, ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
+
+
+# ---------------- QUERIES ----------------
+def tokenize(query: str) -> list[str]:
+    return [token.lower() for token in _TOKEN.findall(query)]
+
+
+def close_terms(connection, term: str) -> list[str]:
+    """
+    Indexed terms within a small edit distance of `term`. Candidates
+    share its first letter and have a similar length, which keeps the
+    vocabulary scan to a narrow range of the term index.
+    """
+    rows = connection.exec_driver_sql(
+        f"SELECT term FROM {VOCAB_TABLE} WHERE term >= ? AND term < ? "
+        "AND length(term) BETWEEN ? AND ?",
+        (term[0], term[0] + "\U0010ffff", len(term) - 2, len(term) + 2)
+    )
+    vocabulary = [row[0] for row in rows]
+    return difflib.get_close_matches(term, vocabulary, FUZZY_MATCHES, FUZZY_CUTOFF)
+
+
+def match_expression(connection, query: str, match: str = "any") -> str | None:
+    """
+    Builds the FTS5 MATCH expression for a free-text query. Every term
+    matches as a prefix; terms that are not in the index also match
+    their closest indexed spellings. Terms are OR'ed (match="any",
+    BM25 ranks documents matching more terms higher) or AND'ed.
+    Returns None when the query has no searchable terms.
+    """
+    groups = []
+    for term in dict.fromkeys(tokenize(query)):
+        options = [f'"{term}"*']
+        exact = connection.exec_driver_sql(
+            f"SELECT 1 FROM {VOCAB_TABLE} WHERE term = ?", (term,)
+        ).first()
+        if not exact and len(term) > 3:
+            options += [f'"{t}"' for t in close_terms(connection, term) if t != term]
+        groups.append("(" + " OR ".join(options) + ")")
+
+    if not groups:
+        return None
+    return (" AND " if match == "all" else " OR ").join(groups)
+
+
+def search(connection, query: str, match: str = "any", limit: int = 20) -> list[dict]:
+    """
+    Returns up to `limit` {"id", "score", "snippet"} hits, best first.
+    Higher scores are better (negated BM25).
+    """
+    expression = match_expression(connection, query, match)
+    if expression is None:
+        return []
+
+    weights = ", ".join(str(w) for w in WEIGHTS)
+    rows = connection.exec_driver_sql(
+        f"SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS score, "
+        f"snippet({FTS_TABLE}, -1, '[', ']', '…', 12) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? "
+        "ORDER BY bm25(" + FTS_TABLE + f", {weights}) LIMIT ?",
+        (expression, limit)
+    )
+    return [
+        {"id": row[0], "score": round(row[1], 4), "snippet": row[2]}
+        for row in rows
+    ]
@@ -1,8 +1,212 @@
+"""
+Logging setup: JSON records written off the request path.
+
+Loggers only enqueue records (QueueHandler on the root logger); a
+QueueListener thread does the formatting and stdout I/O, so logging no
+longer blocks the request thread or the event loop.
+
+Every record logged while a request is being handled carries its
+request id and route. AccessLogMiddleware assigns the id (or reuses an
+incoming X-Request-ID), echoes it on the response and writes one access
+record per request with status and duration.
+
+High-volume read routes can be sampled: LOG_SAMPLE_RATES maps
+"METHOD /route/template" to the fraction of access records kept.
+Errors (status >= 400) and requests slower than LOG_SLOW_REQUEST_MS
+are always logged.
+
+Environment:
+    LOG_LEVEL (INFO), LOG_FORMAT (json | text),
+    LOG_SAMPLE_RATES ("GET /profiles=0.1,GET /profiles/search=0.1"),
+    LOG_SLOW_REQUEST_MS (1000)
+"""
+
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+DEFAULT_SAMPLE_RATES = "GET /profiles=0.1,GET /profiles/search=0.1"
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_SAFE_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    rates = {}
+    for item in filter(None, value.split(",")):
+        route, rate = item.rsplit("=", 1)
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+LOG_SAMPLE_RATES = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", DEFAULT_SAMPLE_RATES))
+
+
+# ---------------- REQUEST CONTEXT ----------------
+# (request id, ASGI scope) of the request being handled
+_request: ContextVar[tuple[str, dict] | None] = ContextVar("log_request", default=None)
+
+
+def _route(scope: dict) -> str | None:
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamps records with the current request id and route. Runs in the
+    logging thread, before the record is queued.
+    """
+
+    def filter(self, record):
+        current = _request.get()
+        if current is not None:
+            record.request_id = current[0]
+            record.route = _route(current[1])
+        return True
+
+
+# ---------------- FORMATTING ----------------
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+JsonFormatter.converter = time.gmtime
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s"
-)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s | %(levelname)s | %(message)s")
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Does the minimum on the calling thread: merges msg % args (args may
+    be mutated after the call returns) and renders any traceback. JSON
+    encoding happens on the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def setup_logging():
+    """
+    Routes the root logger through a queue to a stdout handler running
+    on a listener thread. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    # Drain queued records on shutdown
+    atexit.register(_listener.stop)
+
+
+setup_logging()
 
 logger = logging.getLogger("tracka-me")
+access_logger = logging.getLogger("tracka-me.access")
+
+
+# ---------------- ACCESS LOG ----------------
+class AccessLogMiddleware:
+    """
+    ASGI middleware setting the request context and writing one access
+    record per request, subject to sampling.
+    """
+
+    def __init__(self, app, sample_rates: dict[str, float] | None = None):
+        self.app = app
+        self.sample_rates = LOG_SAMPLE_RATES if sample_rates is None else sample_rates
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        request_id = incoming if _SAFE_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = _request.set((request_id, scope))
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            route = _route(scope) or "unmatched"
+            if self._should_log(scope["method"], route, status, duration_ms):
+                access_logger.info(
+                    "%s %s %s", scope["method"], scope["path"], status,
+                    extra={
+                        "method": scope["method"], "path": scope["path"],
+                        "status": status, "duration_ms": round(duration_ms, 2),
+                    }
+                )
+            _request.reset(token)
+
+    def _should_log(self, method: str, route: str, status: int, duration_ms: float) -> bool:
+        if status >= 400 or duration_ms >= LOG_SLOW_REQUEST_MS:
+            return True
+        rate = self.sample_rates.get(f"{method} {route}", 1.0)
+        return rate >= 1.0 or random.random() < rate
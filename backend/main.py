@@ -2,27 +2,63 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi import Request
 from fastapi import Security
+from fastapi import Query
+from typing import List, Literal
 
 
 import secrets
+import tempfile
+from contextlib import asynccontextmanager
 
 
-import models
 import crud
-from database import engine, SessionLocal
-from schemas import ProfileCreate, ProfileUpdate
-from logger import logger
+import crud_async
+from cache import read_cache
+from compression import CompressionMiddleware
+import bulk
+import database
+import etags
+import fulltext
+import metrics
+import migrations
+import profiling
+import retag
+import export
+from database import engine, write_db, read_db
+from schemas import (
+    ProfileCreate, ProfilePatch, ProfileUpdate,
+    AliasDictionary, AliasVersionOut, ProfileReport, ProfileSummary, RetagJobOut,
+    CacheStats, CreatedResponse, HealthResponse, MessageResponse, ProfileBatch, ProfileEdit,
+    ProfileOut, ProfilePage, SimilarHit, SkillCountOut, SkillSearchHit, TextSearchHit,
+)
+from fieldsets import parse_fields
+from logger import logger, AccessLogMiddleware
+from pagination import MAX_PAGE_SIZE, encode_cursor, decode_cursor, parse_ids
+from ratelimit import limiter, add_rate_limit_headers
 
 # ---------------- APP INIT ----------------
-app = FastAPI(title="TrackA-Me API")
+# The schema is managed by `python manage.py migrate` (see migrations.py);
+# starting the app only warns when that has not been run.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    waiting = migrations.pending(engine)
+    if waiting:
+        logger.warning(
+            "Database schema is %s migration(s) behind; run `python manage.py migrate`",
+            len(waiting)
+        )
+    else:
+        # A re-tag job interrupted by a restart carries on
+        retag.resume(database.write_engine, database.read_engine)
+    yield
+    retag.stop_background(timeout=10)
+
 
-models.Base.metadata.create_all(bind=engine)
+app = FastAPI(title="TrackA-Me API", lifespan=lifespan)
 
 # ---------------- CORS ----------------
 app.add_middleware(
@@ -32,25 +68,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------------- COMPRESSION ----------------
+# brotli or gzip for bodies of COMPRESS_MIN_BYTES and up (see compression.py)
+app.add_middleware(CompressionMiddleware)
+
+# ---------------- PROFILING ----------------
+# Authenticated requests with `X-Profile: 1` are profiled and their
+# report kept for /admin/profiles (see profiling.py). Added before the
+# metrics middleware so it runs inside it.
+app.add_middleware(
+    profiling.ProfilingMiddleware,
+    authorize=lambda username, password: credentials_valid(username, password)
+)
+
 # ---------------- RATE LIMIT ----------------
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-
-@app.exception_handler(RateLimitExceeded)
-def rate_limit_handler(request, exc):
-    return JSONResponse(
-        status_code=429,
-        content={"detail": "Too many requests"}
-    )
+# Token buckets shared by all workers (see ratelimit.py)
+app.middleware("http")(add_rate_limit_headers)
+
+# ---------------- METRICS ----------------
+# Outermost, so timings include the other middleware (see metrics.py)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# ---------------- ACCESS LOG ----------------
+# Request ids + one JSON access record per request (sampled for reads)
+app.add_middleware(AccessLogMiddleware)
+
+# ---------------- DB ----------------
+# Routes await crud_async, which runs on a sync Session (threadpool) or
+# an AsyncSession (DB_ASYNC=1) depending on the configured dependency.
+DBSession = Session | AsyncSession
 
 # ---------------- AUTH ----------------
 security = HTTPBasic()
 
-def verify_user(credentials: HTTPBasicCredentials = Depends(security)):
-    correct_username = secrets.compare_digest(credentials.username, "Predusk")
-    correct_password = secrets.compare_digest(credentials.password, "tracka")
+def credentials_valid(username: str, password: str) -> bool:
+    correct_username = secrets.compare_digest(username, "Predusk")
+    correct_password = secrets.compare_digest(password, "tracka")
+    return correct_username and correct_password
 
-    if not (correct_username and correct_password):
+def verify_user(credentials: HTTPBasicCredentials = Depends(security)):
+    if not credentials_valid(credentials.username, credentials.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -59,83 +116,361 @@ def verify_user(credentials: HTTPBasicCredentials = Depends(security)):
 
     return credentials.username
 
-# ---------------- DB DEP ----------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# ---------------- CONDITIONAL GET ----------------
+# Read routes tag responses with the data version and answer a matching
+# If-None-Match with 304 before querying (see etags.py).
+async def conditional(request: Request, response: Response, db: DBSession, *key):
+    """
+    Returns (cache key ending with the data version, 304 response or None).
+    """
+    key = (*key, await crud_async.data_version(db))
+    return key, etags.check(request, response, key)
 
 # ---------------- ROUTES ----------------
-@app.get("/health")
-def health():
+@app.get("/health", response_model=HealthResponse)
+async def health():
     return {"status": "ok"}
 
 # -------- CREATE (AUTH + RATE LIMITED) --------
-@app.post("/profile")
-@limiter.limit("5/minute")
-def create_profile(
-    request: Request,   # ✅ REQUIRED by slowapi
+@app.post("/profile", response_model=CreatedResponse)
+async def create_profile(
     profile: ProfileCreate,
-    db: Session = Depends(get_db),
-    user: str = Security(verify_user)
+    db: DBSession = Depends(write_db),
+    user: str = Security(verify_user),
+    _: None = Depends(limiter.limit("create_profile"))
 ):
 
     logger.info("Creating profile for %s", profile.email)
-    p = crud.create_profile(db, profile)
+    p = await crud_async.create_profile(db, profile)
     return {"id": p.id, "message": "Profile created successfully"}
 
+# -------- BULK IMPORT (AUTH + RATE LIMITED) --------
+# Body is NDJSON (one ProfileCreate per line), committed in chunks as
+# it is read; the per-line report is returned as NDJSON.
+@app.post("/profiles/bulk")
+async def bulk_import_profiles(
+    request: Request,
+    chunk_size: int = Query(bulk.DEFAULT_CHUNK_SIZE, ge=1, le=bulk.MAX_CHUNK_SIZE),
+    db: DBSession = Depends(write_db),
+    user: str = Security(verify_user),
+    _: None = Depends(limiter.limit("bulk_import"))
+):
+    report = tempfile.SpooledTemporaryFile(max_size=bulk.REPORT_SPOOL_BYTES)
+    summary = await bulk.import_profiles(request.stream(), db, chunk_size, report)
+    logger.info("Bulk import finished: %s", summary)
+    return StreamingResponse(
+        bulk.iter_report(report),
+        media_type="application/x-ndjson"
+    )
+
+# -------- EXPORT (AUTH) --------
+# Full dump with emails and projects, so it is not public. Rows are
+# streamed in fixed-size batches; `skill` optionally filters the export.
+@app.get("/profiles/export")
+async def export_profiles(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    skill: str | None = None,
+    db: DBSession = Depends(read_db),
+    user: str = Security(verify_user)
+):
+    logger.info("Exporting profiles as %s (skill=%s)", format, skill)
+    return StreamingResponse(
+        export.export_rows(db, format, skill),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="profiles.{format}"'}
+    )
+
 # -------- UPDATE (AUTH) --------
-@app.put("/profile/{profile_id}")
-def update_profile(
+# PUT replaces the project list (projects are matched by the ids the
+# edit view returns); PATCH changes only what the request mentions.
+# Both write only the rows that actually changed.
+@app.put("/profile/{profile_id}", response_model=MessageResponse)
+async def update_profile(
     profile_id: int,
     profile: ProfileUpdate,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(write_db),
     user: str = Security(verify_user)
 ):
     logger.info("Updating profile %s", profile_id)
-    updated = crud.update_profile(db, profile_id, profile)
+    updated = await crud_async.update_profile(db, profile_id, profile)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {"message": "Profile updated"}
+
+@app.patch("/profile/{profile_id}", response_model=MessageResponse)
+async def patch_profile(
+    profile_id: int,
+    profile: ProfilePatch,
+    db: DBSession = Depends(write_db),
+    user: str = Security(verify_user)
+):
+    logger.info("Patching profile %s", profile_id)
+    updated = await crud_async.patch_profile(db, profile_id, profile)
     if not updated:
         raise HTTPException(status_code=404, detail="Profile not found")
     return {"message": "Profile updated"}
 
 # -------- PREFILL EDIT --------
-@app.get("/profile/{profile_id}/edit")
-def get_profile_for_edit(profile_id: int, db: Session = Depends(get_db)):
-    profile = crud.get_profile_for_update(db, profile_id)
+# Not cached, so an edit form always starts from committed data, but
+# concurrent requests for the same profile share one read.
+@app.get("/profile/{profile_id}/edit", response_model=ProfileEdit)
+async def get_profile_for_edit(
+    profile_id: int,
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(read_db)
+):
+    key, not_modified = await conditional(request, response, db, "edit", profile_id)
+    if not_modified:
+        return not_modified
+    profile = await read_cache.coalesce(
+        key, lambda: crud_async.get_profile_for_update(db, profile_id)
+    )
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     return profile
 
 # -------- LIST PROFILES (PAGINATED) --------
-@app.get("/profiles")
-def list_profiles(
-    page: int = 1,
-    size: int = 10,
-    db: Session = Depends(get_db)
+# Passing `cursor` (empty for the first page) switches to keyset mode,
+# which returns {"items": [...], "next_cursor": ...} instead of a list.
+# `fields` (e.g. "name,projects") picks the keys of each profile; list
+# and search routes leave out the ones that were not requested.
+FIELDS_HELP = "Comma-separated profile fields (default id,name,skills)"
+
+@app.get(
+    "/profiles",
+    response_model=List[ProfileOut] | ProfilePage,
+    response_model_exclude_unset=True
+)
+async def list_profiles(
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description=FIELDS_HELP),
+    db: DBSession = Depends(read_db)
+):
+    fields = parse_fields(fields)
+    if cursor is None:
+        offset = (page - 1) * size
+        key, not_modified = await conditional(request, response, db, "list", offset, size, fields)
+        if not_modified:
+            return not_modified
+        return await read_cache.get_or_load(
+            key,
+            lambda: crud_async.list_profiles(db, offset=offset, limit=size, fields=fields)
+        )
+
+    after_id = decode_cursor(cursor)
+    key, not_modified = await conditional(request, response, db, "cursor", after_id, size, fields)
+    if not_modified:
+        return not_modified
+    items, next_after = await read_cache.get_or_load(
+        key,
+        lambda: crud_async.list_profiles_after(db, after_id=after_id, limit=size, fields=fields)
+    )
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(next_after) if next_after else None
+    }
+
+# -------- MULTI-GET --------
+# `ids=3,1,2` returns those profiles in that order in one query (plus
+# one per requested relation); unknown ids are listed under "missing".
+@app.get("/profiles/batch", response_model=ProfileBatch, response_model_exclude_unset=True)
+async def get_profiles_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description=f"Comma-separated profile ids (at most {MAX_PAGE_SIZE})"),
+    fields: str | None = Query(None, description=FIELDS_HELP),
+    db: DBSession = Depends(read_db)
 ):
-    offset = (page - 1) * size
-    profiles = db.query(models.Profile).offset(offset).limit(size).all()
-
-    return [
-        {
-            "id": p.id,
-            "name": p.name,
-            "skills": [s.name for s in p.skills]
-        }
-        for p in profiles
-    ]
+    ids = parse_ids(ids)
+    fields = parse_fields(fields)
+    key, not_modified = await conditional(request, response, db, "batch", tuple(ids), fields)
+    if not_modified:
+        return not_modified
+    return await read_cache.coalesce(
+        key,
+        lambda: crud_async.get_profiles_by_ids(db, ids, fields=fields)
+    )
+
+# -------- SIMILAR PROFILES --------
+# Profiles sharing the most skills with this one, by cosine or Jaccard
+# similarity, from an in-memory skill matrix (see similar.py).
+@app.get(
+    "/profile/{profile_id}/similar",
+    response_model=List[SimilarHit],
+    response_model_exclude_unset=True
+)
+async def get_similar_profiles(
+    profile_id: int,
+    request: Request,
+    response: Response,
+    k: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    metric: Literal["cosine", "jaccard"] = "cosine",
+    fields: str | None = Query(None, description=FIELDS_HELP),
+    db: DBSession = Depends(read_db)
+):
+    fields = parse_fields(fields)
+    key, not_modified = await conditional(request, response, db, "similar", profile_id, k, metric, fields)
+    if not_modified:
+        return not_modified
+    hits = await read_cache.get_or_load(
+        key, lambda: crud_async.similar_profiles(
+            db, profile_id, k=k, metric=metric, version=key[-1], fields=fields
+        )
+    )
+    if hits is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return hits
 
 # -------- SEARCH --------
-@app.get("/profiles/search")
-def search_profiles(skill: str, db: Session = Depends(get_db)):
-    profiles = crud.search_profiles_by_skill(db, skill)
-    return [
-        {
-            "id": p.id,
-            "name": p.name,
-            "skills": [s.name for s in p.skills]
-        }
-        for p in profiles
-    ]
+# Repeat `skill` to search for several skills; `match=all` requires
+# every one of them. Results are ranked by number of matched skills.
+# Both list and search results are served from the read cache, and
+# identical concurrent misses share one query.
+@app.get(
+    "/profiles/search",
+    response_model=List[SkillSearchHit],
+    response_model_exclude_unset=True
+)
+async def search_profiles(
+    request: Request,
+    response: Response,
+    skill: List[str] = Query(...),
+    match: Literal["all", "any"] = "any",
+    fields: str | None = Query(None, description=FIELDS_HELP),
+    db: DBSession = Depends(read_db)
+):
+    fields = parse_fields(fields)
+    skills = tuple(sorted({crud.normalize_skill_name(s) for s in skill}))
+    key, not_modified = await conditional(request, response, db, "search", skills, match, fields)
+    if not_modified:
+        return not_modified
+    return await read_cache.get_or_load(
+        key, lambda: crud_async.search_profiles_by_skills(db, skill, match=match, fields=fields)
+    )
+
+# -------- SKILL FACETS --------
+# Most common skills with their profile counts, read from the
+# incrementally maintained skill_counts table (see skill_counts.py).
+@app.get("/skills", response_model=List[SkillCountOut])
+async def top_skills(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=1000),
+    db: DBSession = Depends(read_db)
+):
+    key, not_modified = await conditional(request, response, db, "skills", limit)
+    if not_modified:
+        return not_modified
+    return await read_cache.get_or_load(
+        key, lambda: crud_async.top_skills(db, limit)
+    )
+
+# -------- FULL-TEXT SEARCH --------
+# Free-text query over work, education, projects and skills, ranked by
+# BM25 with a highlighted snippet. Terms match as prefixes and tolerate
+# small typos; match=all requires every term.
+@app.get(
+    "/profiles/search/text",
+    response_model=List[TextSearchHit],
+    response_model_exclude_unset=True
+)
+async def search_profiles_text(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    match: Literal["all", "any"] = "any",
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description=FIELDS_HELP),
+    db: DBSession = Depends(read_db)
+):
+    fields = parse_fields(fields)
+    key, not_modified = await conditional(
+        request, response, db, "text", " ".join(fulltext.tokenize(q)), match, limit, fields
+    )
+    if not_modified:
+        return not_modified
+    return await read_cache.get_or_load(
+        key, lambda: crud_async.search_profiles_by_text(
+            db, q, match=match, limit=limit, fields=fields
+        )
+    )
+
+# -------- ALIAS DICTIONARY (AUTH) --------
+# Replacing the dictionary stores a new version and starts a background
+# job that re-tags existing profiles with it (see retag.py).
+def job_engines(db: DBSession):
+    """
+    (write, read) engines for a background job started from this request.
+    """
+    bind = db.get_bind() if isinstance(db, Session) else database.write_engine
+    return bind, database.read_engine if bind is database.write_engine else bind
+
+@app.get("/admin/aliases", response_model=AliasVersionOut)
+async def get_aliases(db: DBSession = Depends(read_db), user: str = Security(verify_user)):
+    current = await crud_async.current_aliases(db)
+    if current is None:
+        raise HTTPException(status_code=404, detail="No alias dictionary; run `python manage.py migrate`")
+    return current
+
+@app.put("/admin/aliases", response_model=RetagJobOut, status_code=202)
+async def publish_aliases(
+    body: AliasDictionary,
+    db: DBSession = Depends(write_db),
+    user: str = Security(verify_user)
+):
+    job = await crud_async.publish_aliases(db, body.aliases)
+    logger.info("Published alias dictionary version %s", job["alias_version"])
+    retag.run_in_background(job["id"], *job_engines(db))
+    return job
+
+# -------- RE-TAG JOB (AUTH) --------
+# POST resumes the unfinished job (or re-runs the current dictionary);
+# GET reports progress.
+@app.post("/admin/retag", response_model=RetagJobOut, status_code=202)
+async def start_retag(db: DBSession = Depends(write_db), user: str = Security(verify_user)):
+    job = await crud_async.start_retag(db)
+    retag.run_in_background(job["id"], *job_engines(db))
+    return job
+
+@app.get("/admin/retag", response_model=RetagJobOut)
+async def retag_status(db: DBSession = Depends(read_db), user: str = Security(verify_user)):
+    job = await crud_async.retag_status(db)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No re-tag job yet")
+    return job
+
+# -------- REQUEST PROFILES (AUTH) --------
+# Reports of requests sent with `X-Profile: 1`, newest first; the
+# collapsed stacks feed flamegraph.pl or speedscope directly.
+@app.get("/admin/profiles", response_model=List[ProfileSummary])
+async def list_request_profiles(user: str = Security(verify_user)):
+    return profiling.list_reports()
+
+@app.get("/admin/profiles/{profile_id}", response_model=ProfileReport)
+async def get_request_profile(profile_id: str, user: str = Security(verify_user)):
+    report = profiling.get_report(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+@app.get("/admin/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def get_request_profile_stacks(profile_id: str, user: str = Security(verify_user)):
+    report = profiling.get_report(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profiling.collapsed(report)
+
+# -------- METRICS --------
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(database.pools()), media_type=metrics.CONTENT_TYPE)
+
+# -------- READ CACHE STATS --------
+@app.get("/cache/stats", response_model=CacheStats)
+async def cache_stats():
+    return read_cache.stats()
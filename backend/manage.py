@@ -0,0 +1,101 @@
+"""
+Maintenance commands, run from the backend/ directory:
+
+    python manage.py migrate               apply pending schema migrations
+    python manage.py show-migrations       list migrations and whether they ran
+    python manage.py rebuild-search        re-index every profile for /profiles/search/text
+    python manage.py check-skill-counts    compare skill_counts with a full recount
+    python manage.py rebuild-skill-counts  recompute skill_counts from profile_skills
+    python manage.py retag                 re-tag profiles with the current alias dictionary
+"""
+
+import argparse
+import time
+
+
+def migrate(args):
+    import migrations
+    from database import engine
+
+    start = time.perf_counter()
+    applied = migrations.migrate(engine)
+    for version, name in applied:
+        print(f"applied {version:04d} {name}")
+    print(f"{len(applied)} migrations applied in {time.perf_counter() - start:.1f}s")
+
+
+def show_migrations(args):
+    import migrations
+    from database import engine
+
+    with engine.connect() as conn:
+        done = migrations.applied_versions(conn)
+    for version, name, _ in migrations.MIGRATIONS:
+        print(f"[{'x' if version in done else ' '}] {version:04d} {name}")
+
+
+def rebuild_search(args):
+    import fulltext
+    from database import engine
+
+    start = time.perf_counter()
+    count = fulltext.rebuild(engine)
+    print(f"indexed {count} profiles in {time.perf_counter() - start:.1f}s")
+
+
+def check_skill_counts(args):
+    import skill_counts
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        mismatches = skill_counts.check(db)
+    for row in mismatches:
+        print(f"skill {row['skill_id']}: stored {row['stored']}, actual {row['actual']}")
+    print(f"{len(mismatches)} mismatched skills")
+    raise SystemExit(1 if mismatches else 0)
+
+
+def rebuild_skill_counts(args):
+    import skill_counts
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        print(f"counted {skill_counts.rebuild(db)} skills")
+
+
+def retag(args):
+    import retag
+    from database import SessionLocal, engine
+
+    with SessionLocal() as db:
+        job = retag.start_or_resume(db)
+    start = time.perf_counter()
+    ok = retag.run(job["id"], engine)
+    with SessionLocal() as db:
+        job = retag.status(db)
+    print(
+        f"job {job['id']} {job['status']}: {job['changed_profiles']} of "
+        f"{job['processed_profiles']} profiles changed in {time.perf_counter() - start:.1f}s"
+    )
+    raise SystemExit(0 if ok else 1)
+
+
+COMMANDS = {
+    "migrate": migrate,
+    "show-migrations": show_migrations,
+    "rebuild-search": rebuild_search,
+    "check-skill-counts": check_skill_counts,
+    "rebuild-skill-counts": rebuild_skill_counts,
+    "retag": retag,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrackA-Me maintenance commands")
+    parser.add_argument("command", choices=COMMANDS)
+    args = parser.parse_args()
+    COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
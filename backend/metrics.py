@@ -0,0 +1,330 @@
+"""
+Prometheus metrics for the API, exposed at /metrics.
+
+Recorded per request (MetricsMiddleware):
+- http_request_duration_seconds   histogram by method, route template and status
+- http_requests_in_flight         gauge
+- http_request_db_statements      histogram of SQL statements per request, by route
+- http_request_db_seconds         histogram of time spent in SQL per request, by route
+
+Recorded per statement (engine events, on every Engine):
+- db_statement_duration_seconds   histogram
+- statements slower than SLOW_QUERY_MS are logged with their duration
+
+Collected at scrape time:
+- db_pool_* gauges for the write and read pools
+- threadpool_* gauges for the worker threads sync code runs on
+
+Recording must not become a hot spot, so metrics are sharded per
+thread: each thread updates its own plain-Python shard without taking
+a lock, and a scrape sums the shards. The only lock is taken once per
+thread, when its shard is registered. Per-request SQL totals live in a
+contextvar, which follows the request into the threadpool and into
+SQLAlchemy's async greenlets.
+
+Responses also carry a Server-Timing header (db time and statement
+count, total time) so a single slow request can be broken down from
+the browser or curl.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from logger import logger
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class _Sharded:
+    """
+    Base for metrics whose state is kept in one shard per thread.
+    """
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._register_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._register_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> dict:
+        merged = {}
+        with self._register_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                self._merge(merged, labels, value)
+        return merged
+
+    def _labels(self, labels: tuple) -> str:
+        if not labels:
+            return ""
+        pairs = ",".join(
+            f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)
+        )
+        return "{" + pairs + "}"
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, merged, labels, value):
+        merged[labels] = merged.get(labels, 0) + value
+
+    def samples(self):
+        for labels, value in sorted(self._merged().items()):
+            yield f"{self.name}{self._labels(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """
+    Up/down value; shards are summed, so inc and dec may come from
+    different threads.
+    """
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # per-bucket (non-cumulative) counts, then +Inf, sum
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def _merge(self, merged, labels, value):
+        state = merged.setdefault(labels, [0] * len(value))
+        for i, v in enumerate(value):
+            state[i] += v
+
+    def samples(self):
+        for labels, state in sorted(self._merged().items()):
+            base = self._labels(labels)[1:-1]
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}'
+            yield f"{self.name}_sum{self._labels(labels)} {_number(state[-1])}"
+            yield f"{self.name}_count{self._labels(labels)} {cumulative}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ---------------- METRICS ----------------
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ("method", "route", "status"),
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being processed")
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per request",
+    ("route",), buckets=STATEMENT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request", ("route",),
+)
+STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds", "SQL statement latency",
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS",
+)
+
+REGISTRY = [
+    REQUEST_DURATION, IN_FLIGHT, REQUEST_DB_STATEMENTS, REQUEST_DB_SECONDS,
+    STATEMENT_DURATION, SLOW_QUERIES,
+]
+
+
+# ---------------- SQL TIMING ----------------
+class RequestStats:
+    """
+    SQL totals for the current request; mutated in place from whatever
+    thread or greenlet runs the query.
+    """
+
+    __slots__ = ("statements", "db_seconds", "profile")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Set while the request is profiled (see profiling.py)
+        self.profile = None
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    STATEMENT_DURATION.observe(elapsed)
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if stats.profile is not None:
+            stats.profile.record_statement(statement, elapsed)
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        logger.warning(
+            "Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:500]
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+# ---------------- MIDDLEWARE ----------------
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request until its last body chunk
+    is sent, so streamed responses are measured in full. The route label
+    is the matched route template (e.g. /profile/{profile_id}) to keep
+    label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - start
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(
+                    b"server-timing",
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries",'
+                    f" app;dur={elapsed * 1000:.1f}".encode(),
+                )]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            current_request.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start, scope["method"], route, str(status)
+            )
+            REQUEST_DB_STATEMENTS.observe(stats.statements, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route)
+
+
+# ---------------- EXPOSITION ----------------
+def _pool_samples(pools: dict) -> list[str]:
+    lines = []
+    for metric, help, attr in (
+        ("db_pool_size", "Configured pool size", "size"),
+        ("db_pool_checked_out", "Connections currently in use", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+        ("db_pool_overflow", "Connections opened beyond pool_size", "overflow"),
+    ):
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} gauge"]
+        for name, pool in pools.items():
+            # StaticPool/NullPool (in-memory SQLite, tests) have no stats
+            if hasattr(pool, attr):
+                lines.append(f'{metric}{{pool="{name}"}} {getattr(pool, attr)()}')
+    return lines
+
+
+def _threadpool_samples() -> list[str]:
+    import anyio.to_thread
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    return [
+        "# HELP threadpool_threads_busy Worker threads running sync code",
+        "# TYPE threadpool_threads_busy gauge",
+        f"threadpool_threads_busy {stats.borrowed_tokens}",
+        "# HELP threadpool_threads_total Worker thread limit",
+        "# TYPE threadpool_threads_total gauge",
+        f"threadpool_threads_total {_number(stats.total_tokens)}",
+        "# HELP threadpool_tasks_waiting Calls waiting for a free worker thread",
+        "# TYPE threadpool_tasks_waiting gauge",
+        f"threadpool_tasks_waiting {stats.tasks_waiting}",
+    ]
+
+
+def render(pools: dict | None = None) -> str:
+    """
+    Prometheus text exposition of every metric. Must be called from
+    the event loop (the threadpool gauges read anyio's limiter).
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+        lines += metric.samples()
+    lines += _pool_samples(pools or {})
+    lines += _threadpool_samples()
+    return "\n".join(lines) + "\n"
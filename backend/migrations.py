@@ -0,0 +1,184 @@
+"""
+Versioned schema migrations.
+
+    python manage.py migrate            apply pending migrations
+    python manage.py show-migrations    list migrations and whether they ran
+
+The app does not create or alter tables when it is imported: the schema
+is brought up to date by running the migrations as a separate step
+(before starting the server, or as a deploy step). Applied versions are
+recorded in schema_migrations.
+
+Each migration runs in its own explicit transaction (BEGIN IMMEDIATE on
+SQLite, which also makes concurrent migrators wait for each other), so
+a failing migration leaves the database at the previous version. DDL
+is transactional on SQLite and PostgreSQL.
+
+Migrations are written against the schema of their version and check
+before changing anything. 0001 creates whatever tables are missing
+from the current models, so on a fresh database the later structural
+migrations find nothing left to do.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, select, text
+
+import fulltext
+import models
+import skill_counts
+from fallbacks import FaLLBACKS
+
+VERSION_TABLE = "schema_migrations"
+
+# (version, name, function(connection)), in order
+MIGRATIONS = []
+
+
+def migration(version: int, name: str):
+    def register(fn):
+        assert not MIGRATIONS or MIGRATIONS[-1][0] < version, "versions must increase"
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+# ---------------- MIGRATIONS ----------------
+@migration(1, "create tables")
+def create_tables(connection):
+    # What create_all at import used to do: add tables that are missing
+    models.Base.metadata.create_all(bind=connection)
+
+
+@migration(2, "profile_skills primary key")
+def profile_skills_primary_key(connection):
+    if inspect(connection).get_pk_constraint("profile_skills")["constrained_columns"]:
+        return
+
+    # Neither SQLite nor a plain ALTER can add a key over duplicate
+    # pairs, so copy the distinct pairs into a new table
+    without_rowid = " WITHOUT ROWID" if connection.dialect.name == "sqlite" else ""
+    connection.exec_driver_sql(
+        "CREATE TABLE profile_skills_new ("
+        "profile_id INTEGER NOT NULL REFERENCES profiles (id), "
+        "skill_id INTEGER NOT NULL REFERENCES skills (id), "
+        f"PRIMARY KEY (profile_id, skill_id)){without_rowid}"
+    )
+    connection.exec_driver_sql(
+        "INSERT INTO profile_skills_new (profile_id, skill_id) "
+        "SELECT DISTINCT profile_id, skill_id FROM profile_skills "
+        "WHERE profile_id IS NOT NULL AND skill_id IS NOT NULL"
+    )
+    connection.exec_driver_sql("DROP TABLE profile_skills")
+    connection.exec_driver_sql("ALTER TABLE profile_skills_new RENAME TO profile_skills")
+    connection.exec_driver_sql(
+        "CREATE INDEX ix_profile_skills_skill_id ON profile_skills (skill_id, profile_id)"
+    )
+
+
+@migration(3, "projects.profile_id index")
+def projects_profile_id_index(connection):
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_projects_profile_id ON projects (profile_id)"
+    )
+
+
+@migration(4, "delete orphaned projects")
+def delete_orphaned_projects(connection):
+    # Updates used to detach replaced projects instead of deleting them
+    connection.exec_driver_sql(
+        "DELETE FROM project_skills WHERE project_id IN "
+        "(SELECT id FROM projects WHERE profile_id IS NULL)"
+    )
+    connection.exec_driver_sql("DELETE FROM projects WHERE profile_id IS NULL")
+
+
+@migration(5, "full-text index")
+def full_text_index(connection):
+    if connection.dialect.name == "sqlite":
+        fulltext.create_index(connection)
+        fulltext.index_all(connection)
+
+
+@migration(6, "count skills")
+def count_skills(connection):
+    # profile_skills may have lost duplicate pairs in 0002
+    skill_counts.recount(connection)
+
+
+@migration(7, "skill alias dictionary")
+def skill_alias_dictionary(connection):
+    tables = [models.SkillAliasVersion.__table__, models.RetagJob.__table__]
+    models.Base.metadata.create_all(bind=connection, tables=tables)
+    # Version 1 is the dictionary that used to be hard-coded
+    if not connection.execute(select(models.SkillAliasVersion.version)).first():
+        connection.execute(
+            models.SkillAliasVersion.__table__.insert(),
+            {"version": 1, "aliases": FaLLBACKS, "created_at": datetime.utcnow()}
+        )
+
+
+@migration(8, "data version")
+def data_version(connection):
+    models.Base.metadata.create_all(bind=connection, tables=[models.DataVersion.__table__])
+    if not connection.execute(select(models.DataVersion.id)).first():
+        connection.execute(models.DataVersion.__table__.insert(), {"id": 1, "version": 1})
+
+
+# ---------------- RUNNER ----------------
+def _create_version_table(connection):
+    connection.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at VARCHAR NOT NULL)"
+    )
+
+
+def applied_versions(connection) -> set[int]:
+    if not inspect(connection).has_table(VERSION_TABLE):
+        return set()
+    return {row[0] for row in connection.exec_driver_sql(f"SELECT version FROM {VERSION_TABLE}")}
+
+
+def pending(engine) -> list[tuple[int, str]]:
+    """
+    (version, name) of every migration not applied yet.
+    """
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [(version, name) for version, name, _ in MIGRATIONS if version not in done]
+
+
+def migrate(engine) -> list[tuple[int, str]]:
+    """
+    Applies pending migrations in order. Returns (version, name) of the
+    ones applied by this call.
+    """
+    applied = []
+    with engine.connect() as conn:
+        # Transactions are managed by hand below, so that DDL is
+        # covered too (the sqlite3 driver only opens them before DML)
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        _create_version_table(conn)
+        begin = "BEGIN IMMEDIATE" if conn.dialect.name == "sqlite" else "BEGIN"
+
+        for version, name, fn in MIGRATIONS:
+            if version in applied_versions(conn):
+                continue
+            conn.exec_driver_sql(begin)
+            try:
+                # Another process may have applied it while we waited
+                if version not in applied_versions(conn):
+                    fn(conn)
+                    conn.execute(
+                        text(f"INSERT INTO {VERSION_TABLE} (version, name, applied_at) "
+                             "VALUES (:version, :name, :applied_at)"),
+                        {"version": version, "name": name,
+                         "applied_at": datetime.now(timezone.utc).isoformat()}
+                    )
+                    applied.append((version, name))
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+
+    return applied
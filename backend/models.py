@@ -7,7 +7,7 @@ The design is normalized to follow real-world practices:
 - Profile can own multiple projects
 """
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -16,8 +16,31 @@ from database import Base
 profile_skills = Table(
     "profile_skills",
     Base.metadata,
-    Column("profile_id", ForeignKey("profiles.id")),
-    Column("skill_id", ForeignKey("skills.id")),
+    # The primary key rules out duplicate pairs and serves profile -> skills
+    Column("profile_id", ForeignKey("profiles.id"), primary_key=True),
+    Column("skill_id", ForeignKey("skills.id"), primary_key=True),
+    # Inverted index: skill -> profiles. Skill search filters on
+    # skill_id and only needs profile_id, so this covers the lookup.
+    Index("ix_profile_skills_skill_id", "skill_id", "profile_id"),
+    # Both indexes hold the whole row, so a rowid table would be a third copy
+    sqlite_with_rowid=False,
+)
+
+# Where each skill in profile_skills came from, so updates can
+# re-derive skills from only the parts of a profile that changed:
+# profile_skills = explicit skills | skills of every project.
+profile_explicit_skills = Table(
+    "profile_explicit_skills",
+    Base.metadata,
+    Column("profile_id", ForeignKey("profiles.id"), primary_key=True),
+    Column("skill_id", ForeignKey("skills.id"), primary_key=True),
+)
+
+project_skills = Table(
+    "project_skills",
+    Base.metadata,
+    Column("project_id", ForeignKey("projects.id"), primary_key=True),
+    Column("skill_id", ForeignKey("skills.id"), primary_key=True),
 )
 
 class Profile(Base):
@@ -41,9 +64,18 @@ class Profile(Base):
         back_populates="profiles"
     )
 
+    # Skills the user listed (subset of `skills`)
+    explicit_skills = relationship(
+        "Skill",
+        secondary=profile_explicit_skills
+    )
+
+    # Removing a project from the list deletes its row
     projects = relationship(
         "Project",
-        back_populates="owner"
+        back_populates="owner",
+        cascade="all, delete-orphan",
+        order_by="Project.id"
     )
 
 class Skill(Base):
@@ -62,6 +94,31 @@ class Skill(Base):
         back_populates="skills"
     )
 
+class SkillCount(Base):
+    """
+    Number of profiles per skill, kept up to date by skill_counts.py in
+    the same transaction as the profile_skills changes.
+    """
+    __tablename__ = "skill_counts"
+
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    profile_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Top-N skills is an index walk, not a sort
+        Index("ix_skill_counts_profile_count", "profile_count", "skill_id"),
+    )
+
+class DataVersion(Base):
+    """
+    Single row counting commits that changed profile data. Read
+    endpoints derive their ETags from it (see etags.py).
+    """
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 class Project(Base):
     """
     Stores project details linked to a profile.
@@ -73,8 +130,48 @@ class Project(Base):
     description = Column(Text)
     tech_stack = Column(Text)
 
-    profile_id = Column(Integer, ForeignKey("profiles.id"))
+    profile_id = Column(Integer, ForeignKey("profiles.id"), index=True)
     owner = relationship("Profile", back_populates="projects")
+
+    # Skills inferred from this project's description and tech stack
+    skills = relationship(
+        "Skill",
+        secondary=project_skills
+    )
 from datetime import datetime
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, JSON
+
+class SkillAliasVersion(Base):
+    """
+    One version of the skill alias dictionary ({canonical: [aliases]}).
+    The highest version is the one in use (see aliases.py).
+    """
+    __tablename__ = "skill_alias_versions"
+
+    version = Column(Integer, primary_key=True)
+    aliases = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class RetagJob(Base):
+    """
+    Progress of a background re-tag run (see retag.py). Profiles are
+    processed in id order and `last_profile_id` is committed with each
+    batch, so an interrupted job resumes where it stopped.
+    """
+    __tablename__ = "retag_jobs"
+
+    id = Column(Integer, primary_key=True)
+    alias_version = Column(Integer, ForeignKey("skill_alias_versions.version"), nullable=False)
+    # pending, running, done, failed or superseded
+    status = Column(String, nullable=False, default="pending")
+    total_profiles = Column(Integer, nullable=False, default=0)
+    processed_profiles = Column(Integer, nullable=False, default=0)
+    changed_profiles = Column(Integer, nullable=False, default=0)
+    last_profile_id = Column(Integer, nullable=False, default=0)
+    # Lease: the process running the job and its last heartbeat
+    worker = Column(String)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    error = Column(Text)
 
@@ -0,0 +1,70 @@
+"""
+Helpers for keyset (cursor) pagination and id-list parameters.
+
+Offset pagination makes SQLite walk and discard every earlier row,
+so deep pages get slower as the table grows. Keyset pagination keys
+on the last seen Profile.id instead, which is an index seek no matter
+how deep the page is.
+
+Cursors are opaque to clients: a url-safe base64 encoded JSON object.
+
+Multi-get endpoints take ids as a comma-separated list, at most
+MAX_PAGE_SIZE of them, so a batch costs no more than one page.
+"""
+
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+# Upper bound for any page size accepted by list endpoints
+MAX_PAGE_SIZE = 100
+
+# Largest id SQLite can store (signed 64-bit integer)
+MAX_CURSOR_ID = 2**63 - 1
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"after": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Returns the profile id to continue after.
+    An empty cursor starts from the beginning.
+    """
+    if not cursor:
+        return 0
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded))["after"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # bool is a subclass of int, so compare the exact type
+    if type(after) is not int or not 0 <= after <= MAX_CURSOR_ID:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return after
+
+
+def parse_ids(value: str) -> list[int]:
+    """
+    "3,1,3" -> [3, 1]: positive ids, first occurrence order.
+    """
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    if not all(0 < pid <= MAX_CURSOR_ID for pid in ids):
+        raise HTTPException(status_code=400, detail="Invalid id")
+    return ids
@@ -0,0 +1,277 @@
+"""
+On-demand profiling of single requests.
+
+Metrics show that a route is slow, not where the time goes. Sending an
+authenticated request with an `X-Profile: 1` header (or a `_profile=1`
+query parameter) profiles just that request:
+
+- a sampler thread records the Python stack of the threads working on
+  the request every PROFILE_INTERVAL_MS: the event loop (routing,
+  validation, serialization) and, while they run the request's crud
+  calls, the threadpool workers (queries, ORM loading). Samples are
+  aggregated as collapsed stacks ("frame;frame;frame count"), the input
+  of flamegraph.pl and speedscope
+- every SQL statement is added to a timeline with its start offset and
+  duration (through the per-request stats in metrics.py)
+
+The response carries `X-Profile-Id`; the report is kept in memory and
+served by the /admin/profiles routes. The event loop also runs other
+requests, so its samples can include their frames.
+
+Bounds: at most PROFILE_CONCURRENCY requests are profiled at a time
+(others with the flag run normally), sampling stops after
+PROFILE_MAX_SECONDS, the timeline keeps PROFILE_MAX_STATEMENTS
+statements, and only the last PROFILE_KEEP reports are stored.
+Requests without the flag pay for one header scan; the flag without
+valid credentials is ignored.
+"""
+
+import base64
+import binascii
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+
+import metrics
+
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "1") == "1"
+# Floor of 1 ms: each sample walks every profiled thread's stack
+PROFILE_INTERVAL_MS = max(1.0, float(os.getenv("PROFILE_INTERVAL_MS", "2")))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+PROFILE_MAX_STATEMENTS = int(os.getenv("PROFILE_MAX_STATEMENTS", "1000"))
+PROFILE_CONCURRENCY = int(os.getenv("PROFILE_CONCURRENCY", "1"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+HEADER = b"x-profile"
+QUERY_FLAG = b"_profile=1"
+
+current_profile: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+
+_slots = threading.BoundedSemaphore(PROFILE_CONCURRENCY)
+_reports: OrderedDict[str, dict] = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{code.co_qualname}:{code.co_firstlineno}"
+
+
+def collapse(thread_name: str, frame) -> str:
+    """
+    "thread;outermost;...;innermost" for one stack. An event loop
+    waiting for I/O (e.g. on a worker thread) is "event-loop;(idle)".
+    """
+    if frame.f_code.co_name == "select" and frame.f_globals.get("__name__") == "selectors":
+        return f"{thread_name};(idle)"
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+class RequestProfile:
+    """
+    Samples and SQL statements of one request.
+    """
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.status = None
+        self.samples = 0
+        self.truncated = False
+        self.stacks = Counter()
+        self.timeline = []
+        self.dropped_statements = 0
+        # Thread ident -> label of the threads working on the request
+        self.threads = {threading.get_ident(): "event-loop"}
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name=f"profile-{self.id}", daemon=True)
+
+    def start_sampling(self):
+        self._sampler.start()
+
+    def stop_sampling(self):
+        self._stop.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self.start
+
+    def _sample(self):
+        interval = PROFILE_INTERVAL_MS / 1000
+        deadline = self.start + PROFILE_MAX_SECONDS
+        while not self._stop.wait(interval):
+            if time.perf_counter() > deadline:
+                self.truncated = True
+                return
+            frames = sys._current_frames()
+            for ident, label in list(self.threads.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapse(label, frame)] += 1
+            self.samples += 1
+
+    def traced(self, fn):
+        """
+        Wraps a function about to run in a worker thread so the sampler
+        follows it there.
+        """
+        def run(*args, **kwargs):
+            ident = threading.get_ident()
+            self.threads[ident] = "worker"
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.threads.pop(ident, None)
+        return run
+
+    def record_statement(self, statement: str, elapsed: float):
+        """
+        Called by metrics.py after every statement of the request.
+        """
+        if len(self.timeline) >= PROFILE_MAX_STATEMENTS:
+            self.dropped_statements += 1
+            return
+        self.timeline.append({
+            "start_ms": round((time.perf_counter() - elapsed - self.start) * 1000, 3),
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": " ".join(statement.split())[:500],
+        })
+
+    def report(self) -> dict:
+        db_ms = sum(entry["duration_ms"] for entry in self.timeline)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "samples": self.samples,
+            "truncated": self.truncated,
+            "statements": len(self.timeline) + self.dropped_statements,
+            "db_ms": round(db_ms, 3),
+            "timeline": self.timeline,
+            "stacks": dict(self.stacks.most_common()),
+        }
+
+
+# ---------------- STORAGE ----------------
+def store(report: dict):
+    with _reports_lock:
+        _reports[report["id"]] = report
+        while len(_reports) > PROFILE_KEEP:
+            _reports.popitem(last=False)
+
+
+def get_report(profile_id: str) -> dict | None:
+    with _reports_lock:
+        return _reports.get(profile_id)
+
+
+def list_reports() -> list[dict]:
+    """
+    Stored reports, newest first, without their samples and timeline.
+    """
+    with _reports_lock:
+        reports = list(_reports.values())
+    return [
+        {k: v for k, v in report.items() if k not in ("timeline", "stacks")}
+        for report in reversed(reports)
+    ]
+
+
+def clear():
+    with _reports_lock:
+        _reports.clear()
+
+
+def collapsed(report: dict) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in report["stacks"].items())
+
+
+# ---------------- MIDDLEWARE ----------------
+def _requested(scope) -> tuple[bool, bytes | None]:
+    """
+    (profiling flag present, Authorization header value).
+    """
+    flagged = QUERY_FLAG in scope.get("query_string", b"").split(b"&")
+    authorization = None
+    for name, value in scope["headers"]:
+        if name == HEADER:
+            flagged = flagged or value.strip() not in (b"", b"0")
+        elif name == b"authorization":
+            authorization = value
+    return flagged, authorization
+
+
+def _basic_credentials(authorization: bytes | None) -> tuple[str, str] | None:
+    if not authorization or not authorization.lower().startswith(b"basic "):
+        return None
+    try:
+        username, _, password = base64.b64decode(authorization[6:].strip()).decode().partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return username, password
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that ask for it and pass `authorize(username,
+    password)`. Must run inside metrics.MetricsMiddleware, whose
+    per-request stats carry the profile to the SQL hooks.
+    """
+
+    def __init__(self, app, authorize):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not REQUEST_PROFILING:
+            return await self.app(scope, receive, send)
+        flagged, authorization = _requested(scope)
+        if not flagged:
+            return await self.app(scope, receive, send)
+        credentials = _basic_credentials(authorization)
+        if credentials is None or not self.authorize(*credentials):
+            return await self.app(scope, receive, send)
+        if not _slots.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        stats = metrics.current_request.get()
+        if stats is not None:
+            stats.profile = profile
+        token = current_profile.set(profile)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.id.encode())
+                ]
+            await send(message)
+
+        profile.start_sampling()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop_sampling()
+            current_profile.reset(token)
+            if stats is not None:
+                stats.profile = None
+            _slots.release()
+            store(profile.report())
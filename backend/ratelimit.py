@@ -0,0 +1,156 @@
+"""
+Token-bucket rate limiting shared by all worker processes.
+
+slowapi's default in-memory storage keeps counters per process, so
+with N uvicorn workers a "5/minute" limit really allowed 5 x N. Here
+bucket state lives in a small SQLite file that every worker opens
+(RATE_LIMIT_DB), and each check-and-consume runs in one
+BEGIN IMMEDIATE transaction, which SQLite serializes across processes.
+
+Limits are configured per route, e.g.
+    RATE_LIMITS="create_profile=5/minute,bulk_import=10/minute"
+and every limited response carries X-RateLimit-Limit,
+X-RateLimit-Remaining and X-RateLimit-Reset (plus Retry-After on 429).
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from fastapi import HTTPException, Request
+
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "./ratelimit.db")
+
+DEFAULT_LIMITS = {
+    "create_profile": "5/minute",
+    "bulk_import": "10/minute",
+}
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(limit: str) -> tuple[int, int]:
+    """
+    "5/minute" -> (5, 60): capacity and the period it refills over.
+    """
+    count, period = limit.strip().split("/")
+    return int(count), PERIODS[period.strip()]
+
+
+def load_limits() -> dict[str, tuple[int, int]]:
+    limits = dict(DEFAULT_LIMITS)
+    for item in filter(None, os.getenv("RATE_LIMITS", "").split(",")):
+        route, limit = item.split("=")
+        limits[route.strip()] = limit
+    return {route: parse_limit(limit) for route, limit in limits.items()}
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite file, one connection per thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key: str, capacity: int, period: int, now: float | None = None):
+        """
+        Atomically refills the bucket and takes one token if available.
+        Returns (allowed, remaining tokens, seconds until one token is back).
+        """
+        now = time.time() if now is None else now
+        rate = capacity / period
+        conn = self._connect()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else min(
+                capacity, row[0] + (now - row[1]) * rate
+            )
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                " tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        reset = 0 if tokens >= 1 else (1 - tokens) / rate
+        return allowed, int(tokens), reset
+
+    def reset(self):
+        self._connect().execute("DELETE FROM buckets")
+
+
+class RateLimiter:
+    def __init__(self, store: SQLiteBucketStore, limits: dict[str, tuple[int, int]]):
+        self.store = store
+        self.limits = limits
+
+    def limit(self, route: str):
+        """
+        FastAPI dependency enforcing the configured limit for `route`,
+        keyed by client address.
+        """
+        capacity, period = self.limits[route]
+
+        def check(request: Request):
+            client = request.client.host if request.client else "unknown"
+            allowed, remaining, reset = self.store.consume(
+                f"{route}:{client}", capacity, period
+            )
+            headers = {
+                "X-RateLimit-Limit": str(capacity),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(math.ceil(reset)),
+            }
+            if not allowed:
+                headers["Retry-After"] = headers["X-RateLimit-Reset"]
+                raise HTTPException(
+                    status_code=429, detail="Too many requests", headers=headers
+                )
+            request.state.rate_limit_headers = headers
+
+        return check
+
+
+limiter = RateLimiter(SQLiteBucketStore(RATE_LIMIT_DB), load_limits())
+
+
+async def add_rate_limit_headers(request: Request, call_next):
+    """
+    Middleware copying the limiter's headers onto successful responses
+    (including streamed ones, which bypass dependency response headers).
+    """
+    response = await call_next(request)
+    headers = getattr(request.state, "rate_limit_headers", None)
+    if headers:
+        response.headers.update(headers)
+    return response
@@ -0,0 +1,366 @@
+"""
+Background re-tagging of existing profiles when the skill alias
+dictionary changes.
+
+Skills are inferred from project text at write time, so after
+aliases.publish() adds, say, "pytorch" to deep learning, existing
+profiles stay under-tagged until they are edited. A re-tag job walks
+every profile in id order, RETAG_BATCH_SIZE at a time:
+
+1. the batch's project texts are read from the read pool
+2. skills are inferred in a pool of RETAG_WORKERS processes (each
+   compiles the dictionary once) while the previous batch is written
+3. one short write transaction applies the differences through the ORM
+   (project skills, explicit skills re-normalized, profile_skills, and
+   through the flush hooks skill_counts and the full-text index) and
+   commits the job's progress with them
+
+Because progress commits with each batch, a job that stops (restart,
+crash, deploy) resumes after the last committed batch. The process
+running a job holds a lease (worker + heartbeat in retag_jobs); any
+process may take over a job whose heartbeat is older than
+RETAG_LEASE_SECONDS. Publishing a newer dictionary supersedes the
+running job.
+
+Live requests barely notice a job: inference runs outside the API
+process, reads use the read pool, and write transactions last one
+batch with a RETAG_PAUSE_MS pause in between, so API writes waiting
+for the single writer connection get in.
+"""
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+import aliases
+import cache
+import crud
+import skill_matcher
+from models import Profile, Project, RetagJob, SkillAliasVersion
+
+RETAG_BATCH_SIZE = int(os.getenv("RETAG_BATCH_SIZE", "200"))
+RETAG_WORKERS = int(os.getenv("RETAG_WORKERS", str(min(4, os.cpu_count() or 1))))
+RETAG_PAUSE_MS = float(os.getenv("RETAG_PAUSE_MS", "20"))
+RETAG_LEASE_SECONDS = float(os.getenv("RETAG_LEASE_SECONDS", "60"))
+
+# Attempts per batch when another process holds the write lock
+BATCH_ATTEMPTS = 3
+
+UNFINISHED = ("pending", "running", "failed")
+
+logger = logging.getLogger("tracka-me.retag")
+
+
+# ---------------- JOBS ----------------
+def start(db: Session) -> RetagJob:
+    """
+    Creates a job for the current dictionary; unfinished older jobs are
+    superseded.
+    """
+    version = aliases.latest_version(db)
+    db.query(RetagJob).filter(RetagJob.status.in_(UNFINISHED)).update(
+        {"status": "superseded", "finished_at": datetime.utcnow()}, synchronize_session=False
+    )
+    job = RetagJob(
+        alias_version=version,
+        total_profiles=db.query(func.count(Profile.id)).scalar(),
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def publish(db: Session, dictionary: dict[str, list[str]]) -> dict:
+    """
+    Publishes a new alias dictionary and creates the job that applies it.
+    """
+    aliases.publish(db, dictionary)
+    return describe(start(db))
+
+
+def start_or_resume(db: Session) -> dict:
+    """
+    The unfinished job if there is one, else a new job for the current
+    dictionary (to re-run it, e.g. after a failure was fixed).
+    """
+    job = unfinished(db) or start(db)
+    return describe(job)
+
+
+def status(db: Session) -> dict | None:
+    job = latest(db)
+    return describe(job) if job is not None else None
+
+
+def latest(db: Session) -> RetagJob | None:
+    return db.query(RetagJob).order_by(RetagJob.id.desc()).first()
+
+
+def unfinished(db: Session) -> RetagJob | None:
+    job = latest(db)
+    return job if job is not None and job.status in UNFINISHED else None
+
+
+def describe(job: RetagJob) -> dict:
+    return {
+        "id": job.id,
+        "alias_version": job.alias_version,
+        "status": job.status,
+        "processed_profiles": job.processed_profiles,
+        "total_profiles": job.total_profiles,
+        "changed_profiles": job.changed_profiles,
+        "percent": round(100 * job.processed_profiles / job.total_profiles, 1)
+        if job.total_profiles else 100.0,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+        "error": job.error,
+    }
+
+
+def _claim(db: Session, job_id: int, worker: str) -> bool:
+    """
+    Takes the job's lease unless a live process holds it.
+    """
+    stale = datetime.utcnow() - timedelta(seconds=RETAG_LEASE_SECONDS)
+    claimed = db.query(RetagJob).filter(
+        RetagJob.id == job_id,
+        RetagJob.status.in_(UNFINISHED),
+        (RetagJob.status != "running") | (RetagJob.worker == worker) | (RetagJob.updated_at < stale),
+    ).update(
+        {"status": "running", "worker": worker, "updated_at": datetime.utcnow(), "error": None},
+        synchronize_session=False
+    )
+    db.commit()
+    return bool(claimed)
+
+
+# ---------------- BATCHES ----------------
+def _read_batch(read_engine, after_id: int, batch_size: int):
+    """
+    Next profile ids after `after_id` and the text of their projects.
+    """
+    with read_engine.connect() as conn:
+        profile_ids = list(conn.scalars(
+            select(Profile.id).where(Profile.id > after_id).order_by(Profile.id).limit(batch_size)
+        ))
+        projects = conn.execute(
+            select(Project.id, Project.description, Project.tech_stack)
+            .where(Project.profile_id.in_(profile_ids))
+        ).all() if profile_ids else []
+    return profile_ids, [tuple(p) for p in projects]
+
+
+def _submit(pool, workers: int, projects: list[tuple]) -> list[Future]:
+    """
+    Spreads inference over the pool; without one it runs right here.
+    """
+    if pool is None:
+        done = Future()
+        done.set_result(skill_matcher.extract_projects(projects, skill_matcher.matcher))
+        return [done]
+    chunk = max(1, -(-len(projects) // workers))
+    return [
+        pool.submit(skill_matcher.extract_projects, projects[i:i + chunk])
+        for i in range(0, len(projects), chunk)
+    ]
+
+
+def _apply_batch(db: Session, job_id: int, worker: str, profile_ids, projects, inferred) -> bool:
+    """
+    Writes one batch and the job's progress. Returns False (writing
+    nothing) if the job was superseded or taken over.
+    """
+    job = db.get(RetagJob, job_id)
+    if job.status != "running" or job.worker != worker:
+        db.rollback()
+        return False
+
+    # Text each inference was made from; projects edited since then
+    # were re-inferred by that edit and are left alone
+    sent = {project_id: (description, tech_stack) for project_id, description, tech_stack in projects}
+    profiles = (
+        db.query(Profile)
+        .options(
+            selectinload(Profile.skills),
+            selectinload(Profile.explicit_skills),
+            selectinload(Profile.projects).selectinload(Project.skills),
+        )
+        .filter(Profile.id.in_(profile_ids))
+        .all()
+    )
+
+    plans = []
+    for profile in profiles:
+        crud._bootstrap_skill_sources(db, profile)
+        project_names = {
+            project: set(inferred[project.id]) for project in profile.projects
+            if sent.get(project.id) == (project.description, project.tech_stack)
+        }
+        explicit = crud.explicit_skill_names(s.name for s in profile.explicit_skills)
+        plans.append((profile, project_names, explicit))
+
+    # One lookup/upsert for every skill name in the batch
+    known = {s.name: s for profile in profiles for s in profile.skills}
+    wanted = set().union(*(explicit.union(*names.values()) for _, names, explicit in plans))
+    known.update((s.name, s) for s in crud.get_or_create_skills(db, wanted - set(known)))
+
+    changed = 0
+    for profile, project_names, explicit in plans:
+        for project, names in project_names.items():
+            if {s.name for s in project.skills} != names:
+                project.skills = [known[name] for name in sorted(names)]
+        # Same rule as updates: skills the projects imply are not explicit
+        explicit -= {s.name for p in profile.projects for s in p.skills}
+        if {s.name for s in profile.explicit_skills} != explicit:
+            profile.explicit_skills = [known[name] for name in sorted(explicit)]
+
+        all_skills = set(profile.explicit_skills).union(*(p.skills for p in profile.projects))
+        if set(profile.skills) != all_skills:
+            profile.skills = sorted(all_skills, key=lambda s: s.name)
+            changed += 1
+
+    if changed:
+        cache.mark_changed(db)
+    job.last_profile_id = profile_ids[-1]
+    job.processed_profiles += len(profile_ids)
+    job.changed_profiles += changed
+    job.updated_at = datetime.utcnow()
+    db.commit()
+    return True
+
+
+def _write_batch(Session, job_id, worker, profile_ids, projects, inferred) -> bool:
+    for attempt in range(1, BATCH_ATTEMPTS + 1):
+        with Session() as db:
+            try:
+                return _apply_batch(db, job_id, worker, profile_ids, projects, inferred)
+            except OperationalError:
+                # Write lock held by another process past busy_timeout
+                db.rollback()
+                if attempt == BATCH_ATTEMPTS:
+                    raise
+                time.sleep(attempt)
+
+
+# ---------------- RUNNER ----------------
+def run(
+    job_id: int, write_engine, read_engine=None,
+    workers: int | None = None, batch_size: int | None = None,
+    stop: threading.Event | None = None
+) -> bool:
+    """
+    Runs (or resumes) a job until it is done, superseded, taken over or
+    `stop` is set. Returns False if the job could not be claimed.
+    workers=0 infers in this process.
+    """
+    workers = RETAG_WORKERS if workers is None else workers
+    batch_size = batch_size or RETAG_BATCH_SIZE
+    Session = sessionmaker(bind=write_engine, autoflush=False)
+    read_engine = read_engine or write_engine
+    worker = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    with Session() as db:
+        if not _claim(db, job_id, worker):
+            return False
+        job = db.get(RetagJob, job_id)
+        dictionary = db.get(SkillAliasVersion, job.alias_version)
+        # Writes in this process (the batches included) use the job's version
+        aliases.install(dictionary)
+        after_id, words = job.last_profile_id, dictionary.aliases
+    logger.info("Re-tag job %s running from profile %s", job_id, after_id)
+
+    pool = None
+    if workers:
+        pool = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=skill_matcher.init_worker, initargs=(words,)
+        )
+    try:
+        profile_ids, projects = _read_batch(read_engine, after_id, batch_size)
+        pending = _submit(pool, workers, projects)
+        while profile_ids:
+            # Infer the next batch while this one is written
+            next_ids, next_projects = _read_batch(read_engine, profile_ids[-1], batch_size)
+            next_pending = _submit(pool, workers, next_projects)
+
+            inferred = dict(pair for future in pending for pair in future.result())
+            if not _write_batch(Session, job_id, worker, profile_ids, projects, inferred):
+                logger.info("Re-tag job %s was superseded", job_id)
+                return True
+            if stop is not None and stop.is_set():
+                return True
+            time.sleep(RETAG_PAUSE_MS / 1000)
+            profile_ids, projects, pending = next_ids, next_projects, next_pending
+
+        _finish(Session, job_id, worker, "done")
+        logger.info("Re-tag job %s done", job_id)
+    except Exception as exc:
+        logger.exception("Re-tag job %s failed", job_id)
+        _finish(Session, job_id, worker, "failed", repr(exc))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return True
+
+
+def _finish(Session, job_id: int, worker: str, status: str, error: str | None = None):
+    with Session() as db:
+        db.query(RetagJob).filter(RetagJob.id == job_id, RetagJob.worker == worker).update(
+            {"status": status, "error": error,
+             "finished_at": datetime.utcnow(), "updated_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+
+
+# ---------------- BACKGROUND ----------------
+_stop = threading.Event()
+_threads: list[threading.Thread] = []
+
+
+def run_in_background(job_id: int, write_engine, read_engine=None) -> threading.Thread:
+    _threads[:] = [t for t in _threads if t.is_alive()]
+    thread = threading.Thread(
+        target=run, args=(job_id, write_engine, read_engine),
+        kwargs={"stop": _stop}, name=f"retag-{job_id}", daemon=True
+    )
+    thread.start()
+    _threads.append(thread)
+    return thread
+
+
+def resume(write_engine, read_engine=None) -> threading.Thread | None:
+    """
+    Picks up an unfinished job left by a previous run, if any.
+    """
+    with Session(write_engine) as db:
+        job = unfinished(db)
+        job_id = job.id if job is not None and job.status != "failed" else None
+    if job_id is not None:
+        return run_in_background(job_id, write_engine, read_engine)
+    return None
+
+
+def wait_background(timeout: float | None = None):
+    for thread in list(_threads):
+        thread.join(timeout)
+
+
+def stop_background(timeout: float | None = None):
+    """
+    Stops background jobs after their current batch (they resume later).
+    """
+    _stop.set()
+    wait_background(timeout)
+    _threads.clear()
+    _stop.clear()
@@ -60,22 +60,18 @@ class ProfileCreate(BaseModel):
         ]
     )
 
-    
-class ProfileOut(BaseModel):
+
+from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Optional
+
+class ProjectUpdate(ProjectBase):
     """
-    Simplified output schema used for responses.
+    A project in a full update. Projects with an `id` (as returned by
+    the edit view) are updated in place; those without one are added.
     """
-    id: int
-    name: str
-    email: str
-    skills: List[str]
-    projects: List[str]
+    id: Optional[int] = None
 
-    class Config:
-        from_attributes = True
-
-from pydantic import BaseModel, Field
-from typing import List, Optional
 
 class ProfileUpdate(BaseModel):
     """
@@ -88,5 +84,210 @@ class ProfileUpdate(BaseModel):
     links: Optional[str] = None
 
     skills: Optional[List[str]] = None
-    projects: Optional[List[ProjectBase]] = None
+    # Replaces the project list: projects left out are deleted
+    projects: Optional[List[ProjectUpdate]] = None
+
+
+class ProjectPatch(BaseModel):
+    """
+    One change to a profile's projects in a PATCH:
+    - no `id`: add a new project (title required)
+    - `id` + fields: change only those fields
+    - `id` + `delete: true`: remove the project
+    """
+    id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    tech_stack: Optional[str] = None
+    delete: bool = False
+
+    @model_validator(mode="after")
+    def check_operation(self):
+        if self.id is None and (self.delete or not self.title):
+            raise ValueError("new projects need a title and cannot be deleted")
+        if "title" in self.model_fields_set and not self.title:
+            raise ValueError("title cannot be empty")
+        return self
+
+
+class ProfilePatch(BaseModel):
+    """
+    Partial update: only fields present in the request are changed
+    (send null to clear an optional field). `skills` replaces the
+    explicit skill list; `projects` lists changes to individual
+    projects, which are matched by id.
+    """
+    name: Optional[str] = None
+    education: Optional[str] = None
+    work: Optional[str] = None
+    links: Optional[str] = None
+
+    skills: Optional[List[str]] = None
+    projects: Optional[List[ProjectPatch]] = None
+
+    @model_validator(mode="after")
+    def check_required(self):
+        for field in ("name", "skills", "projects"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
+
+# ---------------- RESPONSES ----------------
+# Routes declare these as response_model, so FastAPI validates and
+# serializes results in one pass in pydantic-core (no jsonable_encoder).
+
+class ProjectOut(BaseModel):
+    title: str
+    description: Optional[str] = None
+    tech_stack: Optional[str] = None
+
+
+class ProfileOut(BaseModel):
+    """
+    A profile in list and search results. Only `id` is always present;
+    the other keys depend on the `fields` parameter (see fieldsets.py)
+    and routes drop the ones that were not requested.
+    """
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    education: Optional[str] = None
+    work: Optional[str] = None
+    links: Optional[str] = None
+
+    skills: Optional[List[str]] = None
+    projects: Optional[List[ProjectOut]] = None
+
+
+class ProfilePage(BaseModel):
+    items: List[ProfileOut]
+    next_cursor: Optional[str] = None
+
+
+class ProfileBatch(BaseModel):
+    items: List[ProfileOut]
+    missing: List[int]
+
 
+class SkillSearchHit(ProfileOut):
+    matched: int
+
+
+class SimilarHit(ProfileOut):
+    score: float
+
+
+class TextSearchHit(ProfileOut):
+    score: float
+    snippet: str
+
+
+class ProjectEdit(ProjectOut):
+    id: int
+
+
+class ProfileEdit(BaseModel):
+    name: str
+    education: Optional[str] = None
+    work: Optional[str] = None
+    links: Optional[str] = None
+    skills: List[str]
+    projects: List[ProjectEdit]
+
+
+class SkillCountOut(BaseModel):
+    skill: str
+    count: int
+
+
+class CreatedResponse(BaseModel):
+    id: int
+    message: str
+
+
+class MessageResponse(BaseModel):
+    message: str
+
+
+class HealthResponse(BaseModel):
+    status: str
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_ratio: float
+    size: int
+    maxsize: int
+    ttl: float
+    generation: int
+    loads: int
+    coalesced: int
+
+
+# ---------------- ADMIN ----------------
+class AliasDictionary(BaseModel):
+    """
+    A full skill alias dictionary: canonical skill -> aliases found in
+    skill lists and project text. Replaces the current one.
+    """
+    aliases: Dict[str, List[str]] = Field(
+        example={"deep learning": ["dl", "deep learning", "cnn", "rnn", "pytorch"]}
+    )
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if not any(name.strip() for name in self.aliases):
+            raise ValueError("the dictionary needs at least one skill")
+        return self
+
+
+class AliasVersionOut(BaseModel):
+    version: int
+    aliases: Dict[str, List[str]]
+    created_at: datetime
+
+
+class RetagJobOut(BaseModel):
+    id: int
+    alias_version: int
+    status: str
+    processed_profiles: int
+    total_profiles: int
+    changed_profiles: int
+    percent: float
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class StatementTiming(BaseModel):
+    start_ms: float
+    duration_ms: float
+    statement: str
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: Optional[int] = None
+    started_at: datetime
+    duration_ms: float
+    interval_ms: float
+    samples: int
+    truncated: bool
+    statements: int
+    db_ms: float
+
+
+class ProfileReport(ProfileSummary):
+    """
+    Statement timeline and sampled stacks ("thread;outer;...;inner" ->
+    number of samples) of one profiled request.
+    """
+    timeline: List[StatementTiming]
+    stacks: Dict[str, int]
@@ -0,0 +1,214 @@
+"""
+"Candidates like this one" (GET /profile/{id}/similar).
+
+Skills live in the profile_skills join table, so comparing one profile
+against every other in SQL means a self-join over the whole table. This
+module keeps the profile x skill matrix in memory instead. It is stored
+by column, as one sorted NumPy array of profile ids per skill (the
+posting list), plus the number of skills of every profile.
+
+For a profile with skills S, concatenating the posting lists of S and
+counting ids with np.bincount gives the number of shared skills with
+every other profile in one vectorized pass, touching only profiles that
+share something. Cosine (|A & B| / sqrt(|A| |B|)) or Jaccard
+(|A & B| / |A | B|) scores follow with array arithmetic, and
+np.partition finds the k-th best score without sorting every candidate.
+
+Keeping in step:
+- after every flush the new skill sets of changed profiles are
+  collected (like skill_counts.py), and applied when the session
+  commits, so creates, updates, bulk imports and re-tags are reflected
+  in this process at once
+- the matrix records the data version it reflects (see etags.py). A
+  local commit advances it. A version that moved without us (another
+  worker wrote) makes the next query reload the matrix from
+  profile_skills, at most every SIMILAR_RELOAD_SECONDS.
+"""
+
+import os
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+import crud
+import etags
+from fieldsets import DEFAULT_FIELDS
+from models import Profile, profile_skills
+
+SIMILAR_RELOAD_SECONDS = float(os.getenv("SIMILAR_RELOAD_SECONDS", "5"))
+
+_PENDING = "similar_changes"
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class SkillMatrix:
+    """
+    Sparse profile x skill matrix stored as per-skill posting lists.
+    Commits apply changes from request threads, so one lock guards it.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.loaded_at = float("-inf")
+        self.postings: dict[int, np.ndarray] = {}
+        self.rows: dict[int, np.ndarray] = {}
+        self.sizes = np.zeros(0, dtype=np.int32)
+        self._lock = threading.Lock()
+
+    def load(self, pairs: np.ndarray, version: int):
+        """
+        Replaces the contents with (profile_id, skill_id) pairs.
+        """
+        pairs = pairs.reshape(-1, 2).astype(np.int64)
+        postings, rows = {}, {}
+        for column, grouped in ((1, postings), (0, rows)):
+            ordered = pairs[np.lexsort((pairs[:, 1 - column], pairs[:, column]))]
+            keys, starts = np.unique(ordered[:, column], return_index=True)
+            for key, values in zip(keys.tolist(), np.split(ordered[:, 1 - column], starts[1:])):
+                grouped[key] = values
+        sizes = np.bincount(pairs[:, 0]).astype(np.int32) if len(pairs) else np.zeros(0, np.int32)
+
+        with self._lock:
+            self.postings, self.rows, self.sizes = postings, rows, sizes
+            self.version = version
+            self.loaded_at = time.monotonic()
+
+    def apply(self, changes: dict[int, list[int] | None], version: int | None):
+        """
+        Sets the skills of changed profiles (None: deleted) and moves to
+        `version` if it directly follows the one we reflect.
+        """
+        with self._lock:
+            if self.version is None:
+                return
+            for profile_id, skill_ids in changes.items():
+                self._set_row(profile_id, skill_ids or [])
+            if version is not None and version == self.version + 1:
+                self.version = version
+
+    def _set_row(self, profile_id: int, skill_ids: list[int]):
+        old = self.rows.pop(profile_id, _EMPTY)
+        new = np.unique(np.asarray(skill_ids, dtype=np.int64))
+        for skill_id in np.setdiff1d(old, new).tolist():
+            ids = self.postings[skill_id]
+            self.postings[skill_id] = ids[ids != profile_id]
+        for skill_id in np.setdiff1d(new, old).tolist():
+            ids = self.postings.get(skill_id, _EMPTY)
+            at = np.searchsorted(ids, profile_id)
+            self.postings[skill_id] = np.insert(ids, at, profile_id)
+        if len(new):
+            self.rows[profile_id] = new
+
+        if profile_id >= len(self.sizes):
+            grown = np.zeros(max(profile_id + 1, 2 * len(self.sizes)), dtype=np.int32)
+            grown[:len(self.sizes)] = self.sizes
+            self.sizes = grown
+        self.sizes[profile_id] = len(new)
+
+    def top_k(self, profile_id: int, k: int, metric: str = "cosine") -> list[tuple[int, float]]:
+        """
+        The k profiles sharing the most with `profile_id` by `metric`,
+        as (profile_id, score), best first, ties by id.
+        """
+        with self._lock:
+            row = self.rows.get(profile_id, _EMPTY)
+            if not len(row):
+                return []
+            shared = np.bincount(np.concatenate([self.postings[s] for s in row.tolist()]))
+            shared[profile_id] = 0
+            candidates = np.flatnonzero(shared)
+            common = shared[candidates]
+            sizes = self.sizes[candidates]
+
+        if not len(candidates):
+            return []
+        if metric == "jaccard":
+            scores = common / (sizes + len(row) - common)
+        else:
+            scores = common / np.sqrt(sizes * float(len(row)))
+
+        if len(candidates) > k:
+            # Everything scoring at least the k-th best, ties included,
+            # so that ties are broken by id below and not arbitrarily
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= kth
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:k]
+        return list(zip(candidates[order].tolist(), scores[order].tolist()))
+
+
+matrix = SkillMatrix()
+
+
+def reset():
+    """
+    Empties the matrix; the next query loads it from the database.
+    """
+    global matrix
+    matrix = SkillMatrix()
+
+
+def ensure_current(db: Session, version: int):
+    """
+    Reloads the matrix if it does not reflect `version`: it was never
+    loaded, or another worker wrote since.
+    """
+    if matrix.version == version:
+        return
+    if matrix.version is not None and time.monotonic() - matrix.loaded_at < SIMILAR_RELOAD_SECONDS:
+        return
+    # Version first: pairs read after it may only be newer, never
+    # older, so a reload can lag (and retry) but never claim too much
+    version = etags.current_version(db)
+    rows = db.execute(select(profile_skills.c.profile_id, profile_skills.c.skill_id)).all()
+    matrix.load(np.array(rows, dtype=np.int64), version)
+
+
+def similar_profiles(
+    db: Session, profile_id: int, k: int = 10, metric: str = "cosine",
+    version: int = 0, fields=DEFAULT_FIELDS
+) -> list[dict] | None:
+    """
+    Profile summaries most similar to `profile_id` by shared skills, each
+    with its `score`. None if the profile does not exist.
+    """
+    ensure_current(db, version)
+    hits = matrix.top_k(profile_id, k, metric)
+    if not hits and db.get(Profile, profile_id) is None:
+        return None
+
+    found = crud.get_profiles_by_ids(db, [pid for pid, _ in hits], fields)["items"]
+    scores = dict(hits)
+    return [{**row, "score": round(scores[row["id"]], 6)} for row in found]
+
+
+# ---------------- ORM SYNC ----------------
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    changes = session.info.setdefault(_PENDING, {})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Profile):
+            history = inspect(obj).attrs.skills.history
+            if history.added or history.deleted:
+                changes[obj.id] = [skill.id for skill in obj.skills]
+    for obj in session.deleted:
+        if isinstance(obj, Profile):
+            changes[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_on_commit(session):
+    changes = session.info.pop(_PENDING, None)
+    version = etags.committing_version(session)
+    if changes or version is not None:
+        matrix.apply(changes or {}, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,66 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When a popular search is requested by many clients at once, every
+request misses the read cache before the first one has filled it, and
+each runs the same query. A Group runs loader() once per key at a time:
+requests that arrive while a load for their key is in flight await that
+load's result instead of starting their own.
+
+The read cache owns a Group and keys it by its data generation (see
+cache.py), so a request that arrives after a write committed never
+joins a load started before it. The result (or exception) is shared
+as is, so loaders return plain data. Flights are tracked on the event
+loop, which needs no locking.
+"""
+
+import asyncio
+
+
+class Group:
+    """
+    In-flight loads by key, with counters for /cache/stats.
+    """
+
+    def __init__(self):
+        self.loads = 0
+        self.coalesced = 0
+        self._flights: dict = {}
+
+    async def do(self, key, loader):
+        """
+        Awaits loader(), or the load already in flight for `key`.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The request running the load went away; load here instead
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.loads += 1
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            # Mark it retrieved; nobody may be waiting
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+            return value
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def reset(self):
+        self.loads = self.coalesced = 0
+
@@ -0,0 +1,137 @@
+"""
+Incrementally maintained profile counts per skill (GET /skills).
+
+Counting with GROUP BY over profile_skills on every call grows with
+the number of profiles. Instead, after every flush the net changes to
+Profile.skills collections are turned into per-skill deltas and added
+to skill_counts in the same transaction, so the counts commit or roll
+back together with the profiles.
+
+check() compares the table against a full GROUP BY and rebuild()
+recomputes it; both are exposed through manage.py. Data written before
+the table existed is counted by a migration (migrations.py).
+"""
+
+from collections import Counter
+from itertools import chain
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from models import Profile, Skill, SkillCount, profile_skills
+
+_PENDING = "skill_count_deltas"
+
+
+# ---------------- ORM SYNC ----------------
+@event.listens_for(Session, "after_flush")
+def _collect_deltas(session, flush_context):
+    # History still describes this flush's changes at this point
+    deltas = session.info.setdefault(_PENDING, Counter())
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Profile):
+            history = inspect(obj).attrs.skills.history
+            for skill in history.added:
+                deltas[skill.id] += 1
+            for skill in history.deleted:
+                deltas[skill.id] -= 1
+    for obj in session.deleted:
+        if isinstance(obj, Profile):
+            history = inspect(obj).attrs.skills.history
+            for skill in chain(history.unchanged, history.deleted):
+                deltas[skill.id] -= 1
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _apply_deltas(session, flush_context):
+    deltas = session.info.pop(_PENDING, None)
+    changes = [
+        {"skill_id": skill_id, "profile_count": delta}
+        for skill_id, delta in sorted((deltas or {}).items()) if delta
+    ]
+    if changes:
+        apply_deltas(session.connection(), changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deltas(session):
+    session.info.pop(_PENDING, None)
+
+
+def apply_deltas(connection, changes: list[dict]):
+    """
+    Adds {"skill_id", "profile_count"} deltas to skill_counts.
+    """
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(SkillCount.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["skill_id"],
+        set_={"profile_count": SkillCount.profile_count + stmt.excluded.profile_count}
+    )
+    connection.execute(stmt, changes)
+
+
+# ---------------- QUERIES ----------------
+def _actual_counts():
+    return (
+        select(profile_skills.c.skill_id, func.count().label("profile_count"))
+        .group_by(profile_skills.c.skill_id)
+    )
+
+
+def top_skills(db: Session, limit: int = 50) -> list[dict]:
+    """
+    Skills by profile count, most common first. Reads `limit` rows off
+    the profile_count index, whatever the number of profiles.
+    """
+    rows = (
+        db.query(Skill.name, SkillCount.profile_count)
+        .join(Skill, Skill.id == SkillCount.skill_id)
+        .filter(SkillCount.profile_count > 0)
+        .order_by(SkillCount.profile_count.desc(), SkillCount.skill_id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [{"skill": name, "count": count} for name, count in rows]
+
+
+def check(db: Session) -> list[dict]:
+    """
+    Returns the skills whose stored count differs from a full recount,
+    as {"skill_id", "stored", "actual"}.
+    """
+    actual = dict(db.execute(_actual_counts()).all())
+    stored = dict(db.query(SkillCount.skill_id, SkillCount.profile_count).all())
+    return [
+        {"skill_id": skill_id, "stored": stored.get(skill_id, 0), "actual": actual.get(skill_id, 0)}
+        for skill_id in sorted(actual.keys() | stored.keys())
+        if stored.get(skill_id, 0) != actual.get(skill_id, 0)
+    ]
+
+
+def recount(connection) -> int:
+    """
+    Replaces every count with a full recount from profile_skills.
+    Returns the number of skills counted.
+    """
+    connection.execute(SkillCount.__table__.delete())
+    connection.execute(
+        SkillCount.__table__.insert().from_select(
+            ["skill_id", "profile_count"], _actual_counts()
+        )
+    )
+    return connection.execute(select(func.count()).select_from(SkillCount.__table__)).scalar()
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recomputes every count from profile_skills. Returns the number of
+    skills counted.
+    """
+    count = recount(db.connection())
+    db.commit()
+    return count
+
@@ -0,0 +1,163 @@
+"""
+Precompiled skill alias matcher built once from FaLLBACKS.
+
+normalize_skill_name and extract_skills_from_text used to scan every
+alias on every call, and plain substring checks produced false hits
+("py" in "happy", "ai" in "email").
+
+Here the alias table is compiled up front into:
+- a reverse map (alias -> canonical) for O(1) normalization
+- a word table (single-word alias -> canonical)
+- multi-word aliases indexed by their first word, each with a
+  precompiled word-boundary pattern
+
+Free text is split into words once. Single-word aliases are found with
+one set intersection against the word table, so matches always sit on
+word boundaries. A multi-word alias is only checked when its first
+word occurs in the text (and its middle words, if any), and only then
+runs its own pattern. Words inside an alias may be separated by any
+punctuation ("node.js" and "node js" are the same alias), and a
+trailing plural "s" is accepted on words of 4+ letters
+("containers" -> docker, but "rags" is not "rag").
+
+Tagging cost grows with the text, not with the size of the alias
+table (see benchmarks/bench_skill_matcher.py).
+"""
+
+import re
+import string
+
+from fallbacks import FaLLBACKS
+
+# Everything that is not a letter or digit separates words
+_SEPARATORS = str.maketrans(
+    {c: " " for c in string.punctuation + string.whitespace}
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return text.lower().translate(_SEPARATORS).split()
+
+
+def _pluralizable(word: str) -> bool:
+    """
+    Only real words get a plural form: short aliases are mostly
+    acronyms ("rag", "ai", "ml") whose "+s" form is another word.
+    """
+    return len(word) >= 4 and word.isalpha() and not word.endswith("s")
+
+
+class SkillMatcher:
+    """
+    Compiled view of an alias table {canonical: [aliases]}.
+    """
+
+    def __init__(self, aliases: dict[str, list[str]]):
+        self.aliases = {
+            canonical: [a.lower() for a in words]
+            for canonical, words in aliases.items()
+        }
+
+        # First entry wins, same as the original linear scan
+        self._canonical = {}
+        for canonical, words in self.aliases.items():
+            self._canonical.setdefault(canonical, canonical)
+            for word in words:
+                self._canonical.setdefault(word, canonical)
+
+        self._words = {}
+        self._phrases = {}
+        plurals = []
+        for canonical, words in self.aliases.items():
+            for word in words:
+                tokens = tokenize(word)
+                if len(tokens) == 1:
+                    self._words.setdefault(tokens[0], canonical)
+                    if _pluralizable(tokens[0]):
+                        plurals.append((tokens[0] + "s", canonical))
+                elif tokens:
+                    plural = "s?" if _pluralizable(tokens[-1]) else ""
+                    # Starts with a literal so the regex engine can use its
+                    # fast prefix scan; the left boundary is checked in _has_phrase
+                    pattern = re.compile(
+                        r"[\W_]+".join(map(re.escape, tokens)) + plural + r"(?![^\W_])"
+                    )
+                    self._phrases.setdefault(tokens[0], []).append(
+                        (set(tokens[1:-1]), pattern, canonical)
+                    )
+
+        # Plural forms never shadow a real alias
+        for word, canonical in plurals:
+            self._words.setdefault(word, canonical)
+
+    def normalize(self, skill: str) -> str:
+        """
+        Returns the canonical form of a skill, or the cleaned input
+        if it is not a known alias.
+        """
+        skill_clean = skill.strip().lower()
+        return self._canonical.get(skill_clean, skill_clean)
+
+    def aliases_for(self, canonical: str) -> list[str]:
+        return self.aliases.get(canonical, [])
+
+    @staticmethod
+    def _has_phrase(pattern, text: str) -> bool:
+        for match in pattern.finditer(text):
+            start = match.start()
+            if start == 0 or not text[start - 1].isalnum():
+                return True
+        return False
+
+    def extract(self, text: str) -> set[str]:
+        """
+        Returns canonical skills mentioned anywhere in the text.
+        """
+        if not text:
+            return set()
+
+        lowered = text.lower()
+        words = set(lowered.translate(_SEPARATORS).split())
+        found = {self._words[w] for w in words & self._words.keys()}
+
+        for first in words & self._phrases.keys():
+            for middle, pattern, canonical in self._phrases[first]:
+                if canonical not in found and middle <= words \
+                        and self._has_phrase(pattern, lowered):
+                    found.add(canonical)
+
+        return found
+
+
+# The matcher in use and the alias dictionary version it was built
+# from (0: the built-in FaLLBACKS, before the database was read).
+# aliases.py swaps both when a new version is published.
+matcher = SkillMatcher(FaLLBACKS)
+version = 0
+
+
+def install(aliases: dict[str, list[str]], alias_version: int):
+    global matcher, version
+    matcher, version = SkillMatcher(aliases), alias_version
+
+
+# ---------------- PROCESS POOL WORKERS ----------------
+# Used by retag.py; each worker process compiles the dictionary once.
+_worker_matcher = None
+
+
+def init_worker(aliases: dict[str, list[str]]):
+    global _worker_matcher
+    _worker_matcher = SkillMatcher(aliases)
+
+
+def extract_projects(projects: list[tuple], matcher: SkillMatcher | None = None) -> list[tuple[int, list[str]]]:
+    """
+    [(project id, description, tech stack)] -> [(project id, skills)],
+    with the worker's matcher unless one is given.
+    """
+    matcher = matcher or _worker_matcher
+    return [
+        (project_id, sorted(matcher.extract(description) | matcher.extract(tech_stack)))
+        for project_id, description, tech_stack in projects
+    ]
@@ -0,0 +1,85 @@
+import os
+import tempfile
+
+# Keep the app's module-level engine off the committed profile.db
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test_profile.db")
+os.environ.setdefault("RATE_LIMIT_DB", f"{_tmp}/test_ratelimit.db")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import aliases
+import migrations
+import retag
+import similar
+from cache import read_cache
+from ratelimit import limiter
+from database import engine as app_engine, get_db, get_read_db
+from main import app
+
+# Tests that use the app without the client fixture hit its own database,
+# which is migrated like a deployment would be
+migrations.migrate(app_engine)
+
+
+@pytest.fixture
+def engine():
+    # Fresh in-memory database per test, shared across threads
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    migrations.migrate(engine)
+    yield engine
+    retag.stop_background()
+    aliases.reset()
+    similar.reset()
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(engine):
+    TestSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        session = TestSession()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    read_cache.clear()
+    limiter.store.reset()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_counter(engine):
+    """
+    Collects every SQL statement sent to the test engine, except the
+    data version lookup and bump every read and write pays (etags.py).
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if "data_version" not in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
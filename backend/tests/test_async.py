@@ -0,0 +1,73 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import crud_async
+import migrations
+from database import make_engines
+from schemas import ProfileCreate, ProfileUpdate
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def test_crud_async_on_async_session(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine, _ = make_engines(url, url)
+    migrations.migrate(sync_engine)
+    write_engine, read_engine = make_engines(url, url, is_async=True)
+
+    async def scenario():
+        async with async_sessionmaker(write_engine)() as db:
+            profile = await crud_async.create_profile(db, ProfileCreate(
+                name="Ana", email="ana@x.io", skills=["Python"],
+                projects=[{"title": "Bot", "tech_stack": "Docker"}],
+            ))
+            await crud_async.update_profile(db, profile.id, ProfileUpdate(skills=["K8s"]))
+
+        async with async_sessionmaker(read_engine)() as db:
+            rows = await crud_async.search_profiles_by_skills(db, ["kubernetes"])
+            edit = await crud_async.get_profile_for_update(db, profile.id)
+            batches = [b async for b in crud_async.iter_profile_export(db, 10)]
+        return rows, edit, batches
+
+    rows, edit, batches = asyncio.run(scenario())
+    assert [r["name"] for r in rows] == ["Ana"]
+    assert edit["skills"] == ["docker", "kubernetes"]
+    assert [p["email"] for p in batches[0]] == ["ana@x.io"]
+
+    asyncio.run(write_engine.dispose())
+    asyncio.run(read_engine.dispose())
+    sync_engine.dispose()
+
+
+def test_app_serves_requests_in_async_mode(tmp_path):
+    # Storage mode is chosen at import time, so run the app in a fresh process
+    script = textwrap.dedent("""
+        from fastapi.testclient import TestClient
+        import database
+        import migrations
+        from main import app
+
+        migrations.migrate(database.engine)
+
+        assert database.write_db is database.get_async_db
+        client = TestClient(app)
+        auth = ("Predusk", "tracka")
+        body = {"name": "Ana", "email": "ana@x.io", "skills": ["Python"]}
+        assert client.post("/profile", json=body, auth=auth).status_code == 200
+        assert client.get("/profiles").json()[0]["skills"] == ["python"]
+        assert client.get("/profiles/search?skill=py").json()[0]["name"] == "Ana"
+        assert client.get("/profile/1/edit").json()["name"] == "Ana"
+        assert "ana@x.io" in client.get("/profiles/export", auth=auth).text
+    """)
+    env = dict(os.environ, DB_ASYNC="1", DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}")
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
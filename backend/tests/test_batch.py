@@ -0,0 +1,31 @@
+import crud
+from schemas import ProfileCreate
+
+
+def seed(db):
+    for name in ("Ana", "Ben", "Cy"):
+        crud.create_profile(db, ProfileCreate(
+            name=name, email=f"{name.lower()}@x.io", skills=["Python"],
+            projects=[{"title": f"{name}'s bot"}],
+        ))
+
+
+def test_batch_returns_profiles_in_request_order(client, db, query_counter):
+    seed(db)
+
+    query_counter.clear()
+    body = client.get("/profiles/batch", params={"ids": "3,1,99,3", "fields": "name,projects"}).json()
+
+    assert [p["name"] for p in body["items"]] == ["Cy", "Ana"]
+    assert body["items"][0]["projects"][0]["title"] == "Cy's bot"
+    assert body["missing"] == [99]
+    # Profiles and projects, whatever the number of ids
+    assert len(query_counter) == 2
+
+
+def test_batch_rejects_bad_ids(client):
+    assert client.get("/profiles/batch", params={"ids": "1,x"}).status_code == 400
+    assert client.get("/profiles/batch", params={"ids": ","}).status_code == 400
+    assert client.get("/profiles/batch", params={"ids": "0"}).status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 102))
+    assert client.get("/profiles/batch", params={"ids": too_many}).status_code == 400
@@ -0,0 +1,58 @@
+import asyncio
+
+from benchmarks.compare import regressions
+from benchmarks.datagen import generate_profiles, seed_database
+from benchmarks.harness import load_results, save_results, summarize
+from benchmarks.bench_http import drive
+from main import app
+
+
+def test_generator_is_seeded_and_emails_unique():
+    first = [p.model_dump() for p in generate_profiles(50, seed=7)]
+    again = [p.model_dump() for p in generate_profiles(50, seed=7)]
+    other = [p.model_dump() for p in generate_profiles(50, seed=8)]
+
+    assert first == again
+    assert first != other
+    assert len({p["email"] for p in first}) == 50
+    assert all(p["skills"] for p in first)
+
+
+def test_seed_database_creates_searchable_profiles(client, db):
+    assert seed_database(db, 40, seed=1, chunk_size=15) == 40
+
+    res = client.get("/profiles", params={"size": 100})
+    assert len(res.json()) == 40
+
+
+def test_summarize_percentiles():
+    result = summarize([i / 1000 for i in range(1, 101)], elapsed=2.0)
+
+    assert result["count"] == 100
+    assert result["rps"] == 50
+    assert result["p50_ms"] == 51
+    assert result["p95_ms"] == 96
+    assert result["p99_ms"] == 100
+
+
+def test_results_round_trip_and_compare(tmp_path):
+    base = {"GET /profiles": {"rps": 100.0, "p95_ms": 10.0, "p99_ms": 20.0}}
+    head = {"GET /profiles": {"rps": 95.0, "p95_ms": 15.0, "p99_ms": 21.0}}
+    base_path = save_results("http", {}, base, str(tmp_path / "base.json"))
+    head_path = save_results("http", {}, head, str(tmp_path / "head.json"))
+
+    worse = regressions(load_results(base_path), load_results(head_path), threshold=10)
+
+    assert [(name, metric) for name, metric, _ in worse] == [("GET /profiles", "p95_ms")]
+
+
+def test_drive_reports_per_endpoint(client, db):
+    seed_database(db, 10)
+
+    result = asyncio.run(drive(
+        app, lambda rng: ("GET", f"/profile/{rng.randint(1, 10)}/edit", None),
+        total=20, concurrency=4,
+    ))
+
+    assert result["count"] == 20
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
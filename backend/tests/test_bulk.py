@@ -0,0 +1,52 @@
+import json
+
+import crud
+from schemas import ProfileCreate
+
+AUTH = ("Predusk", "tracka")
+
+
+def ndjson(*rows):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n"
+
+
+def test_bulk_import_reports_each_line(client, db):
+    crud.create_profile(db, ProfileCreate(name="Old", email="old@x.io"))
+
+    body = ndjson(
+        {"name": "A", "email": "a@x.io", "skills": ["Python"],
+         "projects": [{"title": "Bot", "tech_stack": "Docker"}]},
+        {"name": "Dup", "email": "old@x.io"},
+        "",
+        {"name": "No email"},
+        "{not json",
+        {"name": "B", "email": "b@x.io"},
+        {"name": "B again", "email": "b@x.io"},
+    )
+    res = client.post("/profiles/bulk?chunk_size=2", content=body, auth=AUTH)
+    assert res.status_code == 200
+
+    lines = [json.loads(l) for l in res.text.splitlines()]
+    report, summary = lines[:-1], lines[-1]["summary"]
+    assert [(e["line"], e["status"]) for e in report] == [
+        (1, "created"), (2, "duplicate"), (4, "error"),
+        (5, "error"), (6, "created"), (7, "duplicate"),
+    ]
+    assert summary == {"created": 2, "duplicate": 2, "error": 2}
+
+    profile = crud.get_profile_for_update(db, report[0]["id"])
+    assert profile["skills"] == ["docker", "python"]
+
+
+def test_bulk_import_requires_auth(client):
+    assert client.post("/profiles/bulk", content="").status_code == 401
+
+
+def test_bulk_import_spans_many_chunks(client, db):
+    body = ndjson(*[{"name": f"U{i}", "email": f"u{i}@x.io"} for i in range(25)])
+    res = client.post("/profiles/bulk?chunk_size=4", content=body, auth=AUTH)
+
+    lines = [json.loads(l) for l in res.text.splitlines()]
+    assert lines[-1]["summary"] == {"created": 25, "duplicate": 0, "error": 0}
+    assert [e["line"] for e in lines[:-1]] == list(range(1, 26))
+    assert len(crud.list_profiles(db, limit=100)) == 25
@@ -0,0 +1,108 @@
+import asyncio
+
+import crud
+from cache import TTLCache
+from schemas import ProfileCreate, ProfileUpdate
+
+
+def test_repeated_search_is_served_from_cache(client, db, query_counter):
+    crud.create_profile(db, ProfileCreate(name="Ana", email="ana@x.io", skills=["Python"]))
+
+    first = client.get("/profiles/search?skill=Python").json()
+    query_counter.clear()
+    # Same normalized key: "py" and "Python" both mean python
+    assert client.get("/profiles/search?skill=py").json() == first
+    assert query_counter == []
+
+    stats = client.get("/cache/stats").json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_writes_invalidate_cached_reads(client, db):
+    profile = crud.create_profile(db, ProfileCreate(name="Ana", email="ana@x.io"))
+    assert client.get("/profiles/search?skill=rust").json() == []
+    assert client.get("/profiles").json()[0]["skills"] == []
+
+    crud.update_profile(db, profile.id, ProfileUpdate(skills=["Rust"]))
+
+    assert client.get("/profiles/search?skill=rust").json()[0]["name"] == "Ana"
+    assert client.get("/profiles").json()[0]["skills"] == ["rust"]
+
+
+def test_lru_and_ttl_bounds():
+    cache = TTLCache(maxsize=2, ttl=60)
+    for key in "abc":
+        cache.set(key, key.upper(), cache.generation)
+    assert cache.get("a") == (False, None)
+    assert cache.get("c") == (True, "C")
+
+    expired = TTLCache(maxsize=2, ttl=-1)
+    expired.set("a", 1, expired.generation)
+    assert expired.get("a") == (False, None)
+
+
+def test_value_loaded_across_a_write_is_not_served():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def loader():
+        cache.invalidate()  # a write commits while the query runs
+        return "stale"
+
+    assert asyncio.run(cache.get_or_load("k", loader)) == "stale"
+    assert cache.get("k") == (False, None)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["Ana"]
+
+    async def burst():
+        return await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(20)])
+
+    assert asyncio.run(burst()) == [["Ana"]] * 20
+    assert len(calls) == 1
+    assert (cache.stats()["loads"], cache.stats()["coalesced"]) == (1, 19)
+
+
+def test_failed_load_is_shared_and_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("db down")
+
+    async def burst():
+        return await asyncio.gather(
+            *[cache.get_or_load("k", loader) for _ in range(3)], return_exceptions=True
+        )
+
+    assert [type(r) for r in asyncio.run(burst())] == [ValueError] * 3
+    assert len(calls) == 1
+    assert cache.get("k") == (False, None)
+
+
+def test_cancelled_load_is_taken_over():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "fresh"
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.coalesce("k", slow))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.coalesce("k", fast))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "fresh"
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import migrations
+from database import make_engines
+
+
+@pytest.fixture
+def engines(tmp_path):
+    write_engine, read_engine = make_engines(
+        f"sqlite:///{tmp_path / 'wal.db'}", f"sqlite:///{tmp_path / 'wal.db'}"
+    )
+    migrations.migrate(write_engine)
+    yield write_engine, read_engine
+    write_engine.dispose()
+    read_engine.dispose()
+
+
+def test_connections_use_wal_and_tuned_pragmas(engines):
+    write_engine, read_engine = engines
+    with write_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert read_engine is not write_engine
+    assert write_engine.pool.size() == 1
+
+
+def test_read_pool_is_read_only(engines):
+    _, read_engine = engines
+    with read_engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO skills (name) VALUES ('x')"))
+
+
+def test_readers_are_not_blocked_by_open_write(engines):
+    write_engine, read_engine = engines
+    with write_engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("INSERT INTO skills (name) VALUES ('rust')"))
+
+        # Write transaction still open: readers see the last commit
+        with read_engine.connect() as reader:
+            assert reader.execute(text("SELECT count(*) FROM skills")).scalar() == 0
+
+        writer.execute(text("COMMIT"))
+
+    with read_engine.connect() as reader:
+        assert reader.execute(text("SELECT count(*) FROM skills")).scalar() == 1
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+
+import crud
+import export
+from schemas import ProfileCreate
+
+AUTH = ("Predusk", "tracka")
+
+
+def seed(db, count):
+    for i in range(count):
+        crud.create_profile(db, ProfileCreate(
+            name=f"User {i}",
+            email=f"user{i}@x.io",
+            skills=["Python"] if i % 2 else ["Rust"],
+            projects=[{"title": f"P{i}", "tech_stack": "Docker"}],
+        ))
+
+
+def test_ndjson_export_streams_all_profiles_in_batches(client, db, monkeypatch, query_counter):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    seed(db, 5)
+    query_counter.clear()
+
+    res = client.get("/profiles/export", auth=AUTH)
+    rows = [json.loads(line) for line in res.text.splitlines()]
+
+    assert [r["id"] for r in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]["projects"] == [{"title": "P0", "description": None, "tech_stack": "Docker"}]
+    # 3 full batches + 1 empty seek, 3 queries per non-empty batch
+    assert len(query_counter) == 3 * 3 + 1
+
+
+def test_csv_export_with_skill_filter(client, db):
+    seed(db, 4)
+    res = client.get("/profiles/export?format=csv&skill=py", auth=AUTH)
+    assert res.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [r["email"] for r in rows] == ["user1@x.io", "user3@x.io"]
+    assert rows[0]["skills"] == "docker;python"
+
+
+def test_export_requires_auth(client):
+    assert client.get("/profiles/export").status_code == 401
@@ -0,0 +1,65 @@
+import crud
+from schemas import ProfileCreate
+
+
+def seed(db):
+    crud.create_profile(db, ProfileCreate(
+        name="Ana", email="ana@x.io", work="Computer vision intern",
+        skills=["Python"],
+        projects=[{"title": "Shelf monitor", "tech_stack": "OpenCV"}],
+    ))
+    crud.create_profile(db, ProfileCreate(name="Ben", email="ben@x.io", skills=["Python"]))
+
+
+def test_default_fields_are_unchanged(client, db):
+    seed(db)
+
+    rows = client.get("/profiles").json()
+
+    assert rows == [
+        {"id": 1, "name": "Ana", "skills": ["computer vision", "python"]},
+        {"id": 2, "name": "Ben", "skills": ["python"]},
+    ]
+
+
+def test_only_requested_fields_are_queried(client, db, query_counter):
+    seed(db)
+
+    query_counter.clear()
+    rows = client.get("/profiles", params={"fields": "name"}).json()
+
+    assert rows == [{"id": 1, "name": "Ana"}, {"id": 2, "name": "Ben"}]
+    assert len(query_counter) == 1
+    assert "skills" not in query_counter[0] and "email" not in query_counter[0]
+
+
+def test_relations_and_columns_on_request(client, db):
+    seed(db)
+
+    page = client.get("/profiles", params={"cursor": "", "size": 1, "fields": "work,projects"}).json()
+
+    assert page["items"] == [{
+        "id": 1, "work": "Computer vision intern",
+        "projects": [{"title": "Shelf monitor", "description": None, "tech_stack": "OpenCV"}],
+    }]
+    assert page["next_cursor"]
+
+
+def test_search_routes_accept_fields(client, db):
+    seed(db)
+
+    hits = client.get("/profiles/search", params={"skill": "python", "fields": "email"}).json()
+    assert hits == [
+        {"id": 1, "email": "ana@x.io", "matched": 1},
+        {"id": 2, "email": "ben@x.io", "matched": 1},
+    ]
+
+    hits = client.get("/profiles/search/text", params={"q": "shelf", "fields": "id"}).json()
+    assert [set(h) for h in hits] == [{"id", "score", "snippet"}]
+
+
+def test_unknown_field_is_rejected(client):
+    res = client.get("/profiles", params={"fields": "name,password"})
+
+    assert res.status_code == 400
+    assert "password" in res.json()["detail"]
@@ -0,0 +1,74 @@
+from sqlalchemy import text
+
+import crud
+import fulltext
+from schemas import ProfileCreate, ProfileUpdate
+
+AUTH = ("Predusk", "tracka")
+
+
+def seed(db):
+    crud.create_profile(db, ProfileCreate(
+        name="Ana", email="ana@x.io", work="Computer vision intern at FUDR",
+        projects=[{"title": "Shelf monitor", "tech_stack": "OpenCV, Raspberry Pi"}],
+    ))
+    crud.create_profile(db, ProfileCreate(
+        name="Ben", email="ben@x.io", work="Backend engineer",
+        education="BSc Computer Science", skills=["Python"],
+    ))
+    crud.create_profile(db, ProfileCreate(
+        name="Cy", email="cy@x.io", work="Designer",
+    ))
+
+
+def search(client, q, **params):
+    res = client.get("/profiles/search/text", params={"q": q, **params})
+    assert res.status_code == 200
+    return res.json()
+
+
+def test_bm25_ranking_and_snippets(client, db):
+    seed(db)
+
+    rows = search(client, "computer vision intern raspberry pi")
+
+    assert [r["name"] for r in rows] == ["Ana", "Ben"]
+    assert rows[0]["score"] > rows[1]["score"]
+    assert "[" in rows[0]["snippet"] and "]" in rows[0]["snippet"]
+    assert rows[0]["skills"] == ["computer vision", "iot"]
+
+
+def test_match_all_prefix_and_typos(client, db):
+    seed(db)
+
+    assert [r["name"] for r in search(client, "computer intern", match="all")] == ["Ana"]
+    assert [r["name"] for r in search(client, "backe")] == ["Ben"]
+    assert [r["name"] for r in search(client, "desinger")] == ["Cy"]
+    assert search(client, "?!") == []
+
+
+def test_index_follows_create_update_and_rollback(client, db):
+    seed(db)
+
+    crud.update_profile(db, 3, ProfileUpdate(
+        work="Data engineer", projects=[{"title": "Pipelines", "tech_stack": "Kafka"}]
+    ))
+    assert search(client, "designer") == []
+    assert [r["name"] for r in search(client, "kafka")] == ["Cy"]
+
+    # A rolled back flush leaves the index untouched
+    profile = crud._load_for_update(db, 2)
+    profile.work = "Astronaut"
+    db.flush()
+    db.rollback()
+    assert search(client, "astronaut") == []
+
+
+def test_rebuild_indexes_existing_rows(engine, db):
+    seed(db)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM profile_fts"))
+
+    assert fulltext.rebuild(engine) == 3
+    with engine.connect() as conn:
+        assert [h["id"] for h in fulltext.search(conn, "opencv")] == [1]
@@ -0,0 +1,90 @@
+import pytest
+
+import crud
+import etags
+from compression import accepted_encodings
+from schemas import ProfileCreate
+
+
+def seed(db, count=1):
+    for i in range(count):
+        crud.create_profile(db, ProfileCreate(
+            name=f"P{i}", email=f"{i}@x.io", work="Backend engineer " * 5, skills=["Python"],
+        ))
+
+
+def test_matching_etag_returns_304_without_querying(client, db, query_counter):
+    seed(db)
+    first = client.get("/profiles/search", params={"skill": "python"})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    query_counter.clear()
+    again = client.get("/profiles/search", params={"skill": "py"}, headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert query_counter == []
+    # Different requests get different tags
+    assert client.get("/profiles").headers["etag"] != etag
+
+
+def test_writes_change_the_etag(client, db):
+    seed(db)
+    etag = client.get("/profile/1/edit").headers["etag"]
+
+    crud.create_profile(db, ProfileCreate(name="New", email="new@x.io"))
+
+    res = client.get("/profile/1/edit", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+
+
+def test_write_by_another_worker_is_not_served_from_cache(client, db, engine):
+    seed(db)
+    assert client.get("/profiles").json()[0]["name"] == "P0"
+
+    # Another process commits: this process's read cache was not told
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE profiles SET name = 'Renamed' WHERE id = 1")
+        conn.exec_driver_sql("UPDATE data_version SET version = version + 1")
+
+    assert client.get("/profiles").json()[0]["name"] == "Renamed"
+
+
+def test_large_bodies_are_compressed_and_tagged_per_encoding(client, db):
+    seed(db, count=10)
+
+    res = client.get("/profiles", params={"fields": "work"}, headers={"Accept-Encoding": "gzip"})
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["etag"].endswith('-gzip"')
+    assert "accept-encoding" in res.headers["vary"].lower()
+
+    res = client.get(
+        "/profiles", params={"fields": "work"},
+        headers={"Accept-Encoding": "gzip", "If-None-Match": res.headers["etag"]},
+    )
+    assert res.status_code == 304
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_etag_matching():
+    etag = etags.make(("list", 0, 10, ("id",), 7))
+    assert etag.startswith('"7-')
+    assert etags.matches(f'"x", W/{etag[:-1]}-br"', etag)
+    assert etags.matches("*", etag)
+    assert not etags.matches('"6-00000000"', etag)
+    assert accepted_encodings("gzip;q=0, br") == {"br"}
+
+
+def test_brotli_when_available(client, db):
+    pytest.importorskip("brotli")
+    seed(db, count=10)
+
+    res = client.get("/profiles", params={"fields": "work"}, headers={"Accept-Encoding": "gzip, br"})
+
+    assert res.headers["content-encoding"] == "br"
+    assert res.headers["etag"].endswith('-br"')
+    assert res.json()[0]["work"].startswith("Backend engineer")
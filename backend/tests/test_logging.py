@@ -0,0 +1,63 @@
+import json
+import logging
+
+import logger as log_module
+from logger import AccessLogMiddleware, JsonFormatter, _QueueHandler
+
+
+def access_records(caplog):
+    return [r for r in caplog.records if r.name == "tracka-me.access"]
+
+
+def test_access_record_has_request_id_route_and_duration(client, caplog):
+    with caplog.at_level(logging.INFO, logger="tracka-me.access"):
+        res = client.get("/profile/5/edit", headers={"X-Request-ID": "req-42"})
+
+    assert res.headers["x-request-id"] == "req-42"
+    [record] = access_records(caplog)
+    assert record.request_id == "req-42"
+    assert record.route == "/profile/{profile_id}/edit"
+    assert record.status == 404
+    assert record.duration_ms >= 0
+
+
+def test_unsafe_request_id_is_replaced(client):
+    res = client.get("/health", headers={"X-Request-ID": "x" * 500})
+
+    assert len(res.headers["x-request-id"]) == 32
+
+
+def test_app_logs_carry_request_context(client, caplog):
+    with caplog.at_level(logging.INFO, logger="tracka-me"):
+        client.post(
+            "/profile", json={"name": "A", "email": "a@example.com"},
+            auth=("Predusk", "tracka"), headers={"X-Request-ID": "create-1"},
+        )
+
+    [record] = [r for r in caplog.records if r.getMessage().startswith("Creating profile")]
+    assert record.request_id == "create-1"
+    assert record.route == "/profile"
+
+
+def test_read_routes_are_sampled_but_errors_are_not():
+    middleware = AccessLogMiddleware(None, sample_rates={"GET /profiles": 0.0})
+
+    assert not middleware._should_log("GET", "/profiles", 200, 1.0)
+    assert middleware._should_log("GET", "/profiles", 500, 1.0)
+    assert middleware._should_log("GET", "/profiles", 200, log_module.LOG_SLOW_REQUEST_MS)
+    assert middleware._should_log("GET", "/profiles/search", 200, 1.0)
+
+
+def test_json_formatter_after_queue_prepare():
+    record = logging.makeLogRecord({
+        "name": "tracka-me", "levelname": "INFO", "levelno": logging.INFO,
+        "msg": "Creating profile for %s", "args": ("a@example.com",),
+        "request_id": "abc",
+    })
+    prepared = _QueueHandler(None).prepare(record)
+
+    entry = json.loads(JsonFormatter().format(prepared))
+
+    assert entry["message"] == "Creating profile for a@example.com"
+    assert entry["request_id"] == "abc"
+    assert entry["level"] == "INFO"
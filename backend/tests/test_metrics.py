@@ -0,0 +1,74 @@
+import logging
+import threading
+
+import metrics
+from metrics import Histogram
+
+
+def sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_records_route_template_and_status(client):
+    auth = ("Predusk", "tracka")
+    client.post("/profile", json={"name": "A", "email": "a@example.com"}, auth=auth)
+    before = sample(
+        client.get("/metrics").text,
+        'http_request_duration_seconds_count{method="GET",route="/profile/{profile_id}/edit",status="404"}',
+    )
+
+    client.get("/profile/999/edit")
+    client.get("/profile/998/edit")
+    body = client.get("/metrics").text
+
+    assert sample(
+        body,
+        'http_request_duration_seconds_count{method="GET",route="/profile/{profile_id}/edit",status="404"}',
+    ) == before + 2
+    assert "# TYPE http_requests_in_flight gauge" in body
+    assert "threadpool_threads_busy" in body
+
+
+def test_sql_statements_counted_per_request(client):
+    auth = ("Predusk", "tracka")
+    client.post("/profile", json={"name": "A", "email": "a@example.com", "skills": ["Python"]}, auth=auth)
+
+    res = client.get("/profile/1/edit")
+
+    # The data version lookup, then get_profile_for_update's three queries
+    assert 'desc="4 queries"' in res.headers["server-timing"]
+    body = client.get("/metrics").text
+    assert 'http_request_db_statements_bucket{route="/profile/{profile_id}/edit",le="5"}' in body
+
+
+def test_slow_queries_are_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="tracka-me"):
+        client.get("/profiles")
+
+    assert any("Slow query" in r.getMessage() for r in caplog.records)
+
+
+def test_histogram_merges_thread_shards():
+    hist = Histogram("test_seconds", "test", ("route",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            hist.observe(0.5, "/x")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    hist.observe(0.05, "/x")
+
+    lines = list(hist.samples())
+    assert 'test_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/x",le="1.0"} 4001' in lines
+    assert 'test_seconds_bucket{route="/x",le="+Inf"} 4001' in lines
+    assert 'test_seconds_count{route="/x"} 4001' in lines
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import create_engine, event, inspect
+
+import crud
+import fulltext
+import migrations
+import skill_counts
+from schemas import ProfileCreate, ProfilePatch
+
+# Schema as create_all left it before migrations existed
+UNVERSIONED_SCHEMA = [
+    "CREATE TABLE profiles (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+    "email VARCHAR NOT NULL UNIQUE, education TEXT, work TEXT, links TEXT)",
+    "CREATE TABLE skills (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE)",
+    "CREATE TABLE profile_skills (profile_id INTEGER REFERENCES profiles (id), "
+    "skill_id INTEGER REFERENCES skills (id))",
+    "CREATE TABLE projects (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+    "description TEXT, tech_stack TEXT, profile_id INTEGER REFERENCES profiles (id))",
+    "INSERT INTO profiles VALUES (1, 'Ana', 'ana@x.io', NULL, 'Backend engineer', NULL)",
+    "INSERT INTO skills VALUES (1, 'python'), (2, 'docker')",
+    "INSERT INTO profile_skills VALUES (1, 1), (1, 1), (1, 2)",
+    "INSERT INTO projects VALUES (1, 'Bot', NULL, 'Docker', 1), (2, 'Old', NULL, NULL, NULL)",
+]
+
+
+def test_fresh_database_is_current(engine):
+    assert migrations.pending(engine) == []
+    assert migrations.migrate(engine) == []
+
+
+def test_upgrade_of_unversioned_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in UNVERSIONED_SCHEMA:
+            conn.exec_driver_sql(statement)
+
+    applied = migrations.migrate(engine)
+
+    assert [version for version, _ in applied] == [1, 2, 3, 4, 5, 6, 7, 8]
+    schema = inspect(engine)
+    assert schema.get_pk_constraint("profile_skills")["constrained_columns"] == ["profile_id", "skill_id"]
+    assert {i["name"] for i in schema.get_indexes("profile_skills")} == {"ix_profile_skills_skill_id"}
+    assert {i["name"] for i in schema.get_indexes("projects")} == {"ix_projects_profile_id"}
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM profile_skills").scalar() == 2
+        assert conn.exec_driver_sql("SELECT id FROM projects").all() == [(1,)]
+        assert [h["id"] for h in fulltext.search(conn, "backend")] == [1]
+        counts = conn.exec_driver_sql("SELECT skill_id, profile_count FROM skill_counts ORDER BY 1")
+        assert counts.all() == [(1, 1), (2, 1)]
+    assert migrations.pending(engine) == []
+    engine.dispose()
+
+
+def test_failed_migration_leaves_the_previous_version(engine, monkeypatch):
+    def broken(connection):
+        connection.exec_driver_sql("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(999, "broken", broken)])
+
+    with pytest.raises(RuntimeError):
+        migrations.migrate(engine)
+
+    assert not inspect(engine).has_table("half_done")
+    assert migrations.pending(engine) == [(999, "broken")]
+
+
+def test_hot_queries_are_index_backed(engine, db):
+    for i in range(3):
+        crud.create_profile(db, ProfileCreate(
+            name=f"P{i}", email=f"{i}@x.io", skills=["Python"],
+            projects=[{"title": "Bot", "tech_stack": "Docker"}],
+        ))
+
+    queries = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT"):
+            queries.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", collect)
+    crud.list_profiles(db, 0, 10, fields=("id", "name", "skills", "projects"))
+    crud.search_profiles_by_skills(db, ["python", "docker"])
+    crud.get_profile_for_update(db, 1)
+    crud.patch_profile(db, 1, ProfilePatch(skills=["Rust"]))
+    skill_counts.top_skills(db, 5)
+    event.remove(engine, "before_cursor_execute", collect)
+
+    with engine.connect() as conn:
+        for statement, parameters in queries:
+            plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            # Only list pages walk profiles (in id order, up to LIMIT)
+            scans = [step for step in plan if step.startswith("SCAN ")]
+            assert all(s == "SCAN profiles" or s.startswith("SCAN anon_") for s in scans), (statement, plan)
@@ -0,0 +1,62 @@
+import time
+
+import crud
+import profiling
+from schemas import ProfileCreate
+
+AUTH = ("Predusk", "tracka")
+
+
+def test_flagged_request_is_profiled(client, db, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_INTERVAL_MS", 1.0)
+    profiling.clear()
+    crud.create_profile(db, ProfileCreate(name="Ana", email="ana@x.io", skills=["Python"]))
+
+    # Slow enough for the sampler to catch the worker thread in crud
+    resolve = crud.resolve_skill_ids
+
+    def slow_resolve(*args):
+        time.sleep(0.05)
+        return resolve(*args)
+
+    monkeypatch.setattr(crud, "resolve_skill_ids", slow_resolve)
+    res = client.get("/profiles/search", params={"skill": "python"}, headers={"X-Profile": "1"}, auth=AUTH)
+    assert res.json()[0]["name"] == "Ana"
+    profile_id = res.headers["x-profile-id"]
+
+    report = client.get(f"/admin/profiles/{profile_id}", auth=AUTH).json()
+    assert (report["path"], report["status"]) == ("/profiles/search", 200)
+    assert report["samples"] > 0
+    assert report["statements"] == len(report["timeline"]) > 0
+    assert any("profile_skills" in entry["statement"] for entry in report["timeline"])
+    assert any(
+        stack.startswith("worker;") and "crud.search_profiles_by_skills" in stack
+        for stack in report["stacks"]
+    )
+
+    stacks = client.get(f"/admin/profiles/{profile_id}/collapsed", auth=AUTH).text
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks.splitlines())
+    assert [r["id"] for r in client.get("/admin/profiles", auth=AUTH).json()] == [profile_id]
+
+
+def test_flag_needs_credentials(client):
+    profiling.clear()
+
+    res = client.get("/profiles", headers={"X-Profile": "1"})
+    assert res.status_code == 200
+    assert "x-profile-id" not in res.headers
+    res = client.get("/profiles", params={"_profile": 1}, auth=("Predusk", "wrong"))
+    assert "x-profile-id" not in res.headers
+    assert "x-profile-id" in client.get("/profiles", params={"_profile": 1}, auth=AUTH).headers
+
+    assert client.get("/admin/profiles").status_code == 401
+    assert client.get("/admin/profiles/nope", auth=AUTH).status_code == 404
+
+
+def test_report_storage_is_bounded(client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_KEEP", 2)
+    profiling.clear()
+
+    ids = [client.get("/health", headers={"X-Profile": "1"}, auth=AUTH).headers["x-profile-id"] for _ in range(3)]
+
+    assert [r["id"] for r in client.get("/admin/profiles", auth=AUTH).json()] == ids[:0:-1]
@@ -0,0 +1,54 @@
+import multiprocessing
+
+from ratelimit import SQLiteBucketStore, parse_limit
+
+AUTH = ("Predusk", "tracka")
+
+
+def test_create_profile_limit_and_headers(client):
+    for i in range(5):
+        res = client.post("/profile", json={"name": "A", "email": f"a{i}@x.io"}, auth=AUTH)
+        assert res.status_code == 200
+        assert res.headers["X-RateLimit-Limit"] == "5"
+        assert res.headers["X-RateLimit-Remaining"] == str(4 - i)
+
+    res = client.post("/profile", json={"name": "A", "email": "a9@x.io"}, auth=AUTH)
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) > 0
+
+
+def test_unauthorized_requests_do_not_consume_tokens(client):
+    for _ in range(6):
+        assert client.post("/profile", json={}).status_code == 401
+    res = client.post("/profile", json={"name": "A", "email": "a@x.io"}, auth=AUTH)
+    assert res.headers["X-RateLimit-Remaining"] == "4"
+
+
+def test_bucket_refills_over_time(tmp_path):
+    store = SQLiteBucketStore(str(tmp_path / "rl.db"))
+    assert parse_limit("2/minute") == (2, 60)
+    assert store.consume("k", 2, 60, now=0)[0]
+    assert store.consume("k", 2, 60, now=0)[0]
+    assert not store.consume("k", 2, 60, now=1)[0]
+    assert store.consume("k", 2, 60, now=31)[0]
+
+
+def _consume_many(path, count, results):
+    store = SQLiteBucketStore(path)
+    results.put(sum(store.consume("shared", 10, 3600)[0] for _ in range(count)))
+
+
+def test_limit_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "rl.db")
+    SQLiteBucketStore(path)
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_consume_many, args=(path, 8, results))
+        for _ in range(3)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert sum(results.get() for _ in workers) == 10
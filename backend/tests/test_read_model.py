@@ -0,0 +1,75 @@
+import base64
+
+import crud
+from schemas import ProfileCreate
+
+
+def make_profiles(db, count, start=0):
+    for i in range(start, start + count):
+        crud.create_profile(db, ProfileCreate(
+            name=f"User {i}",
+            email=f"user{i}@example.com",
+            skills=["Python", "Docker"],
+            projects=[{
+                "title": f"Project {i}",
+                "description": "Object detection with OpenCV",
+                "tech_stack": "FastAPI, SQLite",
+            }],
+        ))
+
+
+def test_list_profiles_query_count_is_constant(client, db, query_counter):
+    make_profiles(db, 3)
+    query_counter.clear()
+    res = client.get("/profiles?size=50")
+    small_page = len(query_counter)
+    assert len(res.json()) == 3
+
+    make_profiles(db, 20, start=3)
+    query_counter.clear()
+    res = client.get("/profiles?size=50")
+    assert len(res.json()) == 23
+    assert len(query_counter) == small_page == 2
+
+
+def test_search_query_count_is_constant(client, db, query_counter):
+    make_profiles(db, 15)
+    query_counter.clear()
+    res = client.get("/profiles/search?skill=py")
+    assert len(res.json()) == 15
+    assert len(query_counter) == 3
+    assert "python" in res.json()[0]["skills"]
+
+
+def test_edit_view_query_count(client, db, query_counter):
+    make_profiles(db, 1)
+    query_counter.clear()
+    res = client.get("/profile/1/edit")
+    assert res.status_code == 200
+    assert res.json()["projects"][0]["title"] == "Project 0"
+    assert "computer vision" in res.json()["skills"]
+    assert len(query_counter) == 3
+
+
+def test_cursor_pagination_walks_all_profiles(client, db, query_counter):
+    make_profiles(db, 7)
+    seen, cursor = [], ""
+    while cursor is not None:
+        query_counter.clear()
+        res = client.get("/profiles", params={"cursor": cursor, "size": 3})
+        assert res.status_code == 200
+        assert len(query_counter) == 2
+        body = res.json()
+        seen += [p["id"] for p in body["items"]]
+        cursor = body["next_cursor"]
+    assert seen == list(range(1, 8))
+
+
+def test_cursor_pagination_rejects_bad_input(client):
+    assert client.get("/profiles?cursor=not-a-cursor").status_code == 400
+    for after in ("true", str(10**30), "-1"):
+        raw = base64.urlsafe_b64encode(f'{{"after":{after}}}'.encode()).decode()
+        assert client.get("/profiles", params={"cursor": raw}).status_code == 400
+    assert client.get("/profiles?size=1000").status_code == 422
+    # Offset pagination keeps its original list shape
+    assert client.get("/profiles?page=2&size=5").json() == []
@@ -0,0 +1,113 @@
+import threading
+
+import crud
+import fulltext
+import retag
+import skill_counts
+from fallbacks import FaLLBACKS
+from models import RetagJob
+from schemas import ProfileCreate
+
+AUTH = ("Predusk", "tracka")
+
+# "pytorch" and "torch" become deep learning
+WITH_PYTORCH = {**FaLLBACKS, "deep learning": FaLLBACKS["deep learning"] + ["pytorch", "torch"]}
+
+
+def seed(db, count=2):
+    crud.create_profile(db, ProfileCreate(
+        name="Ana", email="ana@x.io", skills=["Torch"],
+        projects=[{"title": "Classifier", "tech_stack": "PyTorch, FastAPI"}],
+    ))
+    for i in range(1, count):
+        crud.create_profile(db, ProfileCreate(name=f"P{i}", email=f"{i}@x.io", skills=["Rust"]))
+
+
+def skills_of(db, profile_id):
+    return crud.get_profile_for_update(db, profile_id)["skills"]
+
+
+def test_new_dictionary_retags_existing_profiles(engine, db):
+    seed(db)
+    assert skills_of(db, 1) == ["fastapi", "torch"]
+
+    job = retag.publish(db, WITH_PYTORCH)
+    assert retag.run(job["id"], engine, workers=0, batch_size=1)
+
+    db.expire_all()
+    # Project text now implies deep learning, and the listed "Torch"
+    # re-normalizes to it, so it is no longer an explicit skill
+    assert skills_of(db, 1) == ["deep learning", "fastapi"]
+    assert skill_counts.check(db) == []
+    with engine.connect() as conn:
+        assert [h["id"] for h in fulltext.search(conn, "deep learning")] == [1]
+    status = retag.status(db)
+    assert (status["status"], status["processed_profiles"], status["changed_profiles"]) == ("done", 2, 1)
+
+
+def test_stopped_job_resumes_from_its_last_batch(engine, db):
+    seed(db, count=3)
+    job = retag.publish(db, WITH_PYTORCH)
+
+    stop = threading.Event()
+    stop.set()
+    retag.run(job["id"], engine, workers=0, batch_size=1, stop=stop)
+    db.expire_all()
+    stopped = db.get(RetagJob, job["id"])
+    assert (stopped.status, stopped.processed_profiles, stopped.last_profile_id) == ("running", 1, 1)
+
+    retag.run(job["id"], engine, workers=0, batch_size=1)
+    db.expire_all()
+    assert retag.status(db)["status"] == "done"
+    assert retag.status(db)["processed_profiles"] == 3
+    assert skills_of(db, 1) == ["deep learning", "fastapi"]
+
+
+def test_newer_dictionary_supersedes_the_running_job(engine, db):
+    seed(db)
+    first = retag.publish(db, WITH_PYTORCH)
+    second = retag.publish(db, FaLLBACKS)
+
+    assert not retag.run(first["id"], engine, workers=0)
+    assert db.get(RetagJob, first["id"]).status == "superseded"
+    assert retag.run(second["id"], engine, workers=0)
+    assert skills_of(db, 1) == ["fastapi", "torch"]
+
+
+def test_inference_in_a_process_pool(engine, db):
+    seed(db, count=5)
+    job = retag.publish(db, WITH_PYTORCH)
+
+    retag.run(job["id"], engine, workers=2, batch_size=2)
+
+    db.expire_all()
+    assert retag.status(db)["status"] == "done"
+    assert skills_of(db, 1) == ["deep learning", "fastapi"]
+
+
+def test_admin_endpoints(client, db, monkeypatch):
+    # The test engine has a single connection, so run jobs after the
+    # request rather than in a thread next to it
+    started = []
+    monkeypatch.setattr(retag, "run_in_background", lambda *args: started.append(args))
+    seed(db)
+
+    assert client.put("/admin/aliases", json={"aliases": WITH_PYTORCH}).status_code == 401
+    assert client.get("/admin/aliases", auth=AUTH).json()["version"] == 1
+
+    res = client.put("/admin/aliases", json={"aliases": WITH_PYTORCH}, auth=AUTH)
+    assert res.status_code == 202
+    assert res.json()["alias_version"] == 2
+    job_id, write_engine, read_engine = started.pop()
+    assert job_id == res.json()["id"]
+    assert retag.run(job_id, write_engine, read_engine, workers=0)
+
+    status = client.get("/admin/retag", auth=AUTH).json()
+    assert (status["status"], status["percent"]) == ("done", 100.0)
+    assert client.get("/admin/aliases", auth=AUTH).json()["aliases"]["deep learning"][-1] == "torch"
+    names = [p["name"] for p in client.get("/profiles/search", params={"skill": "pytorch"}).json()]
+    assert names == ["Ana"]
+
+    # Nothing left to resume, so POST re-runs the current dictionary
+    assert client.post("/admin/retag", auth=AUTH).json()["id"] == status["id"] + 1
+    assert started[-1][0] == status["id"] + 1
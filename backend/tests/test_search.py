@@ -0,0 +1,60 @@
+import crud
+from schemas import ProfileCreate
+
+
+def add_profile(db, name, skills):
+    return crud.create_profile(db, ProfileCreate(
+        name=name, email=f"{name.lower()}@example.com", skills=skills
+    ))
+
+
+def test_multi_skill_search_ranks_by_matches(client, db):
+    add_profile(db, "Ana", ["Python", "Docker", "K8s"])
+    add_profile(db, "Ben", ["Python"])
+    add_profile(db, "Cy", ["Docker"])
+
+    res = client.get("/profiles/search?skill=py&skill=docker&skill=kubernetes")
+    body = res.json()
+    assert [p["name"] for p in body] == ["Ana", "Ben", "Cy"]
+    assert [p["matched"] for p in body] == [3, 1, 1]
+
+    res = client.get("/profiles/search?skill=python&skill=docker&match=all")
+    assert [p["name"] for p in res.json()] == ["Ana"]
+
+
+def test_aliases_do_not_duplicate_results(client, db):
+    add_profile(db, "Ana", ["AI", "Artificial Intelligence"])
+
+    res = client.get("/profiles/search?skill=ai&skill=artificial intelligence")
+    assert len(res.json()) == 1
+    assert res.json()[0]["matched"] == 1
+
+
+def test_partial_terms_still_match(client, db):
+    add_profile(db, "Ana", ["Machine Learning"])
+    add_profile(db, "Ben", ["Deep Learning"])
+
+    res = client.get("/profiles/search?skill=learning")
+    assert {p["name"] for p in res.json()} == {"Ana", "Ben"}
+
+
+def test_unknown_skill_with_match_all_returns_nothing(client, db):
+    add_profile(db, "Ana", ["Python"])
+    res = client.get("/profiles/search?skill=python&skill=cobol&match=all")
+    assert res.json() == []
+
+
+def test_unknown_skill_with_match_any_returns_nothing(client, db):
+    add_profile(db, "Ana", ["Python"])
+    res = client.get("/profiles/search?skill=cobol")
+    assert res.status_code == 200
+    assert res.json() == []
+
+
+def test_overlapping_skill_groups_count_separately(db):
+    add_profile(db, "Ana", ["Deep Learning"])
+
+    # "learning" falls back to substring matching and also hits deep learning
+    rows = crud.search_profiles_by_skills(db, ["learning", "deep learning"], match="all")
+    assert [(r["name"], r["matched"]) for r in rows] == [("Ana", 2)]
+
@@ -0,0 +1,80 @@
+import numpy as np
+
+import crud
+import similar
+from schemas import ProfileCreate, ProfilePatch
+
+SKILLS = {
+    "Ana": ["Python", "Docker", "FastAPI"],
+    "Ben": ["Python", "Docker"],
+    "Cy": ["Python", "React", "Figma", "Rust"],
+    "Di": ["Figma"],
+}
+
+
+def seed(db):
+    for name, skills in SKILLS.items():
+        crud.create_profile(db, ProfileCreate(name=name, email=f"{name.lower()}@x.io", skills=skills))
+
+
+def names(res):
+    return [(hit["name"], hit["score"]) for hit in res.json()]
+
+
+def test_ranked_by_cosine_and_jaccard(client, db):
+    seed(db)
+
+    # Ben shares 2 of 3, Cy 1 of 4, Di nothing
+    assert names(client.get("/profile/1/similar")) == [("Ben", 0.816497), ("Cy", 0.288675)]
+    jaccard = client.get("/profile/1/similar", params={"metric": "jaccard", "k": 1, "fields": "name,skills"})
+    assert jaccard.json() == [{"id": 2, "name": "Ben", "skills": ["docker", "python"], "score": 0.666667}]
+
+
+def test_writes_are_reflected_without_reload(client, db, monkeypatch):
+    seed(db)
+    assert names(client.get("/profile/4/similar")) == [("Cy", 0.5)]
+
+    # Any further reload would be a bug: commits update the matrix
+    monkeypatch.setattr(similar.SkillMatrix, "load", None)
+    crud.patch_profile(db, 2, ProfilePatch(skills=["Figma"]))
+    crud.create_profile(db, ProfileCreate(name="Ed", email="ed@x.io", skills=["Figma", "Rust"]))
+
+    assert names(client.get("/profile/4/similar")) == [("Ben", 1.0), ("Ed", 0.707107), ("Cy", 0.5)]
+    assert names(client.get("/profile/1/similar")) == [("Cy", 0.288675)]
+
+
+def test_write_by_another_worker_reloads(client, db, engine, monkeypatch):
+    seed(db)
+    assert names(client.get("/profile/4/similar")) == [("Cy", 0.5)]
+
+    monkeypatch.setattr(similar, "SIMILAR_RELOAD_SECONDS", 0)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM profile_skills WHERE profile_id = 3")
+        conn.exec_driver_sql("UPDATE data_version SET version = version + 1")
+
+    assert client.get("/profile/4/similar").json() == []
+
+
+def test_unknown_profile_is_404(client, db):
+    seed(db)
+    crud.create_profile(db, ProfileCreate(name="Nobody", email="n@x.io"))
+
+    assert client.get("/profile/5/similar").json() == []
+    assert client.get("/profile/99/similar").status_code == 404
+
+
+def test_top_k_matches_a_brute_force_scan():
+    rng = np.random.default_rng(0)
+    sets = {pid: set(rng.choice(30, size=rng.integers(1, 8), replace=False).tolist()) for pid in range(1, 500)}
+    matrix = similar.SkillMatrix()
+    matrix.load(np.array([(p, s) for p, skills in sets.items() for s in skills]), version=1)
+
+    for pid in (1, 77, 250):
+        a = sets[pid]
+        expected = sorted(
+            ((len(a & b) / len(a | b), other) for other, b in sets.items() if other != pid and a & b),
+            key=lambda hit: (-hit[0], hit[1]),
+        )[:15]
+        got = matrix.top_k(pid, 15, "jaccard")
+        assert [other for other, _ in got] == [other for _, other in expected]
+        assert np.allclose([score for _, score in got], [score for score, _ in expected])
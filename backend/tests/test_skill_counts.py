@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import delete
+
+import crud
+import skill_counts
+from models import SkillCount
+from schemas import ProfileCreate, ProfilePatch, ProfileUpdate
+
+
+def test_counts_follow_creates_and_updates(client, db):
+    crud.create_profile(db, ProfileCreate(name="A", email="a@x.io", skills=["Python", "Docker"]))
+    crud.create_profiles_bulk(db, [
+        (1, ProfileCreate(name="B", email="b@x.io", skills=["Python"])),
+        (2, ProfileCreate(name="C", email="c@x.io", projects=[{"title": "P", "tech_stack": "py, k8s"}])),
+    ])
+    crud.update_profile(db, 1, ProfileUpdate(skills=["Docker", "SQL"]))
+    crud.patch_profile(db, 3, ProfilePatch(projects=[{"id": 1, "delete": True}]))
+
+    res = client.get("/skills")
+
+    # python (B), docker and sql (A); C lost python and kubernetes
+    assert sorted((r["skill"], r["count"]) for r in res.json()) == [
+        ("docker", 1), ("python", 1), ("sql", 1)
+    ]
+    assert skill_counts.check(db) == []
+
+
+def test_counts_roll_back_with_the_profile(db):
+    crud.create_profile(db, ProfileCreate(name="A", email="a@x.io", skills=["Python"]))
+
+    with pytest.raises(Exception):
+        crud.create_profile(db, ProfileCreate(name="B", email="a@x.io", skills=["Python"]))
+
+    assert db.get(SkillCount, 1).profile_count == 1
+
+
+def test_check_and_rebuild_cover_existing_data(db):
+    crud.create_profile(db, ProfileCreate(name="A", email="a@x.io", skills=["Python", "Rust"]))
+    db.execute(delete(SkillCount))
+    db.commit()
+
+    assert [m["actual"] for m in skill_counts.check(db)] == [1, 1]
+    assert skill_counts.rebuild(db) == 2
+    assert skill_counts.check(db) == []
+
+
+def test_top_skills_reads_a_fixed_number_of_rows(client, db, query_counter):
+    for i in range(30):
+        crud.create_profile(db, ProfileCreate(name=f"P{i}", email=f"{i}@x.io", skills=["Python"]))
+    query_counter.clear()
+
+    res = client.get("/skills", params={"limit": 1})
+
+    assert res.json() == [{"skill": "python", "count": 30}]
+    assert len(query_counter) == 1
+    assert "GROUP BY" not in query_counter[0]
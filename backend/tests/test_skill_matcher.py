@@ -0,0 +1,41 @@
+from crud import normalize_skill_name, extract_skills_from_text
+from skill_matcher import SkillMatcher
+
+
+def test_normalize_uses_aliases():
+    assert normalize_skill_name(" AI ") == "artificial intelligence"
+    assert normalize_skill_name("K8s") == "kubernetes"
+    assert normalize_skill_name("Rust") == "rust"
+
+
+def test_extract_respects_word_boundaries():
+    assert extract_skills_from_text("Happy email pipeline") == set()
+    assert extract_skills_from_text("HTML dashboard") == set()
+    assert extract_skills_from_text("Built with Python and AI") == {
+        "python", "artificial intelligence"
+    }
+
+
+def test_extract_multi_word_and_plural_aliases():
+    text = "Raspberry-Pi sensors, Docker containers and large language models"
+    assert extract_skills_from_text(text) == {
+        "iot", "docker", "large language models"
+    }
+    assert extract_skills_from_text("a machine that is learning") == set()
+
+
+def test_first_alias_entry_wins():
+    matcher = SkillMatcher({"a": ["x"], "b": ["x", "y"]})
+    assert matcher.normalize("x") == "a"
+    assert matcher.extract("x y") == {"a", "b"}
+
+
+def test_plurals_only_for_real_words():
+    assert extract_skills_from_text("I like rags and ais, pys and mls") == set()
+    assert extract_skills_from_text("transformers") == {"large language models"}
+
+
+def test_plural_never_shadows_a_later_real_alias():
+    matcher = SkillMatcher({"a": ["spark"], "b": ["sparks"]})
+    assert matcher.extract("sparks") == {"b"}
+    assert matcher.extract("spark") == {"a"}
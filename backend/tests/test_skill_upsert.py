@@ -0,0 +1,73 @@
+import pytest
+from fastapi import HTTPException
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import crud
+import migrations
+from models import Skill
+from schemas import ProfileCreate
+
+MANY_SKILLS = [
+    "Python", "Docker", "K8s", "SQL", "FastAPI", "AI", "ML", "DL",
+    "NLP", "LLM", "RAG", "OpenCV", "IoT", "Rust", "Go",
+]
+
+
+def test_create_profile_resolves_skills_in_bulk(db, query_counter):
+    crud.create_profile(db, ProfileCreate(name="A", email="a@x.io", skills=["Python"]))
+    query_counter.clear()
+
+    crud.create_profile(db, ProfileCreate(name="B", email="b@x.io", skills=MANY_SKILLS))
+
+    skill_statements = [s for s in query_counter if "skills" in s and "_skills" not in s]
+    # SELECT existing, INSERT missing, SELECT inserted
+    assert len(skill_statements) == 3
+    assert db.query(Skill).count() == 15
+
+
+def test_duplicate_email_leaves_no_orphan_skills(db):
+    crud.create_profile(db, ProfileCreate(name="A", email="a@x.io"))
+
+    with pytest.raises(HTTPException) as exc:
+        crud.create_profile(db, ProfileCreate(name="B", email="a@x.io", skills=["Rust"]))
+
+    assert exc.value.status_code == 400
+    assert db.query(Skill).count() == 0
+
+
+def test_concurrent_creator_of_same_skill_does_not_conflict(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    migrations.migrate(engine)
+    Session = sessionmaker(bind=engine)
+    ours, theirs = Session(), Session()
+
+    # Let the other writer commit "rust" between our SELECT and INSERT
+    def commit_competing_skill(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO skills") and not theirs.info.get("done"):
+            theirs.info["done"] = True
+            theirs.add(Skill(name="rust"))
+            theirs.commit()
+
+    event.listen(engine, "before_cursor_execute", commit_competing_skill)
+    try:
+        skills = crud.get_or_create_skills(ours, ["Rust", "Go"])
+        ours.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", commit_competing_skill)
+
+    assert theirs.info["done"]
+    assert sorted(s.name for s in skills) == ["go", "rust"]
+    assert ours.query(Skill).count() == 2
+    ours.close()
+    theirs.close()
+    engine.dispose()
+
+
+def test_update_does_not_report_email_errors(db):
+    from schemas import ProfileUpdate
+
+    profile = crud.create_profile(db, ProfileCreate(name="A", email="a@x.io"))
+    updated = crud.update_profile(db, profile.id, ProfileUpdate(skills=["Rust"]))
+    assert [s.name for s in updated.skills] == ["rust"]
@@ -0,0 +1,156 @@
+from sqlalchemy import delete, func, select
+
+import crud
+from models import Project, profile_explicit_skills, project_skills
+from schemas import ProfileCreate
+
+AUTH = ("Predusk", "tracka")
+
+
+def make_profile(db):
+    return crud.create_profile(db, ProfileCreate(
+        name="Ana", email="ana@example.com", skills=["Rust"],
+        projects=[
+            {"title": "Detector", "description": "fire detection", "tech_stack": "Python, OpenCV"},
+            {"title": "Infra", "tech_stack": "Docker, K8s, Python"},
+        ],
+    ))
+
+
+def writes(statements):
+    """
+    "VERB table" for every INSERT/UPDATE/DELETE statement.
+    """
+    found = []
+    for statement in statements:
+        words = statement.split()
+        if words[0] == "UPDATE":
+            found.append(f"UPDATE {words[1]}")
+        elif words[0] in ("INSERT", "DELETE"):
+            found.append(f"{words[0]} {words[2]}")
+    return found
+
+
+def skills_of(client, profile_id):
+    return client.get(f"/profile/{profile_id}/edit").json()["skills"]
+
+
+def test_edit_view_round_trip_writes_nothing(client, db, query_counter):
+    profile = make_profile(db)
+    body = client.get(f"/profile/{profile.id}/edit").json()
+    query_counter.clear()
+
+    res = client.put(f"/profile/{profile.id}", json=body, auth=AUTH)
+
+    assert res.status_code == 200
+    assert writes(query_counter) == []
+
+
+def test_patch_project_title_updates_one_row(client, db, query_counter):
+    profile = make_profile(db)
+    project_id = profile.projects[0].id
+    query_counter.clear()
+
+    res = client.patch(
+        f"/profile/{profile.id}",
+        json={"projects": [{"id": project_id, "title": "Fire Detector"}]},
+        auth=AUTH,
+    )
+
+    assert res.status_code == 200
+    # plus the profile's full-text document
+    assert writes(query_counter) == ["UPDATE projects", "DELETE profile_fts", "INSERT profile_fts"]
+    assert client.get(f"/profile/{profile.id}/edit").json()["projects"][0]["title"] == "Fire Detector"
+
+
+def test_changed_text_reinfers_only_that_project(client, db, query_counter):
+    profile = make_profile(db)
+    infra_id = profile.projects[1].id
+    query_counter.clear()
+
+    client.patch(
+        f"/profile/{profile.id}",
+        json={"projects": [{"id": infra_id, "tech_stack": "Python"}]},
+        auth=AUTH,
+    )
+
+    # python is still inferred from the first project; rust stays explicit
+    assert skills_of(client, profile.id) == ["computer vision", "python", "rust"]
+    assert sorted(writes(query_counter)) == [
+        "DELETE profile_fts", "DELETE profile_skills", "DELETE project_skills",
+        "INSERT profile_fts", "INSERT skill_counts", "UPDATE projects"
+    ]
+
+
+def test_put_drops_missing_projects_without_orphans(client, db):
+    profile = make_profile(db)
+    body = client.get(f"/profile/{profile.id}/edit").json()
+    body["projects"] = body["projects"][:1]
+    body["skills"] = ["Rust"]
+
+    client.put(f"/profile/{profile.id}", json=body, auth=AUTH)
+
+    assert db.query(Project).count() == 1
+    assert db.scalar(select(func.count()).select_from(project_skills)) == 2
+    assert "kubernetes" not in skills_of(client, profile.id)
+
+
+def test_patch_adds_and_deletes_projects(client, db):
+    profile = make_profile(db)
+    first_id = profile.projects[0].id
+
+    res = client.patch(
+        f"/profile/{profile.id}",
+        json={"projects": [
+            {"id": first_id, "delete": True},
+            {"title": "Chatbot", "tech_stack": "LLM, RAG"},
+        ]},
+        auth=AUTH,
+    )
+
+    assert res.status_code == 200
+    titles = [p["title"] for p in client.get(f"/profile/{profile.id}/edit").json()["projects"]]
+    assert titles == ["Infra", "Chatbot"]
+    assert "computer vision" not in skills_of(client, profile.id)
+    assert "retrieval augmented generation" in skills_of(client, profile.id)
+
+
+def test_patch_fields_only_touch_what_is_sent(client, db):
+    profile = make_profile(db)
+    client.patch(f"/profile/{profile.id}", json={"education": "BTech"}, auth=AUTH)
+
+    res = client.patch(f"/profile/{profile.id}", json={"education": None, "skills": ["Go"]}, auth=AUTH)
+
+    view = client.get(f"/profile/{profile.id}/edit").json()
+    assert res.status_code == 200
+    assert view["name"] == "Ana"
+    assert view["education"] is None
+    assert "rust" not in view["skills"] and "go" in view["skills"]
+
+
+def test_patch_rejects_bad_operations(client, db):
+    profile = make_profile(db)
+    url = f"/profile/{profile.id}"
+
+    assert client.patch(url, json={"name": None}, auth=AUTH).status_code == 422
+    assert client.patch(url, json={"projects": [{"description": "no title"}]}, auth=AUTH).status_code == 422
+    assert client.patch(url, json={"projects": [{"id": 999, "title": "x"}]}, auth=AUTH).status_code == 404
+    assert client.patch("/profile/999", json={"name": "x"}, auth=AUTH).status_code == 404
+
+
+def test_legacy_profile_sources_are_bootstrapped(client, db):
+    profile = make_profile(db)
+    # A profile written before skill provenance was recorded
+    db.execute(delete(profile_explicit_skills))
+    db.execute(delete(project_skills))
+    db.commit()
+
+    client.patch(
+        f"/profile/{profile.id}",
+        json={"projects": [{"id": profile.projects[1].id, "delete": True}]},
+        auth=AUTH,
+    )
+
+    assert skills_of(client, profile.id) == ["computer vision", "python", "rust"]
+    explicit = db.execute(select(profile_explicit_skills.c.skill_id)).all()
+    assert len(explicit) == 1
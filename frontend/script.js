@@ -1,5 +1,10 @@
 const BACKEND_URL = "https://tracka-me-api-playground.onrender.com";
 
+// Reads always revalidate with the browser's cached ETag: unchanged data
+// comes back as an empty 304 and fetch resolves with the cached body.
+// Compression is negotiated by the browser on its own.
+const REVALIDATE = { cache: "no-cache" };
+
 /* ---------- AUTH ---------- */
 function getAuthHeader() {
   const user = document.getElementById("authUser").value.trim();
@@ -126,7 +131,29 @@ async function updateProfile() {
 
 /* ---------- PUBLIC READ OPS ---------- */
 async function loadAllProfiles() {
-  const res = await fetch(`${BACKEND_URL}/profiles`);
+  const res = await fetch(`${BACKEND_URL}/profiles`, REVALIDATE);
+  const data = await res.json();
+  document.getElementById("profilesOutput").textContent =
+    JSON.stringify(data, null, 2);
+}
+
+// Several profiles in one request instead of one fetch per id
+async function loadProfilesByIds() {
+  const ids = document.getElementById("profileIds").value.replace(/\s+/g, "");
+  if (!/^\d+(,\d+)*$/.test(ids)) {
+    alert("Enter comma-separated profile IDs");
+    return;
+  }
+
+  const res = await fetch(
+    `${BACKEND_URL}/profiles/batch?ids=${ids}&fields=name,work,skills,projects`,
+    REVALIDATE
+  );
+  if (!res.ok) {
+    alert("Could not load profiles");
+    return;
+  }
+
   const data = await res.json();
   document.getElementById("profilesOutput").textContent =
     JSON.stringify(data, null, 2);
@@ -139,7 +166,7 @@ async function loadProfile() {
     return;
   }
 
-  const res = await fetch(`${BACKEND_URL}/profile/${id}/edit`);
+  const res = await fetch(`${BACKEND_URL}/profile/${id}/edit`, REVALIDATE);
   if (!res.ok) {
     alert("Profile not found");
     return;
@@ -153,7 +180,8 @@ async function loadProfile() {
 async function searchSkill() {
   const skill = document.getElementById("skillInput").value;
   const res = await fetch(
-    `${BACKEND_URL}/profiles/search?skill=${skill}`
+    `${BACKEND_URL}/profiles/search?skill=${encodeURIComponent(skill)}`,
+    REVALIDATE
   );
   const data = await res.json();
   document.getElementById("searchResult").textContent =